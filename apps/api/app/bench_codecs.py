@@ -0,0 +1,89 @@
+"""Per-row serialization cost of the predict encodings (no server or model needed).
+
+    python -m app.bench_codecs --rows 1 100 10000 [--output codecs.json]
+
+For each batch size and encoding it times the client body encode, the server decode into the feature
+matrix, the server response encode and the client response decode, and reports microseconds and bytes
+per row. ``json+pydantic`` is the previous path (``BatchPredictRequest`` validation, then vectorising),
+measured on the same rows with missing values zero-filled.
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+import numpy as np
+
+from . import codecs
+from .client import ENCODINGS, encode_request, decode_response
+from .features import FEATURES
+from .schemas import BatchPredictRequest
+from .validate import validate_and_vectorize
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _available(name: str) -> bool:
+    try:
+        __import__({"msgpack": "msgpack", "arrow": "pyarrow"}.get(name, "json"))
+        return True
+    except ImportError:
+        return False
+
+
+def run(n: int, repeat: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES)))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    payload = {"prediction": ["PC"] * n, "model_version": "bench"}
+    rows = []
+    for name, mt in ENCODINGS.items():
+        if not _available(name):
+            print(f"skip {name}: not installed")
+            continue
+        body = encode_request(X, mt)
+        resp = codecs.encode(payload, mt)
+        t = {"encode_request": _best(lambda: encode_request(X, mt), repeat),
+             "decode_request": _best(lambda: codecs.decode_rows(body, mt), repeat),
+             "encode_response": _best(lambda: codecs.encode(payload, mt), repeat),
+             "decode_response": _best(lambda: decode_response(resp, mt), repeat)}
+        rows.append({"encoding": name, "rows": n, "request_bytes_per_row": len(body) / n,
+                     **{f"{k}_us_per_row": v / n * 1e6 for k, v in t.items()},
+                     "total_us_per_row": sum(t.values()) / n * 1e6})
+    body = encode_request(np.nan_to_num(X), codecs.JSON)  # Dict[str, float] rejects null
+
+    def pydantic_path():
+        req = BatchPredictRequest.model_validate_json(body)
+        return [validate_and_vectorize(r) for r in req.rows]
+    t = _best(pydantic_path, repeat)
+    rows.append({"encoding": "json+pydantic", "rows": n, "request_bytes_per_row": len(body) / n,
+                 "decode_request_us_per_row": t / n * 1e6})
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark JSON / MessagePack / Arrow IPC predict encodings")
+    ap.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--output", default=None, help="Optional JSON results path")
+    args = ap.parse_args(argv)
+
+    results = [r for n in args.rows for r in run(n, args.repeat)]
+    print(f"{'encoding':<14}{'rows':>7}{'bytes/row':>11}{'dec req us/row':>16}{'total us/row':>14}")
+    for r in results:
+        total = r.get("total_us_per_row")
+        print(f"{r['encoding']:<14}{r['rows']:>7}{r['request_bytes_per_row']:>11.0f}"
+              f"{r['decode_request_us_per_row']:>16.2f}{'' if total is None else f'{total:.2f}':>14}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))  # 0 disables the cache
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "3600"))
+# Optional SQLite file shared by all workers on the host (second level behind the in-process LRU)
+PREDICTION_CACHE_PATH = os.getenv("PREDICTION_CACHE_PATH") or None
+
+
+def feature_key(vec, model_version: str) -> str:
+    """Canonical hash of an ordered feature vector (NaNs and -0.0 normalised) + model version."""
+    a = np.asarray(vec, dtype=np.float64) + 0.0
+    a[np.isnan(a)] = np.nan
+    h = hashlib.blake2b(a.tobytes(), digest_size=16)
+    h.update(str(model_version).encode())
+    return h.hexdigest()
+
+
+class _SharedStore:
+    """SQLite second level. Each writer trims the table to ``max_entries`` rows (expired rows first) every
+    ``trim_every`` inserts, so it stays bounded however long the workers live."""
+
+    def __init__(self, path: str, max_entries: int, trim_every: int = 256):
+        self.max_entries = max_entries
+        self.trim_every = trim_every
+        self._puts = 0
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS predictions "
+                           "(key TEXT PRIMARY KEY, version TEXT, value TEXT, expires REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS predictions_expires ON predictions (expires)")
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM predictions WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, version: str, value, expires: float):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                               (key, version, json.dumps(value), expires))
+            self._puts += 1
+            if self._puts >= self.trim_every:
+                self._puts = 0
+                self._trim()
+
+    def purge(self, keep_version: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions WHERE version != ?", (keep_version,))
+            self._trim()
+
+    def _trim(self):
+        # caller holds the lock; the oldest expiry goes first, i.e. least recently written
+        self._conn.execute("DELETE FROM predictions WHERE expires < ?", (time.time(),))
+        self._conn.execute("DELETE FROM predictions WHERE key NOT IN "
+                           "(SELECT key FROM predictions ORDER BY expires DESC LIMIT ?)", (self.max_entries,))
+
+
+class PredictionCache:
+    """Size-bounded LRU with per-entry TTL, keyed on (feature vector, model version).
+
+    Entries from another model version are never returned (the version is part of the key) and the
+    whole cache is dropped the first time a different version is seen. The API loads its model once per
+    process, so in practice the version changes on restart: the in-process LRU starts empty anyway, and the
+    check is what keeps the shared SQLite store (which outlives processes) from serving the old model.
+    """
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_SIZE, ttl_s: float = PREDICTION_CACHE_TTL_S,
+                 shared_path: str = PREDICTION_CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.version = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = _SharedStore(shared_path, max_entries * 16) if (shared_path and max_entries > 0) else None
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _check_version(self, version: str):
+        if version != self.version:
+            if self.version is not None:
+                self._stats["invalidations"] += 1
+            self._data.clear()
+            self.version = version
+            if self._shared is not None:
+                self._shared.purge(version)
+
+    def get(self, key: str, version: str):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            item = self._data.get(key)
+            if item is not None:
+                value, expires = item
+                if expires >= now:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._data[key]
+                self._stats["expirations"] += 1
+        if self._shared is not None:
+            value = self._shared.get(key)
+            if value is not None:
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+                    self._insert(key, value, now + self.ttl_s)
+                return value
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, version: str, value):
+        if not self.enabled:
+            return
+        expires = time.time() + self.ttl_s
+        with self._lock:
+            self._check_version(version)
+            self._insert(key, value, expires)
+        if self._shared is not None:
+            self._shared.put(key, version, value, expires)
+
+    def _insert(self, key, value, expires):
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+            out.update(size=len(self._data), max_entries=self.max_entries, ttl_s=self.ttl_s,
+                       shared=self._shared is not None, model_version=self.version)
+        lookups = out["hits"] + out["shared_hits"] + out["misses"]
+        out["hit_rate"] = round((out["hits"] + out["shared_hits"]) / lookups, 4) if lookups else 0.0
+        return out
@@ -0,0 +1,88 @@
+"""Small Python client for the predict routes with JSON / MessagePack / Arrow IPC bodies.
+
+    from app.client import PredictClient
+    c = PredictClient("http://127.0.0.1:8000", encoding="msgpack")
+    c.predict({"toipfx": 0.0, ...})          # -> {"prediction": [...], "model_version": ...}
+    c.predict_batch(df)                      # DataFrame / list of dicts / (n, len(FEATURES)) array
+
+Only the standard library is needed for JSON; ``msgpack`` / ``pyarrow`` for the binary encodings.
+"""
+from __future__ import annotations
+import json
+import urllib.error
+import urllib.request
+import numpy as np
+
+from . import codecs
+from .features import FEATURES
+from .validate import validate_and_vectorize
+
+ENCODINGS = {"json": codecs.JSON, "msgpack": codecs.MSGPACK, "arrow": codecs.ARROW}
+
+
+def as_matrix(rows) -> np.ndarray:
+    """Ordered float64 feature matrix from a DataFrame, a list of feature dicts, or an array."""
+    if hasattr(rows, "columns"):
+        return rows[FEATURES].to_numpy(dtype=np.float64)
+    if isinstance(rows, np.ndarray):
+        return np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURES))
+    return np.asarray([validate_and_vectorize(r) for r in rows], dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+def encode_request(X: np.ndarray, mt: str) -> bytes:
+    """Request body for an ordered feature matrix (columnar for the binary encodings)."""
+    if mt == codecs.JSON:
+        # strict JSON has no NaN: missing values travel as null
+        rows = np.where(np.isnan(X), None, X.astype(object)).tolist()
+        return json.dumps({"rows": [dict(zip(FEATURES, r)) for r in rows]}).encode()
+    if mt == codecs.MSGPACK:
+        import msgpack
+        return msgpack.packb({"columns": FEATURES, "data": X.tolist()}, use_bin_type=True)
+    if mt == codecs.ARROW:
+        import pyarrow as pa
+        table = pa.table({f: X[:, j] for j, f in enumerate(FEATURES)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise ValueError(f"unsupported encoding {mt!r}")
+
+
+def decode_response(body: bytes, mt: str) -> dict:
+    if mt == codecs.MSGPACK:
+        import msgpack
+        return msgpack.unpackb(body, raw=False)
+    if mt == codecs.ARROW:
+        import pyarrow as pa
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        meta = table.schema.metadata or {}
+        out = {"prediction": table.column("prediction").to_pylist(),
+               "model_version": meta.get(b"model_version", b"").decode() or None}
+        attrs = {n[5:]: table.column(n)[0].as_py() for n in table.column_names if n.startswith("attr_")}
+        if attrs:
+            out["attributions"] = attrs
+        return out
+    return json.loads(body)
+
+
+class PredictClient:
+    def __init__(self, base_url: str = "http://127.0.0.1:8000", encoding: str = "msgpack", timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.mt = ENCODINGS[encoding]
+        self.timeout = timeout
+
+    def _post(self, path: str, body: bytes) -> dict:
+        req = urllib.request.Request(self.base_url + path, data=body, method="POST",
+                                     headers={"Content-Type": self.mt, "Accept": self.mt})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return decode_response(resp.read(), self.mt)
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"{e.code} {e.read().decode(errors='replace')}") from None
+
+    def predict(self, features: dict, explain: bool = False) -> dict:
+        path = "/predict?explain=true" if explain else "/predict"
+        return self._post(path, encode_request(as_matrix([features]), self.mt))
+
+    def predict_batch(self, rows) -> dict:
+        return self._post("/predict/batch", encode_request(as_matrix(rows), self.mt))
@@ -0,0 +1,133 @@
+"""Request/response encodings for the predict routes: JSON, MessagePack and Arrow IPC.
+
+Bodies decode straight to an ``(n_rows, len(FEATURES))`` float64 matrix, so the binary paths skip the
+per-key Pydantic validation of ``Dict[str, float]``. Accepted shapes:
+
+- JSON / MessagePack: ``{"features": {name: value}}`` (one row), ``{"rows": [{name: value}, ...]}``, or the
+  columnar ``{"columns": [names], "data": [[v, ...], ...]}`` (fastest for MessagePack).
+- Arrow IPC stream: a table with one float-castable column per feature (nulls become NaN). float64 columns
+  without nulls are read through zero-copy NumPy views; the only copy is into the row matrix.
+
+``msgpack`` is a hard requirement; ``pyarrow`` is optional (Arrow requests get ``415`` without it).
+"""
+from __future__ import annotations
+import json
+import numpy as np
+
+from .features import FEATURES
+from .validate import validate_and_vectorize, column_order
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK,
+            "application/x-apache-arrow-stream": ARROW}
+SUPPORTED = (JSON, MSGPACK, ARROW)
+
+
+class CodecError(ValueError):
+    """Raised for undecodable bodies; ``status`` is the HTTP code to answer with."""
+
+    def __init__(self, msg: str, status: int = 400):
+        super().__init__(msg)
+        self.status = status
+
+
+def media_type(header: str | None) -> str:
+    """Normalised media type of a Content-Type header (parameters dropped, aliases resolved)."""
+    mt = (header or JSON).split(";")[0].strip().lower()
+    return _ALIASES.get(mt, mt)
+
+
+def negotiate(accept: str | None, default: str = JSON) -> str | None:
+    """Best supported media type for an Accept header (q-values honoured); ``None`` if nothing matches."""
+    if not accept:
+        return default
+    ranked = []
+    for i, part in enumerate(accept.split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        q = 1.0
+        for f in fields[1:]:
+            if f.startswith("q="):
+                try:
+                    q = float(f[2:])
+                except ValueError:
+                    q = 0.0
+        ranked.append((-q, i, media_type(fields[0])))
+    for neg_q, _, mt in sorted(ranked):
+        if neg_q == 0:
+            break
+        if mt in SUPPORTED:
+            return mt
+        if mt in ("*/*", "application/*"):
+            return default
+    return None
+
+
+def _require_arrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise CodecError("Arrow IPC needs pyarrow installed on the server", status=415)
+    return pa
+
+
+def _from_mapping(obj) -> np.ndarray:
+    if not isinstance(obj, dict):
+        raise CodecError("body must be an object")
+    if "features" in obj:
+        return np.asarray([validate_and_vectorize(obj["features"])], dtype=np.float64)
+    if "rows" in obj:
+        return np.asarray([validate_and_vectorize(r) for r in obj["rows"]], dtype=np.float64).reshape(-1, len(FEATURES))
+    if "columns" in obj and "data" in obj:
+        idx = column_order(obj["columns"])
+        data = np.asarray(obj["data"], dtype=np.float64).reshape(-1, len(obj["columns"]))
+        return data[:, idx]
+    raise CodecError("expected one of 'features', 'rows' or 'columns'+'data'")
+
+
+def decode_rows(body: bytes, content_type: str | None) -> np.ndarray:
+    """Decode a request body into an ordered float64 feature matrix."""
+    mt = media_type(content_type)
+    try:
+        if mt == JSON:
+            return _from_mapping(json.loads(body))
+        if mt == MSGPACK:
+            import msgpack
+            return _from_mapping(msgpack.unpackb(body, raw=False))
+        if mt == ARROW:
+            pa = _require_arrow()
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+            idx = column_order(table.column_names)
+            out = np.empty((table.num_rows, len(FEATURES)), dtype=np.float64)
+            for j, i in enumerate(idx):
+                col = table.column(int(i)).combine_chunks().cast(pa.float64())
+                out[:, j] = col.to_numpy(zero_copy_only=False)
+            return out
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"Invalid features: {e}")
+    raise CodecError(f"unsupported content type {mt!r}; use one of {', '.join(SUPPORTED)}", status=415)
+
+
+def encode(payload: dict, mt: str) -> bytes:
+    """Serialise a predict response. Arrow gets one row per prediction (``attr_<feature>`` columns for
+    attributions) with ``model_version`` (and ``attribution_method``) in the schema metadata."""
+    if mt == MSGPACK:
+        import msgpack
+        return msgpack.packb(payload, use_bin_type=True)
+    if mt == ARROW:
+        pa = _require_arrow()
+        cols = {"prediction": pa.array(payload["prediction"])}
+        for k, v in (payload.get("attributions") or {}).items():
+            cols[f"attr_{k}"] = pa.array([v], type=pa.float64())
+        meta = {"model_version": str(payload.get("model_version") or "")}
+        if payload.get("attribution_method"):
+            meta["attribution_method"] = payload["attribution_method"]
+        table = pa.table(cols).replace_schema_metadata(meta)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return json.dumps(payload).encode()
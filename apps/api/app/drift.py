@@ -0,0 +1,131 @@
+"""Live feature-drift monitoring against the artifact's training reference (``drift_reference.json``).
+
+The request path only appends the already-decoded feature matrix to a bounded buffer. A background thread
+folds buffered rows into mergeable sketches (``exo_ml.drift``) every ``DRIFT_FLUSH_S`` seconds, so memory
+stays constant regardless of traffic and no raw rows are kept. When the buffer is full, rows are counted
+as ``dropped`` rather than slowing requests.
+
+- ``DRIFT_ENABLED`` — ``0`` turns monitoring off (default on when a reference exists)
+- ``DRIFT_REFERENCE_PATH`` — reference file or folder (default: next to ``MODEL_PATH``)
+- ``DRIFT_FLUSH_S`` — sketch update interval (default ``2``)
+- ``DRIFT_BUFFER_ROWS`` — max rows waiting for the next flush (default ``20000``)
+
+The sketches come from the ``exo_ml`` pipeline package; without it the monitor reports ``unavailable``.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .features import FEATURES
+from .utils import MODEL_PATH
+
+DRIFT_ENABLED = os.getenv("DRIFT_ENABLED", "1") != "0"
+DRIFT_REFERENCE_PATH = os.getenv("DRIFT_REFERENCE_PATH", "")
+DRIFT_FLUSH_S = float(os.getenv("DRIFT_FLUSH_S", "2"))
+DRIFT_BUFFER_ROWS = int(os.getenv("DRIFT_BUFFER_ROWS", "20000"))
+
+
+def reference_path(model_path: str = MODEL_PATH) -> Path:
+    from exo_ml.drift import REFERENCE_FILE
+
+    if DRIFT_REFERENCE_PATH:
+        return Path(DRIFT_REFERENCE_PATH)
+    p = Path(model_path)
+    return (p if p.is_dir() else p.parent) / REFERENCE_FILE
+
+
+class DriftMonitor:
+    def __init__(self, path: Path = None):
+        self.path = path
+        self.status = "disabled" if not DRIFT_ENABLED else "starting"
+        self.reference = None
+        self.live = None
+        self._cols = None          # positions in FEATURES of the reference columns
+        self._buf = []
+        self._buffered = 0
+        self.dropped = 0
+        self._buf_lock = threading.Lock()
+        self._live_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def active(self) -> bool:
+        return self.status == "active"
+
+    def start(self):
+        if not DRIFT_ENABLED or self._thread is not None:
+            return
+        try:
+            from exo_ml.drift import load_reference
+        except ImportError:
+            self.status = "unavailable"
+            logging.info("drift monitor off: the exo_ml package is not installed")
+            return
+        path = self.path or reference_path()
+        try:
+            self.reference = load_reference(path)
+        except FileNotFoundError:
+            self.status = "no_reference"
+            logging.info("drift monitor off: %s not found", path)
+            return
+        cols = [c for c in self.reference.columns if c in FEATURES]
+        self.reference.features = {c: self.reference.features[c] for c in cols}
+        self._cols = np.array([FEATURES.index(c) for c in cols], dtype=np.int64)
+        self.live = self.reference.live_like()
+        self.status = "active"
+        self._thread = threading.Thread(target=self._loop, name="drift-monitor", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+
+    def observe(self, X: np.ndarray):
+        """Hot path: O(1) append of the decoded matrix (no copy)."""
+        if not self.active:
+            return
+        with self._buf_lock:
+            if self._buffered + len(X) > DRIFT_BUFFER_ROWS:
+                self.dropped += len(X)
+                return
+            self._buf.append(X)
+            self._buffered += len(X)
+
+    def flush(self):
+        with self._buf_lock:
+            buf, self._buf, self._buffered = self._buf, [], 0
+        if not buf:
+            return
+        rows = np.vstack(buf)[:, self._cols]
+        with self._live_lock:
+            self.live.update(rows)
+
+    def _loop(self):
+        while not self._stop.wait(DRIFT_FLUSH_S):
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("drift flush failed")
+
+    def reset(self):
+        with self._buf_lock, self._live_lock:
+            self._buf, self._buffered, self.dropped = [], 0, 0
+            self.live = self.reference.live_like()
+
+    def report(self, include_sketches: bool = False, **thresholds) -> dict:
+        if not self.active:
+            return {"status": self.status}
+        from exo_ml.drift import compare
+
+        self.flush()
+        with self._live_lock:
+            out = compare(self.reference, self.live, **thresholds)
+            if include_sketches:
+                # mergeable across workers: DriftProfile.from_dict(a).merge(DriftProfile.from_dict(b))
+                out["live_profile"] = self.live.to_dict()
+        out["status"] = self.status
+        out["dropped_rows"] = self.dropped
+        return out
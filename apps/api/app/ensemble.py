@@ -0,0 +1,165 @@
+"""Multi-model consensus: several artifacts served by one process, queried concurrently per request.
+
+Members are configured with ``ENSEMBLE_MODELS`` (comma separated). Each entry is either a family name
+(``rf``), which resolves to the latest run folder ``<ARTIFACTS_ROOT>/rf/<timestamp>/``, or ``name=path``. Every
+member has its own ``ModelState``, so it loads, warms up and reports readiness the same way as the
+primary model.
+
+A request builds the validated feature matrix once and fans it out to the members as jobs on the shared
+inference executor, so members count against the same ``INFER_WORKERS`` × ``INFER_THREADS`` budget and queue
+as single predictions (a full queue reports the member as ``overloaded``). Each member has its own timeout,
+and a member that times out, fails or isn't ready is left out, giving a partial consensus. A member still
+busy with an earlier timed-out call is skipped (``busy``), so a slow model can't pile up work. ``soft``
+averages class probabilities; members without ``predict_proba`` contribute a one-hot. ``vote`` counts
+predicted labels.
+
+A misconfigured ``ENSEMBLE_MODELS`` (e.g. a family without runs) leaves the ensemble disabled with the reason in
+``error`` rather than failing the import of the whole API.
+"""
+import asyncio
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .executor import Overloaded
+from .features import FEATURES
+from .state import ModelState
+
+ENSEMBLE_MODELS = os.getenv("ENSEMBLE_MODELS", "")
+ARTIFACTS_ROOT = os.getenv("ARTIFACTS_ROOT", "./artifacts")
+ENSEMBLE_TIMEOUT_MS = float(os.getenv("ENSEMBLE_TIMEOUT_MS", "500"))
+ENSEMBLE_METHOD = os.getenv("ENSEMBLE_METHOD", "soft")
+METHODS = ("soft", "vote")
+
+
+def resolve_members(spec: str = ENSEMBLE_MODELS, root: str = ARTIFACTS_ROOT) -> dict:
+    """``{name: artifact path}`` from an ENSEMBLE_MODELS string."""
+    out = {}
+    for entry in (e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        name, _, path = entry.partition("=")
+        if not path:
+            runs = sorted(p for p in (Path(root) / name).iterdir() if p.is_dir()) if (Path(root) / name).is_dir() else []
+            if not runs:
+                raise FileNotFoundError(f"no runs for ensemble member {name!r} under {root}")
+            path = str(runs[-1])
+        out[name] = path
+    return out
+
+
+def member_scores(model, df: pd.DataFrame):
+    """(class labels, per-class scores) for one member; hard one-hot if the model has no probabilities."""
+    cols = getattr(model, "feature_names_in_", None)
+    if cols is not None:
+        df = df[list(cols)]
+    classes = [str(c) for c in model.classes_]
+    if hasattr(model, "predict_proba"):
+        return classes, np.asarray(model.predict_proba(df), dtype=np.float64), True
+    pred = [str(p) for p in model.predict(df)]
+    onehot = np.zeros((len(pred), len(classes)))
+    onehot[np.arange(len(pred)), [classes.index(p) for p in pred]] = 1.0
+    return classes, onehot, False
+
+
+def combine(results: dict, method: str) -> dict:
+    """Consensus over ``{name: (classes, scores, has_proba)}`` for the responding members."""
+    labels = sorted({c for classes, _, _ in results.values() for c in classes})
+    n = next(iter(results.values()))[1].shape[0]
+    total = np.zeros((n, len(labels)))
+    for classes, scores, _ in results.values():
+        idx = np.array([labels.index(c) for c in classes])
+        if method == "vote":
+            total[np.arange(n), idx[scores.argmax(axis=1)]] += 1.0
+        else:
+            total[:, idx] += scores
+    total /= len(results)
+    out = {"prediction": [labels[i] for i in total.argmax(axis=1)]}
+    key = "votes" if method == "vote" else "proba"
+    out[key] = [dict(zip(labels, np.round(row, 6).tolist())) for row in total]
+    return out
+
+
+class Ensemble:
+    def __init__(self, members: dict = None):
+        self.error = None
+        if members is None:
+            try:
+                members = resolve_members()
+            except (OSError, ValueError) as e:
+                logging.error("ensemble disabled: %s", e)
+                self.error, members = str(e), {}
+        self.members = {name: ModelState(path) for name, path in members.items()}
+        self._busy = {name: threading.Lock() for name in self.members}
+        self._executor = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.members)
+
+    def start(self, executor):
+        """Load the members; their predictions run as jobs on ``executor`` (the API's ``InferenceExecutor``)."""
+        if self._executor is None and self.members:
+            self._executor = executor
+            for m in self.members.values():
+                m.start()
+
+    def shutdown(self):
+        self._executor = None
+
+    def describe(self) -> dict:
+        return {name: m.describe() for name, m in self.members.items()}
+
+    def _run(self, name: str, df: pd.DataFrame):
+        return member_scores(self.members[name].model, df)
+
+    async def _member(self, name: str, df: pd.DataFrame, timeout_s: float):
+        state = self.members[name]
+        if not state.ready:
+            return name, {"status": state.status}, None
+        lock = self._busy[name]
+        if not lock.acquire(blocking=False):
+            return name, {"status": "busy"}, None
+        try:
+            fut = self._executor.submit(self._run, name, df)
+        except Overloaded:
+            lock.release()
+            return name, {"status": "overloaded"}, None
+        except BaseException:
+            lock.release()
+            raise
+        # released once the job is over: finished, failed, dropped as stale or cancelled while still queued
+        fut.add_done_callback(lambda f: lock.release())
+        try:
+            scores, timing = await asyncio.wait_for(asyncio.wrap_future(fut), timeout_s)
+        except asyncio.TimeoutError:
+            # a running job can't be interrupted; this member sits out until it finishes
+            return name, {"status": "timeout"}, None
+        except Overloaded:
+            return name, {"status": "overloaded"}, None
+        except Exception as e:
+            return name, {"status": "error", "error": str(e)}, None
+        classes, proba, has_proba = scores
+        info = {"status": "ok", "latency_ms": timing["compute_ms"], "queue_ms": timing["queue_ms"],
+                "model_version": state.version,
+                "prediction": [classes[i] for i in proba.argmax(axis=1)], "probabilistic": has_proba}
+        return name, info, scores
+
+    async def predict(self, X: np.ndarray, method: str = ENSEMBLE_METHOD, timeout_ms: float = ENSEMBLE_TIMEOUT_MS,
+                      names: list = None) -> dict:
+        names = names or list(self.members)
+        unknown = [n for n in names if n not in self.members]
+        if unknown:
+            raise KeyError(f"unknown ensemble members {unknown}; configured: {list(self.members)}")
+        df = pd.DataFrame(X, columns=FEATURES)
+        done = await asyncio.gather(*(self._member(n, df, timeout_ms / 1e3) for n in names))
+        results = {name: scores for name, _, scores in done if scores is not None}
+        out = {"prediction": None, "method": method, "members": {name: info for name, info, _ in done},
+               "responded": len(results), "requested": len(names), "partial": len(results) < len(names)}
+        if results:
+            out.update(combine(results, method))
+        return out
@@ -0,0 +1,155 @@
+"""Dedicated inference executor: fixed workers, capped native threads, bounded queue, fast rejections.
+
+Each request is one job. When the queue is full, ``submit`` fails immediately with ``Overloaded(429)``.
+A job that waited longer than ``INFER_QUEUE_TIMEOUT_S`` is dropped with ``Overloaded(503)`` before it
+runs, so a backlog is shed rather than served late. Both carry a ``Retry-After`` estimated from the
+queue depth and the recent compute time.
+
+Native thread pools are capped at ``INFER_THREADS`` by ``limit_native_threads``, called at the top of every
+thread that runs model code (inference workers, job workers, ensemble members, warm-up): OpenMP's thread
+count is a per-thread setting, so capping it once in the lifespan thread would leave the workers at the
+library default. With ``INFER_WORKERS`` workers, at most ``workers * threads`` native threads compute at any
+time. Estimators' own ``n_jobs`` (forests parallelise predict through joblib) are capped to the same value
+at load time.
+"""
+import asyncio
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+INFER_WORKERS = int(os.getenv("INFER_WORKERS", "2"))
+INFER_THREADS = int(os.getenv("INFER_THREADS", "1"))
+INFER_QUEUE_SIZE = int(os.getenv("INFER_QUEUE_SIZE", "64"))
+INFER_QUEUE_TIMEOUT_S = float(os.getenv("INFER_QUEUE_TIMEOUT_S", "2.0"))
+
+
+class Overloaded(Exception):
+    def __init__(self, status: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def limit_native_threads(n_threads: int = INFER_THREADS):
+    """Cap BLAS / OpenMP threads for the calling thread (and the process-wide BLAS pools); lasts for the thread."""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return None
+    return threadpool_limits(limits=max(n_threads, 1))
+
+
+def limit_model_threads(model, n_threads: int = INFER_THREADS):
+    """Cap every ``n_jobs`` parameter of a (pipeline) estimator; no-op for models without params."""
+    if not hasattr(model, "get_params"):
+        return model
+    caps = {k: n_threads for k, v in model.get_params(deep=True).items()
+            if k.endswith("n_jobs") and (v is None or v < 0 or v > n_threads)}
+    if caps:
+        model.set_params(**caps)
+    return model
+
+
+class InferenceExecutor:
+    def __init__(self, workers: int = INFER_WORKERS, threads: int = INFER_THREADS,
+                 queue_size: int = INFER_QUEUE_SIZE, queue_timeout: float = INFER_QUEUE_TIMEOUT_S):
+        self.workers = max(workers, 1)
+        self.threads = max(threads, 1)
+        self.queue_timeout = queue_timeout
+        self._queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wait_ms = deque(maxlen=512)
+        self._compute_ms = deque(maxlen=512)
+        self.counts = {"completed": 0, "failed": 0, "rejected_full": 0, "rejected_stale": 0}
+
+    def start(self):
+        if self._threads:
+            return
+        try:
+            import threadpoolctl  # noqa: F401
+        except ImportError:
+            logging.warning("threadpoolctl not installed; native thread pools are not capped")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"infer-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained (at least 1)."""
+        with self._lock:
+            per_job = float(np.median(self._compute_ms)) / 1e3 if self._compute_ms else 0.05
+        return max(1, math.ceil(self._queue.qsize() * per_job / self.workers))
+
+    def submit(self, fn, *args) -> Future:
+        fut = Future()
+        try:
+            self._queue.put_nowait((fut, fn, args, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self.counts["rejected_full"] += 1
+            raise Overloaded(429, "inference queue full", self.retry_after())
+        return fut
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` on a worker; returns ``(result, {"queue_ms", "compute_ms"})``."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _work(self):
+        limit_native_threads(self.threads)
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            fut, fn, args, enqueued = job
+            if not fut.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            wait_ms = (start - enqueued) * 1e3
+            if wait_ms > self.queue_timeout * 1e3:
+                with self._lock:
+                    self.counts["rejected_stale"] += 1
+                fut.set_exception(Overloaded(503, f"queued {wait_ms:.0f}ms, over the {self.queue_timeout}s budget",
+                                             self.retry_after()))
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                with self._lock:
+                    self.counts["failed"] += 1
+                fut.set_exception(e)
+                continue
+            compute_ms = (time.perf_counter() - start) * 1e3
+            with self._lock:
+                self.counts["completed"] += 1
+                self._wait_ms.append(wait_ms)
+                self._compute_ms.append(compute_ms)
+            fut.set_result((result, {"queue_ms": round(wait_ms, 3), "compute_ms": round(compute_ms, 3)}))
+
+    def stats(self) -> dict:
+        with self._lock:
+            wait, comp = list(self._wait_ms), list(self._compute_ms)
+            counts = dict(self.counts)
+
+        def pct(xs, q):
+            return round(float(np.percentile(xs, q)), 3) if xs else None
+        return {"workers": self.workers, "threads_per_worker": self.threads,
+                "queue_depth": self._queue.qsize(), "queue_capacity": self._queue.maxsize,
+                "queue_timeout_s": self.queue_timeout, **counts,
+                "queue_ms": {"p50": pct(wait, 50), "p95": pct(wait, 95)},
+                "compute_ms": {"p50": pct(comp, 50), "p95": pct(comp, 95)}}
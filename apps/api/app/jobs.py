@@ -0,0 +1,328 @@
+"""Background scoring jobs for large catalogs: upload a CSV / Parquet file, poll progress, download the results.
+
+Each job is a folder ``JOBS_DIR/<id>/`` holding the upload (``input.csv`` / ``input.parquet``), its state
+(``job.json``, rewritten atomically after every change), one predictions file per finished chunk under ``parts/``,
+and finally ``result.<format>``. Workers score chunk by chunk with the same code as ``exo_ml infer``
+(``infer.align`` + ``infer.score_frame``, including the artifact's light-curve / sky joins) on the served model.
+On startup, queued and running jobs are picked up again from their first unfinished chunk. If the model changed
+in between, the job is restarted from scratch so one result never mixes two models.
+
+Job workers call the model directly rather than through the inference executor, so large chunks never queue
+ahead of interactive requests; budget ``JOBS_WORKERS`` next to ``INFER_WORKERS`` when sizing a replica.
+
+- ``JOBS_DIR`` — job storage (default ``./jobs``)
+- ``JOBS_WORKERS`` — jobs scored concurrently (default ``1``)
+- ``JOBS_CHUNK_ROWS`` — rows per chunk, i.e. per progress / resume step (default ``50000``)
+- ``JOBS_MAX_UPLOAD_MB`` — upload size limit (default ``2048``)
+
+Jobs run on the ``exo_ml`` pipeline package, imported on first use; a deploy without it (``pipeline/`` not on
+``PYTHONPATH``) still serves every other endpoint and answers job requests with 503.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from .executor import limit_native_threads
+from .features import FEATURES
+from .utils import MODEL_PATH
+
+JOBS_DIR = os.getenv("JOBS_DIR", "./jobs")
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "1"))
+JOBS_CHUNK_ROWS = int(os.getenv("JOBS_CHUNK_ROWS", "50000"))
+JOBS_MAX_UPLOAD_MB = float(os.getenv("JOBS_MAX_UPLOAD_MB", "2048"))
+
+ACTIVE = ("queued", "running")
+MEDIA_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet",
+               "arrow": "application/vnd.apache.arrow.file"}
+
+
+class JobError(Exception):
+    def __init__(self, msg: str, status: int = 400):
+        super().__init__(msg)
+        self.status = status
+
+
+def _write_json(path: Path, obj: dict):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj, indent=2))
+    os.replace(tmp, path)
+
+
+def _require_pyarrow(what: str):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise JobError(f"{what} needs pyarrow installed on the server", status=415)
+
+
+def _require_exo_ml():
+    try:
+        import exo_ml  # noqa: F401
+    except ImportError:
+        raise JobError("background jobs need the exo_ml pipeline package on the server", status=503)
+
+
+def artifact_context(model_path: str = MODEL_PATH):
+    """``(feature_columns, metadata, (lc, sky), dtype plan)`` of the served artifact; API defaults when files are
+    missing."""
+    from exo_ml.data import load_plan
+    from exo_ml.infer import load_joins
+
+    p = Path(model_path)
+    art = p if p.is_dir() else p.parent
+    feat = art / "feature_columns.json"
+    meta = art / "metadata.json"
+    return (json.loads(feat.read_text()) if feat.exists() else list(FEATURES),
+            json.loads(meta.read_text()) if meta.exists() else {},
+            load_joins(art), load_plan(art))
+
+
+class JobManager:
+    def __init__(self, root: str = JOBS_DIR, workers: int = JOBS_WORKERS, chunk_rows: int = JOBS_CHUNK_ROWS):
+        self.root = Path(root)
+        self.workers = max(workers, 1)
+        self.chunk_rows = max(chunk_rows, 1)
+        self.jobs = {}
+        self.state = None
+        self._context = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self, state):
+        """Reload persisted jobs, requeue unfinished ones (oldest first) and start the workers."""
+        if self._threads:
+            return
+        self.state = state
+        self.root.mkdir(parents=True, exist_ok=True)
+        for d in self.root.iterdir():
+            f = d / "job.json"
+            if not f.exists():
+                if (d / "upload.tmp").exists() or any(d.glob("input.*")):   # upload interrupted by the restart
+                    shutil.rmtree(d, ignore_errors=True)
+                continue
+            try:
+                job = json.loads(f.read_text())
+            except (OSError, ValueError):
+                logging.warning("skipping unreadable job state %s", f)
+                continue
+            if job["status"] == "cancelled":        # cancelled mid-chunk before the restart
+                shutil.rmtree(d, ignore_errors=True)
+                continue
+            self.jobs[job["id"]] = job
+        for job in sorted(self.jobs.values(), key=lambda j: j["created_at"]):
+            if job["status"] in ACTIVE:
+                self._update(job["id"], status="queued")
+                self._queue.put(job["id"])
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"jobs-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def shutdown(self):
+        # running chunks finish in their daemon thread; their job resumes from that chunk on the next start
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    def _dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def _update(self, job_id: str, **fields) -> dict:
+        with self._lock:
+            job = self.jobs[job_id]
+            job.update(fields, updated_at=time.time())
+            snapshot = dict(job)
+        if self._dir(job_id).exists():
+            _write_json(self._dir(job_id) / "job.json", snapshot)
+        return snapshot
+
+    # --- requests -------------------------------------------------------------------------------------------
+
+    async def create(self, stream, input_format: str = None, output_format: str = "csv", with_proba: bool = False,
+                     keep_columns: str = "auto", filename: str = None) -> dict:
+        """Spool the upload to disk (never held in memory) and queue the job."""
+        _require_exo_ml()
+        from exo_ml.outputs import FORMATS
+
+        if output_format not in FORMATS:
+            raise JobError(f"output must be one of {sorted(FORMATS)}")
+        if output_format != "csv":
+            _require_pyarrow(f"{output_format} output")
+        if input_format not in (None, "csv", "parquet"):
+            raise JobError("format must be csv or parquet")
+        job_id = uuid.uuid4().hex
+        d = self._dir(job_id)
+        d.mkdir(parents=True)
+        upload, size, limit = d / "upload.tmp", 0, JOBS_MAX_UPLOAD_MB * (1 << 20)
+        try:
+            with open(upload, "wb") as f:
+                async for chunk in stream:
+                    size += len(chunk)
+                    if size > limit:
+                        raise JobError(f"upload larger than {JOBS_MAX_UPLOAD_MB:g} MB", status=413)
+                    f.write(chunk)
+            if not size:
+                raise JobError("empty upload")
+            if input_format is None:
+                with open(upload, "rb") as f:
+                    input_format = "parquet" if f.read(4) == b"PAR1" else "csv"
+            if input_format == "parquet":
+                _require_pyarrow("Parquet input")
+        except BaseException:
+            shutil.rmtree(d, ignore_errors=True)
+            raise
+        os.replace(upload, d / f"input.{input_format}")
+
+        now = time.time()
+        job = {"id": job_id, "status": "queued", "created_at": now, "updated_at": now, "started_at": None,
+               "finished_at": None, "error": None,
+               "input": {"format": input_format, "bytes": size, "filename": filename},
+               "options": {"output_format": output_format, "with_proba": with_proba, "keep_columns": keep_columns},
+               "chunk_rows": self.chunk_rows, "rows_total": None, "rows_done": 0, "chunks_done": 0,
+               "compute_s": 0.0, "model_version": None, "model_fingerprint": None, "result": None}
+        with self._lock:
+            self.jobs[job_id] = job
+        _write_json(d / "job.json", job)
+        self._queue.put(job_id)
+        return self.describe(job_id)
+
+    def describe(self, job_id: str) -> dict:
+        """Job state plus ``progress``: fraction done, throughput (rows per scoring second) and ETA."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise JobError(f"no job {job_id}", status=404)
+            job = dict(job)
+        total, done = job["rows_total"], job["rows_done"]
+        rate = done / job["compute_s"] if job["compute_s"] > 0 else None
+        eta = (max(total - done, 0) / rate if rate and total is not None and job["status"] in ACTIVE else None)
+        job["progress"] = {"fraction": round(done / total, 4) if total else (1.0 if job["status"] == "done" else None),
+                           "rows_per_s": round(rate, 1) if rate else None,
+                           "eta_s": round(eta, 1) if eta is not None else None}
+        return job
+
+    def list(self) -> list:
+        with self._lock:
+            ids = sorted(self.jobs, key=lambda i: self.jobs[i]["created_at"], reverse=True)
+        return [self.describe(i) for i in ids]
+
+    def result(self, job_id: str):
+        """``(path, media_type)`` of a finished job's predictions."""
+        from exo_ml.outputs import FORMATS
+
+        job = self.describe(job_id)
+        if job["status"] != "done":
+            raise JobError(f"job is {job['status']}", status=409)
+        fmt = job["options"]["output_format"]
+        return self._dir(job_id) / f"result{FORMATS[fmt]}", MEDIA_TYPES[fmt]
+
+    def delete(self, job_id: str) -> dict:
+        """Cancel an unfinished job and remove its files (a running job stops after its current chunk)."""
+        job = self.describe(job_id)
+        with self._lock:
+            running = self.jobs.get(job_id, {}).get("status") == "running"
+            if not running:
+                self.jobs.pop(job_id, None)
+        if running:
+            return self._update(job_id, status="cancelled")
+        shutil.rmtree(self._dir(job_id), ignore_errors=True)
+        return dict(job, status="deleted")
+
+    # --- workers --------------------------------------------------------------------------------------------
+
+    def _work(self):
+        limit_native_threads()
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is None or job["status"] != "queued":
+                    continue
+                job["status"] = "running"
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logging.exception("job %s failed", job_id)
+                if job_id in self.jobs:
+                    self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def _wait_for_model(self):
+        while not self.state.wait(1.0):
+            if self.state.status == "failed":
+                raise RuntimeError(f"model failed to load: {self.state.error}")
+
+    def _cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            cancelled = self.jobs[job_id]["status"] == "cancelled"
+            if cancelled:
+                self.jobs.pop(job_id)
+        if cancelled:
+            shutil.rmtree(self._dir(job_id), ignore_errors=True)
+        return cancelled
+
+    def _run(self, job_id: str):
+        from exo_ml.data import count_rows, iter_table
+        from exo_ml.infer import align, score_frame
+        from exo_ml.outputs import FORMATS, concat_parts, write_predictions
+
+        self._wait_for_model()
+        if self._context is None:
+            self._context = artifact_context(self.state.path)
+        feat_cols, meta, (lc, sky), plan = self._context
+        model, drop_cols = self.state.model, meta.get("drop_cols", [])
+        classes = meta.get("classes") or list(getattr(model, "classes_", [])) or None
+
+        job, d = self.jobs[job_id], self._dir(job_id)
+        parts = d / "parts"
+        if job["chunks_done"] and job["model_fingerprint"] != self.state.fingerprint:
+            logging.info("job %s: model changed since it started, rescoring from the first chunk", job_id)
+            shutil.rmtree(parts, ignore_errors=True)
+            job = self._update(job_id, chunks_done=0, rows_done=0, compute_s=0.0)
+        parts.mkdir(exist_ok=True)
+        source = d / f"input.{job['input']['format']}"
+        job = self._update(job_id, status="running", started_at=job["started_at"] or time.time(),
+                           model_version=self.state.version, model_fingerprint=self.state.fingerprint)
+        if job["rows_total"] is None:
+            job = self._update(job_id, rows_total=count_rows(source))
+
+        opts = job["options"]
+        fmt, ext = opts["output_format"], FORMATS[opts["output_format"]]
+        done, rows_done, compute_s = job["chunks_done"], job["rows_done"], job["compute_s"]
+        for i, chunk in enumerate(iter_table(source, job["chunk_rows"], plan)):
+            if i < done:
+                continue
+            if self._cancelled(job_id):
+                return
+            t0 = time.perf_counter()
+            df_raw, X = align(chunk, feat_cols, drop_cols, lc, sky)
+            preds = score_frame(model, X, classes, opts["with_proba"])
+            part = parts / f"part-{i:06d}{ext}"
+            tmp = part.with_name(part.name + ".tmp")
+            write_predictions(df_raw.drop(columns=drop_cols, errors="ignore"), preds, tmp, fmt, opts["keep_columns"])
+            os.replace(tmp, part)
+            rows_done += len(chunk)
+            compute_s += time.perf_counter() - t0
+            self._update(job_id, chunks_done=i + 1, rows_done=rows_done, compute_s=round(compute_s, 4))
+
+        if self._cancelled(job_id):
+            return
+        result = d / f"result{ext}"
+        files = sorted(parts.glob(f"part-*{ext}"))
+        if files:
+            concat_parts(files, result, fmt)
+        else:
+            import pandas as pd
+            write_predictions(None, pd.DataFrame({"pred_label": []}), result, fmt)
+        shutil.rmtree(parts, ignore_errors=True)
+        self._update(job_id, status="done", finished_at=time.time(), rows_total=rows_done,
+                     result={"format": fmt, "bytes": result.stat().st_size})
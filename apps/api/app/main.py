@@ -1,37 +1,325 @@
-from fastapi import FastAPI, HTTPException
-from .schemas import PredictRequest, PredictResponse
-from .validate import validate_and_vectorize
-from .utils import load_model
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+from starlette.requests import ClientDisconnect
+from .schemas import PredictRequest, PredictResponse, BatchPredictRequest, BatchPredictResponse
+from . import codecs, streaming
+from .state import ModelState
+from .executor import InferenceExecutor, Overloaded
+from .ensemble import Ensemble, METHODS, ENSEMBLE_METHOD, ENSEMBLE_TIMEOUT_MS
+from .drift import DriftMonitor
+from .similar import SimilarIndex
+from .jobs import JobManager, JobError
+from .cache import PredictionCache, feature_key
 from .features import FEATURES
+from .utils import EXPLAIN_METHOD, EXPLAIN_TREESHAP_BUDGET
 import pandas as pd
+import asyncio
 import logging
+import time
 
-app = FastAPI(title="RF Inference")
+state = ModelState()
+cache = PredictionCache()
+executor = InferenceExecutor()
+ensemble = Ensemble()
+drift = DriftMonitor()
+similar = SimilarIndex()
+jobs = JobManager()
 
-try:
-    model = load_model()
-except Exception as e:
-    logging.exception("Model load failed")
-    raise RuntimeError(f"Failed to load model: {e}")
 
-MODEL_VERSION = getattr(model, "version", None)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executor.start()
+    # load + warm up in the background so the process accepts liveness probes immediately
+    state.start()
+    ensemble.start(executor)
+    drift.start()
+    similar.start()
+    jobs.start(state)
+    yield
+    jobs.shutdown()
+    drift.shutdown()
+    ensemble.shutdown()
+    executor.shutdown()
+
+
+app = FastAPI(title="RF Inference", lifespan=lifespan)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
+@app.get("/health/live")
+def live():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def ready():
+    code = 200 if state.ready else 503
+    return JSONResponse(state.describe(), status_code=code, headers=None if state.ready else {"Retry-After": "1"})
+
+@app.get("/cache/stats")
+def cache_stats():
+    return cache.stats()
+
+@app.get("/executor/stats")
+def executor_stats():
+    return executor.stats()
+
+@app.get("/drift")
+def drift_report(psi: float = 0.2, ks: float = 0.1, min_count: int = 30, include_sketches: bool = False):
+    return drift.report(include_sketches, psi_threshold=psi, ks_threshold=ks, min_count=min_count)
+
+@app.post("/drift/reset")
+def drift_reset():
+    if drift.active:
+        drift.reset()
+    return {"status": drift.status}
+
+def _body_spec(model) -> dict:
+    # the routes read the raw body (content negotiation), so document the accepted encodings by hand
+    schema = model.model_json_schema()
+    return {"requestBody": {"required": True, "content": {
+        codecs.JSON: {"schema": schema},
+        codecs.MSGPACK: {"schema": schema},
+        codecs.ARROW: {"schema": {"type": "string", "format": "binary"}},
+    }}}
+
+
+async def _read_rows(request: Request, require_ready: bool = True, accept=codecs.SUPPORTED):
+    """Negotiate the response type, then decode the body into an ordered feature matrix."""
+    out_mt = codecs.negotiate(request.headers.get("accept"))
+    if out_mt not in accept:
+        raise HTTPException(status_code=406, detail=f"Accept one of {', '.join(accept)}")
+    if require_ready and not state.ready:
+        raise HTTPException(status_code=503, detail=f"model {state.status}", headers={"Retry-After": "1"})
+    try:
+        X = codecs.decode_rows(await request.body(), request.headers.get("content-type"))
+    except codecs.CodecError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    return X, out_mt
+
+
+async def _infer(fn, *args):
+    """Run on the inference executor; overload becomes 429 / 503 with Retry-After."""
+    try:
+        return await executor.run(fn, *args)
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+
+def _respond(payload: dict, timing: dict, mt: str) -> Response:
+    try:
+        body = codecs.encode(payload, mt)
+    except codecs.CodecError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    # queue wait and compute reported separately (visible in browser devtools / most APM agents)
+    server_timing = f"queue;dur={timing['queue_ms']}, compute;dur={timing['compute_ms']}"
+    return Response(body, media_type=mt, headers={"Server-Timing": server_timing})
+
+
+@app.post("/predict", response_model=PredictResponse, response_model_exclude_none=True,
+          openapi_extra=_body_spec(PredictRequest))
+async def predict(request: Request, explain: bool = False):
+    X, out_mt = await _read_rows(request)
+    if len(X) != 1:
+        raise HTTPException(status_code=400, detail=f"Invalid features: expected 1 row, got {len(X)} (use /predict/batch)")
+    drift.observe(X)
+    return _respond(*await _infer(predict_one, X[0], explain), out_mt)
+
+
+@app.post("/predict/batch", response_model=BatchPredictResponse, openapi_extra=_body_spec(BatchPredictRequest))
+async def predict_batch(request: Request):
+    X, out_mt = await _read_rows(request)
+    drift.observe(X)
+    return _respond(*await _infer(predict_many, X), out_mt)
+
+
+@app.post("/predict/stream", openapi_extra={"requestBody": {"required": True, "content": {
+    streaming.NDJSON: {"schema": {"type": "string", "description": "one JSON object of FEATURES per line"}}}}})
+async def predict_stream(request: Request):
+    """Score an NDJSON upload incrementally; one result line per input line, then a ``summary`` line."""
+    if not streaming.accepts_ndjson(request.headers.get("accept")):
+        raise HTTPException(status_code=406, detail=f"Accept {streaming.NDJSON}")
+    if not state.ready:
+        raise HTTPException(status_code=503, detail=f"model {state.status}", headers={"Retry-After": "1"})
+    return streaming.DuplexStreamingResponse(stream_predictions(request), media_type=streaming.NDJSON,
+                                             headers={"X-Model-Version": str(state.version or "")})
+
+
+async def _infer_waiting(fn, *args, max_wait_s: float = 30.0):
+    """Like ``_infer`` but waits out overload: a streaming response can't turn into a 429 once it started."""
+    waited = 0.0
+    while True:
+        try:
+            return await executor.run(fn, *args)
+        except Overloaded as e:
+            if waited >= max_wait_s:
+                raise
+            await asyncio.sleep(e.retry_after)
+            waited += e.retry_after
+
+
+async def stream_predictions(request: Request):
+    batcher = streaming.Batcher()
+    try:
+        async for chunk in streaming.lines(request.stream()):
+            errors, batches = batcher.split(chunk)
+            if errors:
+                yield b"".join(streaming.dump(e) for e in errors)
+            for nos, ids, X in batches:
+                drift.observe(X)
+                out, _ = await _infer_waiting(predict_many, X)
+                yield streaming.records(nos, ids, out["prediction"])
+    except ClientDisconnect:
+        return
+    except Overloaded as e:
+        yield streaming.dump({"error": e.detail, "fatal": True})
+        return
+    except (HTTPException, ValueError) as e:
+        yield streaming.dump({"error": str(getattr(e, "detail", e)), "fatal": True})
+        return
+    yield streaming.dump({"summary": {"rows": batcher.rows, "errors": batcher.errors, "model_version": state.version}})
+
+
+@app.get("/ensemble")
+def ensemble_status():
+    out = {"members": ensemble.describe(), "method": ENSEMBLE_METHOD, "timeout_ms": ENSEMBLE_TIMEOUT_MS}
+    if ensemble.error:
+        out["error"] = ensemble.error
+    return out
+
+
+@app.post("/predict/ensemble", openapi_extra=_body_spec(BatchPredictRequest))
+async def predict_ensemble(request: Request, method: str = ENSEMBLE_METHOD, timeout_ms: float = ENSEMBLE_TIMEOUT_MS,
+                           models: str = None):
+    if not ensemble.enabled:
+        detail = f"ensemble disabled: {ensemble.error}" if ensemble.error else "no ensemble configured (set ENSEMBLE_MODELS)"
+        raise HTTPException(status_code=404, detail=detail)
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {METHODS}")
+    # nested per-member output: JSON / MessagePack only
+    X, out_mt = await _read_rows(request, require_ready=False, accept=(codecs.JSON, codecs.MSGPACK))
+    names = [m.strip() for m in models.split(",") if m.strip()] if models else None
+    t0 = time.perf_counter()
+    try:
+        out = await ensemble.predict(X, method=method, timeout_ms=timeout_ms, names=names)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    if not out["responded"]:
+        raise HTTPException(status_code=503, detail={"message": "no ensemble member responded", "members": out["members"]},
+                            headers={"Retry-After": "1"})
+    timing = {"queue_ms": 0, "compute_ms": round((time.perf_counter() - t0) * 1e3, 3)}
+    return _respond(out, timing, out_mt)
+
+
+@app.get("/similar")
+def similar_status():
+    return similar.describe()
+
+
+@app.post("/similar", openapi_extra=_body_spec(BatchPredictRequest))
+async def find_similar(request: Request, k: int = 5, classes: str = None):
+    """k nearest labelled training objects per row (overall, or per class with ``classes=CP,FP``)."""
+    if not similar.active:
+        raise HTTPException(status_code=404, detail=f"no similar-objects index ({similar.status})")
+    if k < 1:
+        raise HTTPException(status_code=400, detail="k must be >= 1")
+    names = [c.strip() for c in classes.split(",") if c.strip()] if classes else None
+    unknown = [c for c in names or [] if c not in similar.index.classes]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown classes {unknown}; index has {similar.index.classes}")
+    # nested per-row output: JSON / MessagePack only
+    X, out_mt = await _read_rows(request, accept=(codecs.JSON, codecs.MSGPACK))
+    return _respond(*await _infer(similar_rows, X, k, names), out_mt)
+
+
+def similar_rows(X, k: int, classes=None) -> dict:
+    neighbors = similar.query(state.model, pd.DataFrame(X, columns=FEATURES), k, classes) if len(X) else []
+    return {"neighbors": neighbors, "model_version": state.version}
+
+
+@app.post("/jobs", status_code=202, openapi_extra={"requestBody": {"required": True, "content": {
+    "text/csv": {"schema": {"type": "string", "format": "binary"}},
+    "application/vnd.apache.parquet": {"schema": {"type": "string", "format": "binary"}}}}})
+async def submit_job(request: Request, format: str = None, output: str = "csv", with_proba: bool = False,
+                     keep_columns: str = "auto", filename: str = None):
+    """Queue a catalog (raw CSV / Parquet body) for background scoring; poll ``Location`` for progress."""
     try:
-        vec = validate_and_vectorize(req.features)
-        df = pd.DataFrame([vec], columns=FEATURES)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid features: {e}")
+        job = await jobs.create(request.stream(), format, output, with_proba, keep_columns, filename)
+    except JobError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    return JSONResponse(job, status_code=202, headers={"Location": f"/jobs/{job['id']}"})
+
 
+def _job_call(fn, job_id: str):
     try:
-        pred = model.predict(df).tolist()
+        return fn(job_id)
+    except JobError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+
+
+@app.get("/jobs")
+def list_jobs():
+    return {"jobs": jobs.list()}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    return _job_call(jobs.describe, job_id)
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    path, mt = _job_call(jobs.result, job_id)
+    return FileResponse(path, media_type=mt, filename=f"predictions-{job_id}{path.suffix}")
+
+
+@app.delete("/jobs/{job_id}")
+def delete_job(job_id: str):
+    """Cancel (if unfinished) and remove a job with its files."""
+    return _job_call(jobs.delete, job_id)
+
+
+def _model_predict(df: pd.DataFrame) -> list:
+    try:
+        return state.model.predict(df).tolist()
     except Exception:
         logging.exception("inference failed")
         raise HTTPException(status_code=500, detail="inference failed")
 
-    return {"prediction": pred, "model_version": getattr(model, "version", None)}
+
+def predict_one(vec, explain: bool = False) -> dict:
+    df = pd.DataFrame(vec[None, :], columns=FEATURES)
+    key = feature_key(vec, state.fingerprint)
+    pred = cache.get(key, state.fingerprint)
+    if pred is None:
+        pred = _model_predict(df)
+        cache.put(key, state.fingerprint, pred)
+
+    out = {"prediction": pred, "model_version": state.version}
+    if explain:
+        out["attributions"], out["attribution_method"] = explain_row(df, pred[0])
+    return {k: v for k, v in out.items() if v is not None}
+
+
+def predict_many(X) -> dict:
+    pred = _model_predict(pd.DataFrame(X, columns=FEATURES)) if len(X) else []
+    return {"prediction": pred, "model_version": state.version}
+
+
+def explain_row(df: pd.DataFrame, label) -> tuple[dict, str]:
+    try:
+        from exo_ml.explain import get_explainer  # precomputation is cached per loaded model
+    except ImportError:
+        raise HTTPException(status_code=503, detail="explanations need the exo_ml package on the server")
+    try:
+        exp = get_explainer(state.model)
+    except (TypeError, AttributeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"explanations not available for this model: {e}")
+    method = EXPLAIN_METHOD
+    # exact TreeSHAP is a Python-level walk per node; never let a deep forest pin an inference worker
+    if method == "treeshap" and EXPLAIN_TREESHAP_BUDGET and exp.treeshap_cost > EXPLAIN_TREESHAP_BUDGET:
+        method = "saabas"
+    attr = exp.explain_frame(df, exp.classes.index(str(label)), method)
+    return {k: float(v) for k, v in attr.iloc[0].items()}, method
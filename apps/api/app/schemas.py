@@ -9,3 +9,14 @@ class PredictRequest(BaseModel):
 class PredictResponse(BaseModel):
     prediction: List
     model_version: Optional[str] = None
+    # per-feature attributions for the predicted class (only with ?explain=true)
+    attributions: Optional[Dict[str, float]] = None
+    attribution_method: Optional[str] = None
+
+class BatchPredictRequest(BaseModel):
+    # one {feature: value} object per row; MessagePack bodies may instead send {"columns": [...], "data": [[...]]}
+    rows: List[Dict[str, float]]
+
+class BatchPredictResponse(BaseModel):
+    prediction: List
+    model_version: Optional[str] = None
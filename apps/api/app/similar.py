@@ -0,0 +1,62 @@
+"""Nearest labelled training objects for the served model (``neighbors.joblib`` from ``exo_ml.neighbors``).
+
+The index is built at training time over the model's fitted preprocessor output, so queries only need the
+served pipeline's ``preprocessor`` step plus one matrix product per partition.
+
+- ``SIMILAR_INDEX_PATH`` — index file or artifact folder (default: next to ``MODEL_PATH``)
+- ``SIMILAR_MAX_K`` — upper bound for ``k`` (default ``50``)
+
+Without the ``exo_ml`` pipeline package the index reports ``unavailable``.
+"""
+import logging
+import os
+from pathlib import Path
+
+from .utils import MODEL_PATH
+
+SIMILAR_INDEX_PATH = os.getenv("SIMILAR_INDEX_PATH", "")
+SIMILAR_MAX_K = int(os.getenv("SIMILAR_MAX_K", "50"))
+
+
+def index_path(model_path: str = MODEL_PATH) -> Path:
+    from exo_ml.neighbors import NEIGHBORS_FILE
+
+    if SIMILAR_INDEX_PATH:
+        return Path(SIMILAR_INDEX_PATH)
+    p = Path(model_path)
+    return (p if p.is_dir() else p.parent) / NEIGHBORS_FILE
+
+
+class SimilarIndex:
+    def __init__(self, path: Path = None):
+        self.path = path
+        self.status = "starting"
+        self.index = None
+
+    @property
+    def active(self) -> bool:
+        return self.status == "active"
+
+    def start(self):
+        try:
+            from exo_ml.neighbors import NeighborIndex
+        except ImportError:
+            self.status = "unavailable"
+            logging.info("similar-objects index off: the exo_ml package is not installed")
+            return
+        path = self.path or index_path()
+        try:
+            self.index = NeighborIndex.load(path)
+            self.status = "active"
+        except FileNotFoundError:
+            self.status = "no_index"
+            logging.info("similar-objects index off: %s not found", path)
+
+    def describe(self) -> dict:
+        out = {"status": self.status, "max_k": SIMILAR_MAX_K}
+        if self.active:
+            out.update(self.index.describe())
+        return out
+
+    def query(self, model, df, k: int, classes=None) -> list:
+        return self.index.records(self.index.transform(model, df), min(k, SIMILAR_MAX_K), classes)
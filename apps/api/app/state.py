@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .features import FEATURES
+from .utils import load_model, MODEL_PATH
+from .executor import limit_model_threads, limit_native_threads
+
+WARMUP_BATCH_SIZES = [int(b) for b in os.getenv("WARMUP_BATCH_SIZES", "1,32").split(",") if b.strip()]
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))
+# Single-row p50 the replica must reach during warm-up before reporting ready (0 = no target). Measured on
+# its own single-row frame, whether or not 1 is in WARMUP_BATCH_SIZES.
+READY_MAX_LATENCY_MS = float(os.getenv("READY_MAX_LATENCY_MS", "0"))
+# seconds between latency re-checks while the target is missed (the replica stays live but not ready)
+READY_RETRY_S = float(os.getenv("READY_RETRY_S", "30"))
+
+
+def warmup_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Representative rows: mostly finite values with a sprinkling of NaNs (exercises the imputers)."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES)))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return pd.DataFrame(X, columns=FEATURES)
+
+
+def model_fingerprint(path: str) -> str:
+    """Identity of the loaded artifact (path + size + mtime), taken once at load.
+
+    Nothing watches ``MODEL_PATH``: a swapped file is picked up (and gets a new fingerprint) on restart.
+    """
+    st = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:16]
+
+
+class ModelState:
+    """Loads the model off the request path, warms it up and tracks liveness / readiness."""
+
+    def __init__(self, path: str = MODEL_PATH):
+        self.path = path
+        self.status = "starting"
+        self.model = None
+        self.version = None
+        self.fingerprint = None
+        self.error = None
+        self.timings = {}
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load_and_warm, name="model-warmup", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _load_and_warm(self):
+        # warm up under the same native thread caps the inference workers run with
+        limit_native_threads()
+        try:
+            self.status = "loading"
+            t0 = time.perf_counter()
+            model = limit_model_threads(load_model(self.path))
+            self.timings["load_s"] = round(time.perf_counter() - t0, 4)
+
+            self.status = "warming"
+            self.timings["warmup"] = self._warmup(model)
+            self.timings["warmup_s"] = round(time.perf_counter() - t0 - self.timings["load_s"], 4)
+            while READY_MAX_LATENCY_MS:
+                p50 = self._single_row_p50(model)
+                self.timings["single_row_p50_ms"] = p50
+                if p50 <= READY_MAX_LATENCY_MS:
+                    self.error = None
+                    break
+                # e.g. a noisy neighbour: stay live but unready and measure again later rather than give up
+                self.status = "slow"
+                self.error = f"single-row p50 {p50}ms exceeds READY_MAX_LATENCY_MS={READY_MAX_LATENCY_MS}"
+                logging.warning("%s; re-checking in %ss", self.error, READY_RETRY_S)
+                time.sleep(READY_RETRY_S)
+
+            self.model = model
+            self.version = getattr(model, "version", None)
+            self.fingerprint = self.version or model_fingerprint(self.path)
+            self.status = "ready"
+            self._ready.set()
+            logging.info("model ready: %s", self.timings)
+        except Exception as e:
+            logging.exception("Model load failed")
+            self.error = str(e)
+            self.status = "failed"
+
+    def _warmup(self, model) -> dict:
+        """Run each batch size a few times; the first call pays lazy init inside sklearn/pandas."""
+        out = {}
+        for size in WARMUP_BATCH_SIZES:
+            df = warmup_frame(size)
+            lat = []
+            for _ in range(max(WARMUP_ROUNDS, 1)):
+                t0 = time.perf_counter()
+                model.predict(df)
+                lat.append((time.perf_counter() - t0) * 1e3)
+            out[str(size)] = {"first_ms": round(lat[0], 3), "p50_ms": round(float(np.median(lat[1:] or lat)), 3)}
+        return out
+
+    @staticmethod
+    def _single_row_p50(model, window: int = 7, max_calls: int = 50) -> float:
+        """Median single-row latency over the last ``window`` calls, once it settles under target (bounded)."""
+        df = warmup_frame(1)
+        lat = []
+        for _ in range(max_calls):
+            t0 = time.perf_counter()
+            model.predict(df)
+            lat.append((time.perf_counter() - t0) * 1e3)
+            if len(lat) >= window and np.median(lat[-window:]) <= READY_MAX_LATENCY_MS:
+                break
+        return round(float(np.median(lat[-window:])), 3)
+
+    def describe(self) -> dict:
+        out = {"status": self.status, "model_version": self.version, "timings": self.timings}
+        if self.error:
+            out["error"] = self.error
+        return out
@@ -0,0 +1,124 @@
+"""Newline-delimited JSON scoring: read rows from a chunked upload, stream predictions back per batch.
+
+Each body line is one row: a flat ``{name: value}`` object or ``{"features": {...}, "id": ...}`` (``id`` is
+echoed back). Complete lines are scored as soon as their chunk arrives, in batches of at most
+``STREAM_BATCH_ROWS``, and the next chunk is only read once the previous results are written. Memory is therefore
+bounded by one body chunk plus one batch, whatever the upload size.
+
+Starlette's ``StreamingResponse`` listens for ``http.disconnect`` by consuming ``receive()`` while the body is
+being sent, which would swallow the rest of the upload. ``DuplexStreamingResponse`` only sends; the request
+stream raises ``ClientDisconnect`` on disconnect, which ends the generator.
+
+- ``STREAM_BATCH_ROWS`` — max rows per inference call (default ``256``)
+- ``STREAM_MAX_LINE_BYTES`` — longest accepted line (default ``1 MiB``); longer lines end the stream with an error
+"""
+from __future__ import annotations
+import json
+import os
+
+import numpy as np
+from starlette.responses import StreamingResponse
+
+from .validate import validate_and_vectorize
+
+NDJSON = "application/x-ndjson"
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "256"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(1 << 20)))
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streams the body without competing with the endpoint for ``receive()`` messages."""
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def accepts_ndjson(accept: str | None) -> bool:
+    if not accept:
+        return True
+    types = {p.split(";")[0].strip().lower() for p in accept.split(",")}
+    return bool(types & {NDJSON, "application/json", "*/*", "application/*"})
+
+
+def dump(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+
+def parse_row(line: bytes):
+    """``(vector, id)`` of one NDJSON line; raises ``ValueError`` with a client-facing message."""
+    try:
+        obj = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON: {e}")
+    if not isinstance(obj, dict):
+        raise ValueError("each line must be a JSON object")
+    if "features" in obj:
+        return validate_and_vectorize(obj["features"]), obj.get("id")
+    return validate_and_vectorize(obj), None
+
+
+async def lines(stream):
+    """``(line_no, bytes)`` per complete line of an async byte stream, one chunk's worth at a time.
+
+    Yields a list per chunk so callers can batch everything that arrived together.
+    """
+    tail, n = b"", 0
+    async for chunk in stream:
+        if not chunk:
+            continue
+        parts = (tail + chunk).split(b"\n")
+        tail = parts.pop()
+        if len(tail) > STREAM_MAX_LINE_BYTES:
+            raise ValueError(f"line {n + len(parts) + 1} longer than {STREAM_MAX_LINE_BYTES} bytes")
+        out = []
+        for p in parts:
+            n += 1
+            if p.strip():
+                out.append((n, p))
+        if out:
+            yield out
+    if tail.strip():
+        yield [(n + 1, tail)]
+
+
+class Batcher:
+    """Splits one chunk's lines into scorable batches and per-line error records."""
+
+    def __init__(self, batch_rows: int = STREAM_BATCH_ROWS):
+        self.batch_rows = max(batch_rows, 1)
+        self.rows = 0
+        self.errors = 0
+
+    def split(self, chunk_lines):
+        """``(error_records, [(line_nos, ids, X), ...])``."""
+        errors, batches = [], []
+        nos, ids, vecs = [], [], []
+        for no, line in chunk_lines:
+            try:
+                vec, rid = parse_row(line)
+            except ValueError as e:
+                errors.append({"line": no, "error": str(e)})
+                continue
+            nos.append(no)
+            ids.append(rid)
+            vecs.append(vec)
+            if len(vecs) == self.batch_rows:
+                batches.append((nos, ids, np.asarray(vecs, dtype=np.float64)))
+                nos, ids, vecs = [], [], []
+        if vecs:
+            batches.append((nos, ids, np.asarray(vecs, dtype=np.float64)))
+        self.errors += len(errors)
+        self.rows += sum(len(b[0]) for b in batches)
+        return errors, batches
+
+
+def records(nos, ids, predictions) -> bytes:
+    out = []
+    for no, rid, p in zip(nos, ids, predictions):
+        rec = {"line": no, "prediction": p}
+        if rid is not None:
+            rec["id"] = rid
+        out.append(dump(rec))
+    return b"".join(out)
@@ -1,8 +1,22 @@
 import os
+from pathlib import Path
 import joblib
 
 MODEL_PATH = os.getenv("MODEL_PATH", "./artifacts/rf/20251006_005702/pipeline.joblib")
+# intra-op threads for exported DL runtimes (TFLite / ONNX); unset = runtime default
+MODEL_THREADS = int(os.getenv("MODEL_THREADS", "0")) or None
+# ?explain=true attributions: "saabas" (one vectorised walk per tree) or exact "treeshap"
+EXPLAIN_METHOD = os.getenv("EXPLAIN_METHOD", "saabas")
+# exact TreeSHAP falls back to saabas above this many inner-loop steps (TreeExplainer.treeshap_cost); 0 = no cap
+EXPLAIN_TREESHAP_BUDGET = int(os.getenv("EXPLAIN_TREESHAP_BUDGET", "200000"))
 
 def load_model(path: str = MODEL_PATH):
-    model = joblib.load(path)
+    p = Path(path)
+    if p.is_dir():
+        # DL artifact folder exported with `python -m exo_ml.deep.export_lite`
+        from exo_ml.deep.lite_runtime import LiteModel, find_lite_model
+        if find_lite_model(p) is not None:
+            return LiteModel(p, num_threads=MODEL_THREADS)
+        p = p / "pipeline.joblib"
+    model = joblib.load(p)
     return model
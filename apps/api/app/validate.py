@@ -12,3 +12,13 @@ def validate_and_vectorize(features_dict: dict):
     except Exception as e:
         raise ValueError(f"invalid feature value: {e}")
     return vec
+
+def column_order(columns) -> list:
+    """Positions in ``columns`` of each name in FEATURES (same missing/extra rules as above)."""
+    columns = list(columns)
+    missing = [f for f in FEATURES if f not in columns]
+    extra = [c for c in columns if c not in FEATURES]
+    if missing or extra or len(set(columns)) != len(columns):
+        raise ValueError(f"missing={missing} extra={extra}")
+    pos = {c: i for i, c in enumerate(columns)}
+    return [pos[f] for f in FEATURES]
@@ -27,6 +27,18 @@ export type ModelInfo = {
 };
 
 const artifactsDir = path.resolve(process.cwd(), "data", "pipeline", "artifacts");
+// written by bin/sync-model-data.sh (`python -m exo_ml run-index`)
+const runIndexPath = path.resolve(process.cwd(), "data", "pipeline", "run_index.json");
+
+type RunIndex = {
+  runs: {
+    root: string;
+    family: string;
+    runId: string;
+    metadata: Metadata | null;
+    metrics: TestMetrics | null;
+  }[];
+};
 
 function safeReadJson<T = unknown>(filePath: string): T | null {
   try {
@@ -45,10 +57,55 @@ function toModelName(family: string, runId: string, meta: Metadata | null, metri
   return [base, accStr].filter(Boolean).join(" — ") + created;
 }
 
+function toModelInfo(family: string, runId: string, meta: Metadata | null, metrics: TestMetrics | null): ModelInfo {
+  return {
+    id: `${family}/${runId}`,
+    family,
+    runId,
+    name: toModelName(family, runId, meta, metrics),
+    accuracy: typeof metrics?.accuracy === "number" ? metrics!.accuracy : null,
+    createdAt: meta?.created_at,
+    notes: meta?.notes,
+  };
+}
+
+function mtimeMs(p: string): number {
+  try {
+    return fs.statSync(p).mtimeMs;
+  } catch {
+    return 0;
+  }
+}
+
+// the index is only a shortcut: a run folder added or removed after it was written changes its family
+// folder's mtime (or the artifacts folder's, for a new family), so fall back to the walk in that case
+function indexIsFresh(): boolean {
+  const written = mtimeMs(runIndexPath);
+  if (!written) return false;
+  if (!fs.existsSync(artifactsDir)) return true;
+  if (mtimeMs(artifactsDir) > written) return false;
+  return fs.readdirSync(artifactsDir).every((d) => mtimeMs(path.join(artifactsDir, d)) <= written);
+}
+
+function sortRuns(result: ModelInfo[]): ModelInfo[] {
+  // most recent
+  return result.sort((a, b) => b.runId.localeCompare(a.runId) || a.family.localeCompare(b.family));
+}
+
 export async function GET() {
   try {
     const result: ModelInfo[] = [];
 
+    // one small file instead of walking every artifact folder, unless runs changed since it was written
+    const index = indexIsFresh() ? safeReadJson<RunIndex>(runIndexPath) : null;
+    if (index?.runs) {
+      for (const run of index.runs) {
+        if (run.root !== "artifacts") continue;
+        result.push(toModelInfo(run.family, run.runId, run.metadata, run.metrics));
+      }
+      return NextResponse.json(sortRuns(result));
+    }
+
     if (!fs.existsSync(artifactsDir)) {
       return NextResponse.json(result);
     }
@@ -78,26 +135,11 @@ export async function GET() {
         const meta = safeReadJson<Metadata>(metaPath);
         const metrics = safeReadJson<TestMetrics>(metricsPath);
 
-        const id = `${family}/${runId}`;
-        const name = toModelName(family, runId, meta, metrics);
-        const accuracy = typeof metrics?.accuracy === "number" ? metrics!.accuracy : null;
-
-        result.push({
-          id,
-          family,
-          runId,
-          name,
-          accuracy,
-          createdAt: meta?.created_at,
-          notes: meta?.notes,
-        });
+        result.push(toModelInfo(family, runId, meta, metrics));
       }
     }
 
-    // most recent
-    result.sort((a, b) => b.runId.localeCompare(a.runId) || a.family.localeCompare(b.family));
-
-    return NextResponse.json(result);
+    return NextResponse.json(sortRuns(result));
   } catch (err) {
     return NextResponse.json({ error: (err as Error).message }, { status: 500 });
   }
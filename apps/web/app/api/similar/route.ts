@@ -0,0 +1,29 @@
+export const dynamic = 'force-dynamic'
+
+import { forward } from "@/lib/proxy";
+
+// defaults to the classify endpoint's host: http://host:8000/predict -> http://host:8000/similar
+const MODEL_API_SIMILAR = process.env.MODEL_API_SIMILAR
+  ?? (process.env.MODEL_API_CLASSIFY ?? 'https://dummyjson.com/test').replace(/\/predict\/?$/, '/similar');
+
+export async function POST(request: Request) {
+  try {
+    return await forward(request, MODEL_API_SIMILAR);
+  } catch (reason) {
+    const message =
+      reason instanceof Error ? reason.message : 'Unexpected error'
+
+    return new Response(message, { status: 500 })
+  }
+}
+
+export async function GET(request: Request) {
+  try {
+    return await forward(request, MODEL_API_SIMILAR);
+  } catch (reason) {
+    const message =
+      reason instanceof Error ? reason.message : 'Unexpected error'
+
+    return new Response(message, { status: 500 })
+  }
+}
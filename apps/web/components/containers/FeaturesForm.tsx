@@ -20,10 +20,38 @@ const fieldIsRequiredError = "This field is required";
 
 type FeaturesInput = Record<string, string>;
 
+export type SimilarObject = {
+  rank: number;
+  distance: number;
+  label: string;
+  row: number;
+  toi?: number;
+  tid?: number;
+};
+
+// nearest labelled objects per class, keyed by class ("CP", "FP")
+export type SimilarGroups = Record<string, SimilarObject[]>;
+
 export type Props = {
-  onSuccess: (data: string) => void;
+  onSuccess: (data: Record<string, unknown>) => void;
 };
 
+async function fetchSimilar(body: string): Promise<SimilarGroups | undefined> {
+  // optional: older model artifacts have no neighbour index (404), so failures are not surfaced
+  try {
+    const res = await fetch("/api/similar?k=5&classes=CP,FP", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body,
+    });
+    if (!res.ok) return undefined;
+    const json = await res.json();
+    return json?.neighbors?.[0];
+  } catch {
+    return undefined;
+  }
+}
+
 const FeaturesForm: React.FC<Props> = ({ onSuccess }) => {
   const FeaturesSchema = z.record(z.string(), z.string().min(1, fieldIsRequiredError));
 
@@ -112,11 +140,13 @@ const FeaturesForm: React.FC<Props> = ({ onSuccess }) => {
     const featuresData = {
       features: data,
     }
+    const body = JSON.stringify(featuresData);
     try {
+      const similarRequest = fetchSimilar(body);
       const res = await fetch("/api/classify", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(featuresData),
+        body,
       });
 
       if (!res.ok) {
@@ -127,7 +157,7 @@ const FeaturesForm: React.FC<Props> = ({ onSuccess }) => {
         console.error('Failed to parse JSON response')
       }));
       console.log(result);
-      onSuccess(result);
+      onSuccess({ ...result, similar: await similarRequest });
       // toast.success(JSON.stringify(result));
       // reset();
     } catch (err) {
@@ -1,6 +1,6 @@
 "use client"
 
-import FeaturesForm from "@/components/containers/FeaturesForm";
+import FeaturesForm, {SimilarGroups} from "@/components/containers/FeaturesForm";
 import {
   AlertDialog, AlertDialogAction,
   AlertDialogContent,
@@ -10,6 +10,26 @@ import {
 } from "@/components/ui/alert-dialog";
 import * as React from "react";
 
+const SimilarObjects: React.FC<{ groups?: SimilarGroups }> = ({ groups }) => {
+  if (!groups || !Object.keys(groups).length) return null;
+  return (
+    <div className="space-y-3 text-sm">
+      {Object.entries(groups).map(([label, objects]) => (
+        <div key={label}>
+          <div className="font-medium">Most similar {label}</div>
+          <ul className="text-muted-foreground">
+            {objects.map((o) => (
+              <li key={`${label}-${o.rank}`}>
+                {o.toi != null ? `TOI ${o.toi}` : `row ${o.row}`}{o.tid != null ? ` (TIC ${o.tid})` : ''} — distance {o.distance.toFixed(2)}
+              </li>
+            ))}
+          </ul>
+        </div>
+      ))}
+    </div>
+  );
+};
+
 const InvestigateContainer: React.FC = () => {
  	const [resultOpen, setResultOpen] = React.useState(false);
   // eslint-disable-next-line @typescript-eslint/no-explicit-any
@@ -25,6 +45,7 @@ const InvestigateContainer: React.FC = () => {
               Classification: {resultData?.prediction ?? 'unknown'}
             </AlertDialogDescription>
           </AlertDialogHeader>
+          <SimilarObjects groups={resultData?.similar} />
           <AlertDialogFooter>
             <AlertDialogAction>Cool</AlertDialogAction>
           </AlertDialogFooter>
@@ -33,7 +54,7 @@ const InvestigateContainer: React.FC = () => {
     );
   };
 
-  const handleSuccess = (data: string) => {
+  const handleSuccess = (data: Record<string, unknown>) => {
     setResultData(data);
     setResultOpen(true);
   }
@@ -0,0 +1,55 @@
+import { NextResponse } from "next/server";
+
+export async function forward(request: Request, target: string) {
+  try {
+    const body = await request.arrayBuffer();
+    const init: RequestInit = {
+      method: request.method,
+      headers: filterForwardHeaders(request.headers),
+      body: body.byteLength ? body : undefined,
+    };
+
+    // pass query parameters (e.g. ?k=5&classes=CP,FP) through to the model API
+    const url = new URL(target);
+    new URL(request.url).searchParams.forEach((v, k) => url.searchParams.set(k, v));
+    const upstream = await fetch(url, init);
+
+    const upstreamBody = upstream.body ?? (await upstream.arrayBuffer());
+
+    // excluding hop-by-hop headers
+    const resHeaders = new Headers(upstream.headers);
+    stripHopByHopHeaders(resHeaders);
+    // ensure body/headers consistency to avoid decoding errors
+    resHeaders.delete('content-encoding');
+    resHeaders.delete('content-length');
+    resHeaders.delete('content-range');
+
+    return new NextResponse(upstreamBody, {
+      status: upstream.status,
+      headers: resHeaders,
+    });
+  } catch (err) {
+    return NextResponse.json({ error: 'Upstream proxy error', details: String(err) }, { status: 502 });
+  }
+}
+
+function filterForwardHeaders(incoming: Headers) {
+  const headers = new Headers();
+  // forward only safe/required headers
+  const allowed = ['authorization', 'content-type', 'accept', 'user-agent', 'cookie'];
+  for (const name of allowed) {
+    const v = incoming.get(name);
+    if (v) headers.set(name, v);
+  }
+  // prevent upstream from sending compressed payloads to avoid decode mismatch
+  headers.set('accept-encoding', 'identity');
+  return headers;
+}
+
+function stripHopByHopHeaders(h: Headers) {
+  const hopByHop = [
+    'connection','keep-alive','proxy-authenticate','proxy-authorization',
+    'te','trailers','transfer-encoding','upgrade'
+  ];
+  for (const k of hopByHop) h.delete(k);
+}
@@ -10,10 +10,18 @@ set -euo pipefail
 #   - mlp_artifacts/
 #   - transformer_artifacts/
 #   - data (only testing.csv)
+#
+# Incremental: a sha256 manifest of the synced files is kept in $DEST_BASE/.sync-manifest; only files whose
+# hash changed are copied and files that disappeared from the source are removed. Without a manifest (first
+# run, or after deleting it) the manifest is seeded from the files already in $DEST_BASE, so stale files
+# from earlier full syncs are removed too. Afterwards a run index ($DEST_BASE/run_index.json, see
+# `python -m exo_ml run-index`) is written for the dashboard. Both files are generated (see apps/web/.gitignore).
 
 ROOT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 SRC_BASE="$ROOT_DIR/pipeline"
 DEST_BASE="$ROOT_DIR/apps/web/data/pipeline"
+MANIFEST="$DEST_BASE/.sync-manifest"
+PYTHON="${PYTHON:-python3}"
 
 SUBDIRS=(
   "artifacts"
@@ -24,12 +32,17 @@ SUBDIRS=(
   "data" # special-case
 )
 
+# roots laid out as <root>/<family>/<run>/ that go into the run index
+INDEX_ROOTS=(artifacts dl_artifacts mlp_artifacts transformer_artifacts)
+
 INCLUDE_EXT=(json csv txt png jpg jpeg webp gif svg)
 
 mkdir -p "$DEST_BASE"
 
-if [ -d "$DEST_BASE" ]; then
-  find "$DEST_BASE" -mindepth 1 -maxdepth 1 -type d -print0 | xargs -0 -I{} rm -rf "{}"
+if command -v sha256sum >/dev/null 2>&1; then
+  hash_files() { xargs -0 -r sha256sum; }
+else
+  hash_files() { xargs -0 shasum -a 256; }
 fi
 
 should_copy() {
@@ -45,32 +58,59 @@ should_copy() {
   return 1
 }
 
-for sub in "${SUBDIRS[@]}"; do
-  src_dir="$SRC_BASE/$sub"
-  dest_dir="$DEST_BASE/$sub"
-
-  if [ ! -d "$src_dir" ]; then
-    echo "[skip] $sub (not found)"
-    continue
-  fi
-
-  echo "[sync] $sub"
-  while IFS= read -r -d '' file; do
-    if [[ "$sub" == "data" ]]; then
-      if [[ "$(basename "$file")" != "testing.csv" ]]; then
+# NUL-separated paths (relative to $1) of the files to sync under base directory $1
+list_files() {
+  local base="$1"
+  for sub in "${SUBDIRS[@]}"; do
+    src_dir="$base/$sub"
+    if [ ! -d "$src_dir" ]; then
+      echo "[skip] $sub (not found)" >&2
+      continue
+    fi
+    while IFS= read -r -d '' file; do
+      if [[ "$sub" == "data" && "$(basename "$file")" != "testing.csv" ]]; then
         continue
       fi
-    fi
+      if should_copy "$file"; then
+        printf '%s\0' "${file#"$base/"}"
+      fi
+    done < <(find "$src_dir" -type f -print0)
+  done
+}
 
-    if should_copy "$file"; then
-      rel_path="${file#"$SRC_BASE/"}"
-      out_path="$DEST_BASE/$rel_path"
-      mkdir -p "$(dirname "$out_path")"
-      cp -f "$file" "$out_path"
-    fi
-  done < <(find "$src_dir" -type f -print0)
+NEW_MANIFEST="$(mktemp)"
+trap 'rm -f "$NEW_MANIFEST"' EXIT
+
+# "<sha256>  <relative path>" per file, sorted by path
+(cd "$SRC_BASE" && list_files "$SRC_BASE" | hash_files) | sort -k2 > "$NEW_MANIFEST"
+if [ ! -f "$MANIFEST" ]; then
+  # seed from what is already there: unchanged files are not recopied and stale ones get removed below
+  (cd "$DEST_BASE" && list_files "$DEST_BASE" 2>/dev/null | hash_files) | sort -k2 > "$MANIFEST"
+fi
 
-done
+copied=0
+while IFS= read -r line; do
+  rel_path="${line#*  }"
+  mkdir -p "$(dirname "$DEST_BASE/$rel_path")"
+  cp -f "$SRC_BASE/$rel_path" "$DEST_BASE/$rel_path"
+  copied=$((copied + 1))
+done < <(comm -13 <(sort "$MANIFEST") <(sort "$NEW_MANIFEST"))
 
-echo "Done."
+removed=0
+while IFS= read -r rel_path; do
+  rm -f "$DEST_BASE/$rel_path"
+  removed=$((removed + 1))
+done < <(comm -23 <(cut -d' ' -f3- "$MANIFEST" | sort) <(cut -d' ' -f3- "$NEW_MANIFEST" | sort))
+find "$DEST_BASE" -mindepth 1 -type d -empty -delete
 
+mv "$NEW_MANIFEST" "$MANIFEST"
+trap - EXIT
+echo "[sync] copied $copied changed file(s), removed $removed"
+
+if command -v "$PYTHON" >/dev/null 2>&1; then
+  (cd "$SRC_BASE" && "$PYTHON" -m exo_ml.run_index --roots "${INDEX_ROOTS[@]}" --output "$DEST_BASE/run_index.json")
+else
+  echo "[skip] run index ($PYTHON not found)"
+fi
+
+echo "Done."
@@ -0,0 +1,94 @@
+"""Cold-start guard: wall time and heavy-module leakage for each ``python -m exo_ml`` command.
+
+Each probe runs in a fresh interpreter. ``--help`` must not import any of HEAVY_MODULES, and the
+sklearn-only commands must not pull TensorFlow / torch / matplotlib even once their runtime
+dependencies are imported. Exits non-zero when a budget is exceeded, so it can gate CI / batch hosts.
+
+    python -m exo_ml bench-imports --budget-help 0.5 --output bench_imports.json
+"""
+from __future__ import annotations
+import argparse, json, os, subprocess, sys, time
+from pathlib import Path
+
+HEAVY_MODULES = ["tensorflow", "keras", "torch", "matplotlib", "pytorch_tabnet", "onnxruntime", "tflite_runtime"]
+
+# modules each command imports at run time; sklearn-only commands must stay free of HEAVY_MODULES
+RUNTIME_IMPORTS = {
+    "train": ["exo_ml.config", "exo_ml.data", "exo_ml.preprocess", "exo_ml.models", "exo_ml.utils",
+              "sklearn.model_selection"],
+    "infer": ["exo_ml.data", "exo_ml.utils"],
+}
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+exec({code!r})
+dt = time.perf_counter() - t0
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds": dt, "heavy": heavy, "n_modules": len(sys.modules)}}))
+"""
+
+def _probe(code: str, cwd: Path) -> dict:
+    src = _PROBE.format(code=code, heavy=HEAVY_MODULES)
+    t0 = time.perf_counter()
+    res = subprocess.run([sys.executable, "-c", src], cwd=cwd, capture_output=True, text=True,
+                         env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    wall = time.perf_counter() - t0
+    if res.returncode != 0:
+        return {"error": res.stderr.strip().splitlines()[-1:] or ["failed"], "wall_s": wall}
+    out = json.loads(res.stdout.strip().splitlines()[-1])
+    out["wall_s"] = wall
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import-time / cold-start benchmark for exo_ml commands")
+    ap.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per probe (min is reported)")
+    ap.add_argument("--budget-help", type=float, default=0.5, help="Max seconds for `<command> --help` imports")
+    ap.add_argument("--budget-runtime", type=float, default=3.0, help="Max seconds for sklearn-only runtime imports")
+    ap.add_argument("--output", default=None, help="Write JSON results here")
+    args = ap.parse_args(argv)
+
+    from ..cli import COMMANDS
+    cwd = Path(__file__).resolve().parents[2]  # pipeline/ (so `exo_ml` is importable)
+
+    probes = {"exo_ml --help": "from exo_ml.cli import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass"}
+    for cmd in COMMANDS:
+        probes[f"{cmd} --help"] = (
+            "import contextlib, io\nfrom exo_ml.cli import main\n"
+            f"with contextlib.redirect_stdout(io.StringIO()):\n    try:\n        main([{cmd!r}, '--help'])\n"
+            "    except SystemExit:\n        pass"
+        )
+    for cmd, mods in RUNTIME_IMPORTS.items():
+        probes[f"{cmd} runtime"] = "\n".join(f"import {m}" for m in mods)
+
+    results, failures = {}, []
+    for name, code in probes.items():
+        runs = [_probe(code, cwd) for _ in range(max(args.repeats, 1))]
+        ok = [r for r in runs if "error" not in r]
+        if not ok:
+            results[name] = runs[0]
+            failures.append(name)
+            print(f"{name:28s} ERROR {runs[0]['error']}")
+            continue
+        best = min(ok, key=lambda r: r["seconds"])
+        results[name] = best
+        budget = args.budget_help if name.endswith("--help") else args.budget_runtime
+        leaked = best["heavy"]
+        status = "ok"
+        if best["seconds"] > budget or leaked:
+            status = "FAIL"
+            failures.append(name)
+        print(f"{name:28s} {best['seconds'] * 1e3:8.1f} ms  modules={best['n_modules']:5d}  "
+              f"heavy={','.join(leaked) or '-'}  [{status}]")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budget_help_s": args.budget_help, "budget_runtime_s": args.budget_runtime,
+                       "results": results, "failures": failures}, f, indent=2)
+    if failures:
+        print(f"{len(failures)} probe(s) over budget or importing heavy modules: {', '.join(failures)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Peak memory of the training data path with default pandas dtypes vs a dtype plan (``data.plan_dtypes``).
+
+Each variant runs in a fresh interpreter (``ru_maxrss`` is a process-wide high-water mark) through the same
+steps as ``train.py`` up to the model: ``load`` → ``basic_clean`` → drop columns / unlabelled rows →
+``drop_bad_columns`` → ``coerce_numeric`` → split → preprocessor ``fit_transform``. Reported per variant:
+peak RSS, RSS after imports (so ``peak - imports`` is what the data costs), frame size after load and after
+preparation (``data.memory_report``), and stage times.
+
+    python -m exo_ml bench-memory --input data/TOI_2025.10.03_10.51.46.csv --output bench_memory.json
+    python -m exo_ml bench-memory --input data/synth_1000000_200.csv --baseline bench_memory_prev.json
+"""
+from __future__ import annotations
+import argparse, json, platform, time
+from pathlib import Path
+
+from .scaling import _maxrss_mb
+
+VARIANTS = ("default", "plan")
+
+def run_variant(path: str, cfg: dict, variant: str) -> dict:
+    import pandas as pd
+    from ..data import load_table, basic_clean, train_test_split_df, plan_dtypes, apply_plan, memory_report
+    from ..datafix import coerce_numeric
+    from ..feature_select import drop_bad_columns
+    from ..preprocess import build_preprocessor
+
+    target, drop_cols = cfg["target"], cfg["drop_cols"]
+    out = {"variant": variant, "imports_rss_mb": round(_maxrss_mb(), 1)}
+    stages = {}
+    t0 = time.perf_counter()
+    plan = None
+    if variant == "plan":
+        plan = plan_dtypes(path, exact=drop_cols, **{k: v for k, v in cfg.get("dtypes", {}).items() if k != "enabled"})
+        stages["plan"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+    df = load_table(path, plan, defer_parse=True)
+    stages["load"] = time.perf_counter() - t0
+    out["loaded"] = memory_report(df)
+    out["load_rss_mb"] = round(_maxrss_mb(), 1)
+
+    t0 = time.perf_counter()
+    df = apply_plan(basic_clean(df), plan)
+    df = df.drop(columns=[c for c in drop_cols if c in df.columns], errors="ignore")
+    unlabelled = df[target].isna()
+    if unlabelled.any():
+        df = df[~unlabelled]
+    df = drop_bad_columns(df, max_missing_pct=0.80, min_unique_ratio=0.0005)
+    df = coerce_numeric(df)
+    X_train, X_test, y_train, y_test = train_test_split_df(df, target, cfg["test_size"], cfg["random_state"])
+    stages["prepare"] = time.perf_counter() - t0
+    out["prepared"] = memory_report(X_train)
+
+    t0 = time.perf_counter()
+    Xt = build_preprocessor(X_train).fit_transform(X_train)
+    stages["preprocess"] = time.perf_counter() - t0
+    out["preprocessed_mb"] = round(getattr(Xt, "nbytes", 0) / 2**20, 3)
+    out["stages_s"] = {k: round(v, 4) for k, v in stages.items()}
+    out["peak_rss_mb"] = round(_maxrss_mb(), 1)
+    out["data_peak_mb"] = round(out["peak_rss_mb"] - out["imports_rss_mb"], 1)
+    out["rows"] = int(len(pd.concat([y_train, y_test])))
+    return out
+
+def _fresh(path: str, cfg: dict, variant: str) -> dict:
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_variant, path, cfg, variant).result()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Peak memory of load + prepare with default dtypes vs a dtype plan")
+    ap.add_argument("--input", nargs="+", required=True, help="Training CSV/Parquet file(s)")
+    ap.add_argument("--config", default=None, help="Training config / preset (target, drop_cols, dtypes)")
+    ap.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    ap.add_argument("--output", default="bench_memory.json")
+    ap.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    args = ap.parse_args(argv)
+
+    from ..config import load_config
+    cfg = load_config(args.config)
+    results = []
+    for path in args.input:
+        for variant in args.variants:
+            case = {"input": str(path), "file_mb": round(Path(path).stat().st_size / 2**20, 2)}
+            try:
+                case.update(_fresh(str(path), cfg, variant))
+            except Exception as e:
+                case.update(variant=variant, error=f"{type(e).__name__}: {e}")
+            results.append(case)
+            print(f"{Path(path).name} [{variant}] peak {case.get('peak_rss_mb')} MB "
+                  f"(data {case.get('data_peak_mb')} MB), frame {case.get('loaded', {}).get('mb')} MB loaded / "
+                  f"{case.get('prepared', {}).get('mb')} MB prepared")
+
+    report = {"env": {"python": platform.python_version(), "platform": platform.platform(),
+                      "created_at": time.strftime("%Y-%m-%d %H:%M:%S")},
+              "config": args.config, "results": results}
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Results written to: {Path(args.output).resolve()}")
+    if args.baseline:
+        base = {(r["input"], r["variant"]): r for r in json.loads(Path(args.baseline).read_text())["results"]}
+        for r in results:
+            b = base.get((r["input"], r["variant"]))
+            if b and "peak_rss_mb" in b and "peak_rss_mb" in r:
+                print(f"  vs baseline {Path(r['input']).name} [{r['variant']}]: data peak "
+                      f"{b['data_peak_mb']} -> {r['data_peak_mb']} MB, loaded frame "
+                      f"{b['loaded']['mb']} -> {r['loaded']['mb']} MB")
+
+if __name__ == "__main__":
+    main()
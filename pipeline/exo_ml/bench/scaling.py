@@ -0,0 +1,144 @@
+"""Scaling benchmark: sweep rows × extra columns × cores over the train/infer stages.
+
+Stages mirror ``train.py`` / ``infer.py`` / the API:
+``load`` (load_table) → ``prepare`` (basic_clean, drop_bad_columns, coerce_numeric, split) →
+``fit`` (preprocessor + model) → ``predict`` (batch) → ``predict_single`` (one-row frames, API-style).
+
+    python -m exo_ml.bench.scaling --input data/TOI_2025.10.03_10.51.46.csv \\
+        --rows 10000,100000,1000000 --extra-cols 0,200 --cores 1,4 --output bench_scaling.json \\
+        --baseline bench_scaling_prev.json
+"""
+from __future__ import annotations
+import argparse, json, os, platform, resource, sys, tempfile, time
+from pathlib import Path
+
+def _ints(s: str) -> list[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+def _maxrss_mb() -> float:
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+def run_case(csv_path: Path, cfg: dict, cores: int, single_rows: int = 200) -> dict:
+    import numpy as np
+    from threadpoolctl import threadpool_limits
+    from ..data import load_table, basic_clean, train_test_split_df
+    from ..datafix import coerce_numeric
+    from ..feature_select import drop_bad_columns
+    from ..preprocess import build_preprocessor
+    from ..models import build_pipeline
+
+    target, drop_cols = cfg["target"], cfg["drop_cols"]
+    stages = {}
+    with threadpool_limits(limits=cores):
+        t0 = time.perf_counter()
+        df = load_table(csv_path)
+        stages["load"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        df = basic_clean(df)
+        df = df.drop(columns=[c for c in drop_cols if c in df.columns], errors="ignore")
+        df = df[~df[target].isna()].copy()
+        df = drop_bad_columns(df, max_missing_pct=0.80, min_unique_ratio=0.0005)
+        df = coerce_numeric(df)
+        X_train, X_test, y_train, y_test = train_test_split_df(df, target, cfg["test_size"], cfg["random_state"])
+        stages["prepare"] = time.perf_counter() - t0
+
+        params = dict(cfg["model"]["params"])
+        if cfg["model"]["name"] in ("random_forest", "extra_trees", "rf", "et"):
+            params["n_jobs"] = cores
+        pipe = build_pipeline(build_preprocessor(X_train), cfg["model"]["name"], params)
+        t0 = time.perf_counter()
+        pipe.fit(X_train, y_train)
+        stages["fit"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pipe.predict(X_test)
+        stages["predict"] = time.perf_counter() - t0
+
+        lat = []
+        for i in range(min(single_rows, len(X_test))):
+            row = X_test.iloc[[i]]
+            t0 = time.perf_counter()
+            pipe.predict(row)
+            lat.append(time.perf_counter() - t0)
+    return {
+        "stages_s": {k: round(v, 4) for k, v in stages.items()},
+        "rows_after_clean": int(len(df)),
+        "n_features": int(X_train.shape[1]),
+        "predict_rows_per_s": round(len(X_test) / stages["predict"], 1) if stages["predict"] else None,
+        "predict_single_p50_ms": round(float(np.median(lat)) * 1e3, 3) if lat else None,
+        "predict_single_p95_ms": round(float(np.percentile(lat, 95)) * 1e3, 3) if lat else None,
+        "max_rss_mb": round(_maxrss_mb(), 1),
+    }
+
+def _compare(results: list[dict], baseline: list[dict]):
+    key = lambda r: (r["rows"], r["extra_cols"], r["cores"], r["model"])
+    base = {key(r): r for r in baseline}
+    for r in results:
+        b = base.get(key(r))
+        if not b or "stages_s" not in b or "stages_s" not in r:
+            continue
+        deltas = ", ".join(f"{k} x{r['stages_s'][k] / v:.2f}" for k, v in b["stages_s"].items()
+                           if v and k in r["stages_s"])
+        print(f"  vs baseline rows={r['rows']} cols+={r['extra_cols']} cores={r['cores']}: {deltas}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Scaling benchmark over rows / columns / cores")
+    ap.add_argument("--input", default=None, help="Real CSV to profile for the synthetic data")
+    ap.add_argument("--profile", default=None, help="Saved synth profile JSON (instead of --input)")
+    ap.add_argument("--config", default="preset:rf", help="Training config / preset to benchmark")
+    ap.add_argument("--rows", default="10000,100000", help="Comma-separated row counts")
+    ap.add_argument("--extra-cols", default="0", help="Comma-separated extra synthetic column counts")
+    ap.add_argument("--cores", default=f"1,{os.cpu_count() or 1}", help="Comma-separated core counts")
+    ap.add_argument("--workdir", default=None, help="Where generated CSVs are kept (default: temp dir)")
+    ap.add_argument("--output", default="bench_scaling.json")
+    ap.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    args = ap.parse_args(argv)
+
+    import sklearn
+    from ..config import load_config
+    from ..synth import profile_table, write_synthetic, _comment_header
+    from ..data import load_table
+
+    cfg = load_config(args.config)
+    cfg["grid_search"] = {"enabled": False}
+    if args.profile:
+        profile = json.loads(Path(args.profile).read_text())
+    elif args.input:
+        profile = profile_table(load_table(args.input), cfg["target"], _comment_header(args.input))
+    else:
+        ap.error("one of --input or --profile is required")
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="exo_bench_"))
+    results = []
+    for rows in _ints(args.rows):
+        for extra in _ints(args.extra_cols):
+            csv_path = workdir / f"synth_{rows}_{extra}.csv"
+            t0 = time.perf_counter()
+            if not csv_path.exists():
+                write_synthetic(profile, rows, csv_path, extra_cols=extra, seed=0)
+            gen_s = time.perf_counter() - t0
+            for cores in _ints(args.cores):
+                case = {"rows": rows, "extra_cols": extra, "cores": cores, "model": cfg["model"]["name"],
+                        "generate_s": round(gen_s, 3), "file_mb": round(csv_path.stat().st_size / 2**20, 2)}
+                try:
+                    case.update(run_case(csv_path, cfg, cores))
+                except Exception as e:  # record and keep sweeping (e.g. OOM at the largest size)
+                    case["error"] = f"{type(e).__name__}: {e}"
+                results.append(case)
+                print(json.dumps(case))
+
+    report = {
+        "env": {"python": platform.python_version(), "sklearn": sklearn.__version__, "platform": platform.platform(),
+                "cpu_count": os.cpu_count(), "created_at": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "config": args.config,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Results written to: {Path(args.output).resolve()}")
+    if args.baseline:
+        _compare(results, json.loads(Path(args.baseline).read_text())["results"])
+
+if __name__ == "__main__":
+    main()
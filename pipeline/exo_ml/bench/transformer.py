@@ -0,0 +1,91 @@
+"""Benchmark: OHE-token FT-Transformer (``transformer``) vs per-feature tokenized (``ft_tokens``).
+
+    python -m exo_ml.bench.transformer --input data/TOI_2025.10.03_10.51.46.csv
+    python -m exo_ml.bench.transformer --ohe-width 420 --n-num 60 --n-cat 6
+"""
+from __future__ import annotations
+import argparse, json, time
+import numpy as np
+
+def _widths_from_input(path: str):
+    from ..config import load_config
+    from ..data import load_table
+    from ..datafix import coerce_numeric
+    from ..feature_select import drop_bad_columns
+    from ..preprocess import build_preprocessor, build_token_preprocessor, token_cardinalities
+
+    cfg = load_config(None)
+    df = load_table(path).dropna(axis="columns", how="all")
+    df = df.drop(columns=[c for c in cfg["drop_cols"] if c in df.columns], errors="ignore")
+    df = df[~df[cfg["target"]].isna()]
+    df = coerce_numeric(drop_bad_columns(df, max_missing_pct=0.80, min_unique_ratio=0.0005))
+    X = df.drop(columns=[cfg["target"]])
+    ohe_width = build_preprocessor(X).fit_transform(X).shape[1]
+    n_num, cards = token_cardinalities(build_token_preprocessor(X).fit(X))
+    return ohe_width, n_num, cards
+
+def _time(fn, repeats: int) -> float:
+    fn()  # warm-up (graph tracing)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark FT-Transformer variants (CPU)")
+    ap.add_argument("--input", default=None, help="Training CSV to derive real OHE / raw widths from")
+    ap.add_argument("--ohe-width", type=int, default=420)
+    ap.add_argument("--n-num", type=int, default=60)
+    ap.add_argument("--n-cat", type=int, default=6)
+    ap.add_argument("--cat-cardinality", type=int, default=60)
+    ap.add_argument("--n-classes", type=int, default=6)
+    ap.add_argument("--rows", type=int, default=2048)
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--output", default=None, help="Write JSON results here")
+    args = ap.parse_args(argv)
+
+    if args.input:
+        ohe_width, n_num, cards = _widths_from_input(args.input)
+    else:
+        ohe_width, n_num, cards = args.ohe_width, args.n_num, [args.cat_cardinality] * args.n_cat
+
+    from tensorflow import keras
+    from ..deep.models_keras import build_feature_transformer, build_tokenized_transformer
+
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, args.n_classes, size=args.rows)
+    X_ohe = rng.normal(size=(args.rows, ohe_width)).astype("float32")
+    X_tok = np.hstack([
+        rng.normal(size=(args.rows, n_num)),
+        np.column_stack([rng.integers(0, c, size=args.rows) for c in cards]) if cards else np.empty((args.rows, 0)),
+    ]).astype("float32")
+
+    variants = {
+        "transformer": (build_feature_transformer(ohe_width, args.n_classes), X_ohe),
+        "ft_tokens": (build_tokenized_transformer(n_num, cards, args.n_classes), X_tok),
+        "ft_tokens_wide": (build_tokenized_transformer(n_num, cards, args.n_classes, d_model=128, depth=4, heads=8), X_tok),
+    }
+    results = {"ohe_width": ohe_width, "n_num": n_num, "cat_cardinalities": cards, "rows": args.rows, "models": {}}
+    for name, (model, X) in variants.items():
+        model.compile(optimizer="adam", loss=keras.losses.SparseCategoricalCrossentropy())
+        epoch_s = _time(lambda: model.fit(X, y, epochs=1, batch_size=args.batch_size, verbose=0), args.repeats)
+        predict_s = _time(lambda: model.predict(X, batch_size=args.batch_size, verbose=0), args.repeats)
+        one_row = X[:1]
+        single_s = _time(lambda: model(one_row, training=False), args.repeats * 10)
+        results["models"][name] = {
+            "seq_len": int(X.shape[1]),
+            "params": int(model.count_params()),
+            "train_epoch_s": epoch_s,
+            "predict_rows_per_s": args.rows / predict_s,
+            "single_row_ms": single_s * 1e3,
+        }
+        print(f"{name:16s} seq_len={X.shape[1]:4d} params={model.count_params():>9,d} "
+              f"epoch={epoch_s:.2f}s predict={args.rows / predict_s:,.0f} rows/s single={single_s * 1e3:.2f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Single entry point: ``python -m exo_ml <command> [args]``.
+
+Only ``argparse`` is imported here; each command's module (and its numpy / sklearn /
+TensorFlow / torch / matplotlib stack) is imported when that command actually runs.
+"""
+from __future__ import annotations
+import importlib
+import sys
+
+# command -> (module, one-line help). Modules expose ``main(argv=None)``.
+COMMANDS = {
+    "train": ("exo_ml.train", "Train a scikit-learn pipeline (pipeline.joblib)"),
+    "infer": ("exo_ml.infer", "Batch inference with a saved sklearn pipeline"),
+    "triage": ("exo_ml.triage", "Chunked top-K shortlist per class (bounded memory)"),
+    "explain": ("exo_ml.explain", "Per-row TreeSHAP attributions for tree pipelines"),
+    "drift": ("exo_ml.drift", "Compare a batch against an artifact's training drift reference"),
+    "evaluate": ("exo_ml.evaluate", "Bootstrap metrics report for a predictions file"),
+    "lc-features": ("exo_ml.lightcurve", "Light-curve features from local FITS files (cached, parallel)"),
+    "sky": ("exo_ml.sky", "Sky crowding features and catalog cross-match (KD-tree)"),
+    "similar": ("exo_ml.neighbors", "Nearest labelled training objects in model feature space"),
+    "train-dl": ("exo_ml.deep.train_dl", "Train a Keras model (TensorFlow)"),
+    "infer-dl": ("exo_ml.deep.infer_dl", "Batch inference with a Keras artifact (TensorFlow)"),
+    "search-dl": ("exo_ml.deep.search", "Parallel DL / TabNet trial search with pruning and resume"),
+    "tabnet-train": ("exo_ml.deep.tabnet_train", "Train TabNet (torch)"),
+    "export-lite": ("exo_ml.deep.export_lite", "Export Keras/TabNet to TFLite/ONNX"),
+    "infer-lite": ("exo_ml.deep.infer_lite", "Batch inference with an exported TFLite/ONNX artifact"),
+    "run-index": ("exo_ml.run_index", "Index artifact runs (metadata, metrics, file hashes)"),
+    "synth": ("exo_ml.synth", "Generate a synthetic catalog for scale tests"),
+    "bench-scaling": ("exo_ml.bench.scaling", "Rows x columns x cores scaling benchmark"),
+    "bench-imports": ("exo_ml.bench.imports", "Import / cold-start time benchmark"),
+    "bench-memory": ("exo_ml.bench.memory", "Peak memory of load + prepare: default dtypes vs dtype plan"),
+    "bench-transformer": ("exo_ml.bench.transformer", "Benchmark FT-Transformer variants"),
+}
+
+def _usage() -> str:
+    width = max(len(c) for c in COMMANDS)
+    lines = ["usage: python -m exo_ml <command> [args]", "", "commands:"]
+    lines += [f"  {c:<{width}}  {h}" for c, (_, h) in COMMANDS.items()]
+    lines += ["", "Run `python -m exo_ml <command> --help` for command options."]
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_usage())
+        return 0 if argv else 2
+    cmd, rest = argv[0], argv[1:]
+    if cmd not in COMMANDS:
+        print(f"exo_ml: unknown command '{cmd}'\n\n{_usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(COMMANDS[cmd][0])
+    sys.argv = [f"exo_ml {cmd}"] + rest
+    return module.main(rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
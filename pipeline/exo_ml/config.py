@@ -15,7 +15,7 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 
     # Single-model (used when stacking.enabled == False)
     "model": {
-        "name": "random_forest",  # ["random_forest","extra_trees","histgb","xgboost","svc","logreg"]
+        "name": "random_forest",  # ["random_forest","extra_trees","histgb","xgboost","svc","logreg","sgd","gaussian_nb"]
         "params": {
             "random_state": 42,
             "class_weight": "balanced",
@@ -39,6 +39,63 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 
     "scoring": "balanced_accuracy",   # used for GridSearchCV refit if grid provided
 
+    # Permutation-importance pruning after fitting (see prune.py); kept columns -> feature_columns.json
+    "feature_pruning": {
+        "enabled": False,
+        "tolerance": 0.005,   # max allowed drop in validation `scoring` vs. all features
+        "step": 0.1,          # fraction of remaining features dropped per round
+        "min_features": 5,
+        "n_repeats": 5,
+        "n_jobs": -1,
+        "val_size": 0.2
+    },
+
+    # Compact dtypes chosen from one sampling pass at load time (see data.plan_dtypes) -> dtype_plan.json,
+    # which inference reads back so new catalogs load with the same dtypes
+    "dtypes": {
+        "enabled": True,
+        "sample_rows": 100000,
+        "float32": True,          # float32 only where every sampled value has <= 6 significant digits
+        "max_categories": 256     # strings with at most this many distinct values -> category
+    },
+
+    # Light-curve features joined on `key` before preprocessing (see lightcurve.py).
+    # `source`: directory of local FITS files (process pool + content-hash cache) or a precomputed table
+    "lightcurves": {
+        "enabled": False,
+        "source": None,
+        "cache_dir": ".lc_cache",
+        "key": "tid",
+        "n_jobs": -1,
+        "params": {}
+    },
+
+    # Sky crowding features from a KD-tree on unit vectors (see sky.py). Neighbours come from `reference`
+    # (default: the training input); the index is saved in the artifact so inference uses the same one
+    "sky": {
+        "enabled": False,
+        "reference": None,
+        "radii_arcsec": [21.0, 63.0, 126.0],
+        "self_arcsec": 1.0,
+        "psf_arcsec": 21.0,
+        "mag_col": "st_tmag"
+    },
+
+    # "Similar known objects" index over the fitted preprocessor output (see neighbors.py) -> neighbors.joblib
+    "neighbors": {
+        "enabled": True,
+        "method": "auto",       # exact up to exact_max rows per partition, IVF above
+        "exact_max": 50000,
+        "n_probe": 8,
+        "id_cols": ["toi", "tid"]
+    },
+
+    # Test-set report (see evaluate.py): percentile bootstrap CIs for every metric; 0 disables
+    "evaluation": {
+        "n_boot": 2000,
+        "seed": 0
+    },
+
     # Pipeline-level grid search (keys use step prefix: clf__..., preprocessor__...)
     "grid_search": {
         "enabled": False,
@@ -193,7 +250,22 @@ PRESETS: Dict[str, Dict[str, Any]] = {
         }
     },
 
-    # 7) Stacking (XGB + RF + HistGB → LogReg)
+    # 7) SGD logistic regression (partial_fit; pairs with `train --chunksize`)
+    "sgd": {
+        "model": {
+            "name": "sgd",
+            "params": {
+                "loss": "log_loss",
+                "alpha": 1e-4,
+                "class_weight": "balanced",
+                "random_state": 42
+            }
+        },
+        "stacking": {"enabled": False},
+        "grid_search": {"enabled": False, "cv": 5, "param_grid": {}}
+    },
+
+    # 8) Stacking (XGB + RF + HistGB → LogReg)
     "stack_basic": {
         "model": { "name": "random_forest", "params": { "n_estimators": 10 } },  # ignored when stacking.enabled=True
         "stacking": {
@@ -216,7 +288,7 @@ PRESETS: Dict[str, Dict[str, Any]] = {
         }
     },
 
-    # 8) Stacking (RF + ET + HistGB → SVC meta)
+    # 9) Stacking (RF + ET + HistGB → SVC meta)
     "stack_svc_meta": {
         "model": { "name": "random_forest", "params": { "n_estimators": 10 } },
         "stacking": {
@@ -1,16 +1,254 @@
 
 from __future__ import annotations
+import json
+import logging
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-def load_table(path_or_url: str | Path) -> pd.DataFrame:
-    return pd.read_csv(path_or_url, comment='#')
+PARQUET_SUFFIXES = (".parquet", ".pq")
+DTYPE_PLAN_FILE = "dtype_plan.json"
+_INT_DTYPES = ("Int8", "Int16", "Int32", "Int64")
+_FLOAT32_DIGITS = 6          # decimal digits that always survive a float32 round trip (FLT_DIG)
+
+def is_parquet(path_or_url: str | Path) -> bool:
+    return str(path_or_url).lower().endswith(PARQUET_SUFFIXES)
+
+# --- dtype planning ---------------------------------------------------------------------------------------
+# pandas reads every float column as float64 and string-ish columns as object, which ``coerce_numeric`` then
+# re-parses. A plan fixes each column's dtype from one sample instead, and the CSV parser applies it while
+# reading: float32 when every sampled value has <= 6 significant digits, nullable Int8..Int64 for integer
+# columns, ``category`` for low-cardinality strings. Columns counted as numeric follow ``coerce_numeric``'s
+# rule (>= ``min_numeric_ratio`` of the rows parse after removing thousands separators); their non-numeric
+# tokens become per-column NA values. The plan is saved with the artifacts so inference reads the same dtypes.
+#
+# Training loads with ``defer_parse=True``: columns with junk tokens stay text until after ``basic_clean``, which
+# would otherwise drop the rows whose tokens the plan had already turned into NaN. Every other planned column
+# is NaN exactly where the default read is, so the cleaned training set is the same with or without a plan.
+
+def _significant_digits(s: pd.Series) -> pd.Series:
+    mant = s.str.lower().str.split("e").str[0].str.lstrip("+-")
+    mant = mant.where(~mant.str.contains(".", regex=False), mant.str.rstrip("0"))
+    return mant.str.replace(".", "", regex=False).str.lstrip("0").str.len()
+
+def _int_dtype(lo: float, hi: float) -> str | None:
+    # half the type's range as headroom for values beyond the sample
+    for name in _INT_DTYPES:
+        info = np.iinfo(name.lower())
+        if info.min // 2 <= lo and hi <= info.max // 2:
+            return name
+    return None
+
+def _plan_column(raw: pd.Series, float32: bool, max_categories: int, min_numeric_ratio: float,
+                 max_na_tokens: int) -> dict | None:
+    text = raw.dropna()
+    if not len(text):
+        return None
+    text = text.astype(str).str.strip()
+    clean = text.str.replace(",", "", regex=False)
+    num = pd.to_numeric(clean, errors="coerce")
+    parsed = num.notna()
+    as_read = parsed.all() and (clean == text).all()     # pandas would infer a numeric column by itself
+    if not as_read and parsed.sum() / len(raw) < min_numeric_ratio:
+        n_unique = text.nunique()
+        if n_unique <= max_categories and n_unique <= len(text) // 2:
+            return {"dtype": "category"}
+        return {"dtype": "object"}
+
+    spec = {}
+    if not parsed.all():
+        tokens = sorted(text[~parsed].unique().tolist())
+        if len(tokens) > max_na_tokens:
+            spec["parse"] = "after"         # too many distinct junk values: read as text, convert afterwards
+        else:
+            spec["na_values"] = tokens
+    if (clean != text).any():
+        spec["thousands"] = True
+    vals, digits = num[parsed], clean[parsed]
+    finite = np.isfinite(vals.to_numpy(dtype=np.float64))
+    if finite.any() and digits.str.fullmatch(r"[+-]?\d+").all():
+        dtype = _int_dtype(vals.min(), vals.max())
+        if dtype is not None:
+            return {**spec, "dtype": dtype}
+    amax = float(np.abs(vals[finite]).max()) if finite.any() else 0.0
+    if float32 and amax < 1e38 and (_significant_digits(digits[finite]) <= _FLOAT32_DIGITS).all():
+        return {**spec, "dtype": "float32"}
+    return {**spec, "dtype": "float64"}
+
+def plan_dtypes(path_or_url: str | Path, sample_rows: int = 100_000, float32: bool = True,
+                max_categories: int = 256, min_numeric_ratio: float = 0.95, max_na_tokens: int = 50,
+                exact=()) -> dict:
+    """Compact dtype per column from the first ``sample_rows`` rows (one sampling pass, read as text).
+
+    ``exact`` columns (identifiers such as ``toi``) are never narrowed to float32.
+    """
+    if is_parquet(path_or_url):
+        import pyarrow.parquet as pq
+        batch = next(pq.ParquetFile(path_or_url).iter_batches(batch_size=sample_rows), None)
+        sample = batch.to_pandas() if batch is not None else pd.DataFrame()
+    else:
+        sample = pd.read_csv(path_or_url, comment='#', nrows=sample_rows, dtype=str)
+    cols = {}
+    for c in sample.columns:
+        spec = _plan_column(sample[c], float32 and c not in exact, max_categories, min_numeric_ratio, max_na_tokens)
+        if spec is not None:
+            cols[c] = spec
+    return {"version": 1, "sample_rows": len(sample), "columns": cols}
+
+def deferred_columns(plan: dict | None) -> set:
+    """Planned columns whose parsing turns non-null text (junk tokens) into NaN."""
+    if not plan:
+        return set()
+    return {c for c, spec in plan["columns"].items() if spec.get("na_values") or spec.get("parse") == "after"}
+
+def _read_options(plan: dict, present, defer=()) -> dict:
+    """``pd.read_csv`` keyword arguments applying ``plan`` to the columns in ``present`` (``defer`` read as text)."""
+    dtype, na_values, thousands = {}, {}, None
+    for c, spec in plan["columns"].items():
+        if c not in present or spec["dtype"] == "object":
+            continue
+        if spec.get("parse") == "after" or c in defer:
+            dtype[c] = object
+            continue
+        dtype[c] = spec["dtype"]
+        if spec.get("na_values"):
+            na_values[c] = spec["na_values"]
+        if spec.get("thousands"):
+            thousands = ","
+    return {"dtype": dtype, "na_values": na_values or None, "thousands": thousands}
+
+def apply_plan(df: pd.DataFrame, plan: dict | None, skip=()) -> pd.DataFrame:
+    """Cast an already-loaded frame to ``plan`` (Parquet input, text-parsed columns, or a failed planned read).
+
+    Numeric columns are parsed like ``coerce_numeric``; integer dtypes fall back to float64 when the values don't
+    fit. ``skip`` columns are left as they are. Only changed columns are replaced; ``df`` itself is not modified.
+    """
+    if not plan:
+        return df
+    cols = {}
+    for c, spec in plan["columns"].items():
+        dt = spec["dtype"]
+        if c not in df.columns or c in skip or dt == "object" or str(df[c].dtype) == dt:
+            continue
+        s = df[c]
+        if dt == "category":
+            cols[c] = s.astype("category")
+            continue
+        if not pd.api.types.is_numeric_dtype(s):
+            s = pd.to_numeric(s.astype(str).str.replace(",", "").str.strip(), errors="coerce")
+        if dt in _INT_DTYPES:
+            v = s.to_numpy(dtype=np.float64, na_value=np.nan)
+            v = v[~np.isnan(v)]
+            info = np.iinfo(dt.lower())
+            if len(v) and not ((v == np.round(v)).all() and info.min <= v.min() and v.max() <= info.max):
+                dt = "float64"
+        cols[c] = s.astype(dt)
+    if not cols:
+        return df
+    out = df.copy(deep=False)
+    for c, s in cols.items():
+        out[c] = s
+    return out
+
+def _read_csv(path_or_url, plan: dict | None, defer=(), **kw):
+    if not plan:
+        return pd.read_csv(path_or_url, comment='#', **kw)
+    present = pd.read_csv(path_or_url, comment='#', nrows=0).columns
+    opts = _read_options(plan, present, defer)
+    try:
+        return pd.read_csv(path_or_url, comment='#', **opts, **kw)
+    except (ValueError, TypeError, OverflowError) as e:
+        # a value the sample didn't cover (new junk token, decimals in an integer column...): safe path
+        logging.warning("dtype plan did not fit %s (%s); reading with default dtypes and casting", path_or_url, e)
+        return pd.read_csv(path_or_url, comment='#', **kw)
+
+def save_plan(plan: dict, outdir: Path) -> Path:
+    path = Path(outdir) / DTYPE_PLAN_FILE
+    path.write_text(json.dumps(plan, indent=2))
+    return path
+
+def load_plan(art_dir) -> dict | None:
+    p = Path(art_dir) / DTYPE_PLAN_FILE
+    return json.loads(p.read_text()) if p.exists() else None
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """Deep memory of a frame in MB, in total and per dtype."""
+    usage = df.memory_usage(deep=True, index=False)
+    by_dtype = {}
+    for c, b in usage.items():
+        k = str(df[c].dtype)
+        by_dtype[k] = by_dtype.get(k, 0) + int(b)
+    mb = 1 << 20
+    return {"rows": len(df), "columns": df.shape[1], "mb": round(int(usage.sum()) / mb, 3),
+            "by_dtype_mb": {k: round(v / mb, 3) for k, v in sorted(by_dtype.items(), key=lambda kv: -kv[1])}}
+
+# --- loading ----------------------------------------------------------------------------------------------
+
+def load_table(path_or_url: str | Path, plan: dict | None = None, defer_parse: bool = False) -> pd.DataFrame:
+    """Whole table; with a ``plan`` (``plan_dtypes`` / ``load_plan``) columns are read straight into its dtypes.
+
+    ``defer_parse`` leaves ``deferred_columns(plan)`` as text; finish with ``apply_plan(df, plan)`` after cleaning.
+    """
+    skip = deferred_columns(plan) if defer_parse else set()
+    if is_parquet(path_or_url):
+        return apply_plan(pd.read_parquet(path_or_url), plan, skip)
+    return apply_plan(_read_csv(path_or_url, plan, skip), plan, skip)
+
+def iter_table(path_or_url: str | Path, chunksize: int, plan: dict | None = None):
+    """Stream the table in DataFrame chunks (same parsing as load_table; row index continues across chunks)."""
+    if not is_parquet(path_or_url):
+        done = 0
+        try:
+            for chunk in _read_csv(path_or_url, plan, chunksize=chunksize):
+                yield apply_plan(chunk, plan)
+                done += 1
+        except (ValueError, TypeError, OverflowError) as e:
+            if not plan:
+                raise
+            # same fallback as _read_csv, resuming after the chunks already yielded
+            logging.warning("dtype plan did not fit %s (%s); reading with default dtypes and casting", path_or_url, e)
+            for i, chunk in enumerate(pd.read_csv(path_or_url, comment='#', chunksize=chunksize)):
+                if i >= done:
+                    yield apply_plan(chunk, plan)
+        return
+    import pyarrow.parquet as pq
+    offset = 0
+    for batch in pq.ParquetFile(path_or_url).iter_batches(batch_size=chunksize):
+        df = batch.to_pandas()
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        offset += len(df)
+        yield apply_plan(df, plan)
+
+def count_rows(path: str | Path) -> int:
+    """Data rows of a local table without parsing it (Parquet footer, or non-comment CSV lines minus the header).
+
+    CSV counts are an upper bound when quoted fields contain newlines.
+    """
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        n = sum(1 for line in f if line.strip() and not line.startswith(b"#"))
+    return max(n - 1, 0)
+
+def load_crossmatched(path_or_url: str | Path, other: str | Path, radius_arcsec: float = 2.0,
+                      prefix: str = "xm_", how: str = "left") -> pd.DataFrame:
+    """``path`` with its nearest ``other`` row within ``radius_arcsec`` joined on (columns ``<prefix>*``).
+
+    Uses a sky index on unit vectors (``exo_ml.sky``), cached next to ``other`` as ``<other>.sky.joblib``.
+    """
+    from .sky import SkyIndex, cross_match
+    return cross_match(load_table(path_or_url), load_table(other), radius_arcsec, prefix=prefix, how=how,
+                       index=SkyIndex.for_table(other))
 
 def basic_clean(df: pd.DataFrame) -> pd.DataFrame:
-    """Drop all-null columns, then rows with any NaN."""
-    df = df.dropna(axis='columns', how='all')
-    df = df.dropna(axis='rows', how='any')
-    return df
+    """Drop all-null columns, then rows with any NaN (one copy: both masks are computed first)."""
+    notna = df.notna()
+    cols = notna.any(axis=0)
+    rows = notna.loc[:, cols].all(axis=1)
+    if cols.all() and rows.all():
+        return df
+    return df.loc[rows.to_numpy(), cols.to_numpy()]
 
 def train_test_split_df(df: pd.DataFrame, target: str, test_size: float, random_state: int, stratify: bool = True):
     from sklearn.model_selection import train_test_split
@@ -2,13 +2,20 @@ import pandas as pd
 import numpy as np
 
 def coerce_numeric(df: pd.DataFrame, min_numeric_ratio: float = 0.95) -> pd.DataFrame:
-    out = df.copy()
-    for c in out.columns:
-        if pd.api.types.is_object_dtype(out[c]):
+    converted = {}
+    for c in df.columns:
+        if pd.api.types.is_object_dtype(df[c]):
             # try numeric conversion
-            s_num = pd.to_numeric(out[c].astype(str).str.replace(",","").str.strip(),
+            s_num = pd.to_numeric(df[c].astype(str).str.replace(",","").str.strip(),
                                   errors="coerce")
             ratio = s_num.notna().mean()
             if ratio >= min_numeric_ratio:
-                out[c] = s_num  # convert this column to numeric
+                converted[c] = s_num  # convert this column to numeric
+    if not converted:
+        # e.g. frames loaded with a dtype plan: numeric columns were parsed during the read
+        return df
+    # shallow copy: untouched columns share memory with the input, converted ones are replaced
+    out = df.copy(deep=False)
+    for c, s in converted.items():
+        out[c] = s
     return out
\ No newline at end of file
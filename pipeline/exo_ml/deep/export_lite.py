@@ -0,0 +1,151 @@
+from __future__ import annotations
+import argparse, hashlib, json, time
+from pathlib import Path
+
+from .lite_runtime import LITE_FILES
+
+def _tabnet_zip(art: Path) -> Path | None:
+    # TabNetClassifier.save_model appends ".zip" to whatever it is given
+    for name in ("tabnet.zip", "tabnet.zip.zip"):
+        if (art / name).exists():
+            return art / name
+    return None
+
+def _export_keras(art: Path, quantize: str) -> Path:
+    import tensorflow as tf
+    from tensorflow import keras
+    from . import models_keras  # noqa: F401  (registers custom layers)
+
+    model = keras.models.load_model(art / "dl_model.keras")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize in ("float16", "int8"):
+        # int8 = dynamic-range quantization (int8 weights, float activations; no calibration set needed)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    out = art / LITE_FILES["tflite"]
+    out.write_bytes(converter.convert())
+    return out
+
+def _load_tabnet(art: Path):
+    from pytorch_tabnet.tab_model import TabNetClassifier
+    clf = TabNetClassifier()
+    clf.load_model(str(_tabnet_zip(art)))
+    return clf
+
+def _export_tabnet(art: Path, quantize: str, input_dim: int) -> Path:
+    import torch
+
+    clf = _load_tabnet(art)
+
+    class _Proba(torch.nn.Module):
+        def __init__(self, network):
+            super().__init__()
+            self.network = network
+
+        def forward(self, x):
+            logits, _ = self.network(x)
+            return torch.softmax(logits, dim=1)
+
+    net = _Proba(clf.network).eval().cpu()
+    out = art / LITE_FILES["onnx"]
+    torch.onnx.export(net, torch.zeros(2, input_dim), str(out), input_names=["features"], output_names=["proba"],
+                      dynamic_axes={"features": {0: "batch"}, "proba": {0: "batch"}}, opset_version=17)
+    if quantize == "int8":
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        tmp = out.with_suffix(".fp32.onnx")
+        out.replace(tmp)
+        quantize_dynamic(str(tmp), str(out), weight_type=QuantType.QInt8)
+        tmp.unlink()
+    elif quantize == "float16":
+        import onnx
+        from onnxconverter_common import float16
+        onnx.save(float16.convert_float_to_float16(onnx.load(str(out)), keep_io_types=True), str(out))
+    return out
+
+def _reference_predict_proba(art: Path, kind: str, meta: dict):
+    """Original-runtime predict_proba on preprocessed input (for parity/latency)."""
+    if kind == "tabnet":
+        clf = _load_tabnet(art)
+        return clf.predict_proba
+    from tensorflow import keras
+    from . import models_keras  # noqa: F401
+    model = keras.models.load_model(art / "dl_model.keras")
+    if meta.get("model_name") == "cnn1d":
+        return lambda X: model.predict(X.reshape((X.shape[0], X.shape[1], 1)), verbose=0)
+    return lambda X: model.predict(X, verbose=0)
+
+def _best_of(fn, repeats: int = 3) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export a Keras / TabNet artifact to a lean CPU runtime (TFLite / ONNX)")
+    ap.add_argument("--artifacts", required=True, help="DL artifact folder (dl_model.keras or tabnet.zip)")
+    ap.add_argument("--quantize", default="none", choices=["none", "float16", "int8"], help="Weight quantization")
+    ap.add_argument("--check-input", default=None, help="CSV to run the accuracy-parity + latency check on")
+    ap.add_argument("--threads", type=int, default=None, help="Runtime threads for the latency check")
+    args = ap.parse_args(argv)
+
+    art = Path(args.artifacts)
+    meta = json.loads((art / "metadata.json").read_text())
+    kind = "tabnet" if _tabnet_zip(art) is not None else "keras"
+    for fname in LITE_FILES.values():
+        (art / fname).unlink(missing_ok=True)
+
+    t0 = time.perf_counter()
+    if kind == "tabnet":
+        import joblib
+        input_dim = meta.get("input_dim")
+        if input_dim is None:
+            pre = joblib.load(art / "preprocessor.joblib")
+            input_dim = len(pre.get_feature_names_out())
+        out = _export_tabnet(art, args.quantize, int(input_dim))
+    else:
+        out = _export_keras(art, args.quantize)
+    lite_meta = {
+        "source": kind,
+        "format": out.suffix.lstrip("."),
+        "quantize": args.quantize,
+        "bytes": out.stat().st_size,
+        "export_s": round(time.perf_counter() - t0, 3),
+        "version": f"{art.parent.name}/{art.name}:{args.quantize}:{hashlib.sha256(out.read_bytes()).hexdigest()[:12]}",
+    }
+    (art / "lite_metadata.json").write_text(json.dumps(lite_meta, indent=2))
+    print(f"Exported {kind} -> {out.name} ({lite_meta['bytes'] / 1024:.1f} KiB, quantize={args.quantize})")
+
+    if not args.check_input:
+        return
+
+    import numpy as np
+    from ..data import load_table
+    from .lite_runtime import LiteModel
+    lite = LiteModel(art, num_threads=args.threads)
+    df = load_table(args.check_input)
+    X = lite.transform(df.drop(columns=meta.get("drop_cols", []) + [meta["target"]], errors="ignore"))
+    ref_fn = _reference_predict_proba(art, kind, meta)
+    p_ref, p_lite = np.asarray(ref_fn(X)), lite.predict_proba_transformed(X)
+
+    report = {
+        "rows": int(len(X)),
+        "max_abs_proba_diff": float(np.max(np.abs(p_ref - p_lite))) if len(X) else 0.0,
+        "label_agreement": float(np.mean(p_ref.argmax(1) == p_lite.argmax(1))) if len(X) else 1.0,
+        "reference_batch_s": _best_of(lambda: ref_fn(X)),
+        "lite_batch_s": _best_of(lambda: lite.predict_proba_transformed(X)),
+        "reference_single_row_ms": _best_of(lambda: ref_fn(X[:1])) * 1e3,
+        "lite_single_row_ms": _best_of(lambda: lite.predict_proba_transformed(X[:1])) * 1e3,
+    }
+    if meta["target"] in df.columns:
+        y = df[meta["target"]].astype(str).to_numpy()
+        classes = np.asarray(meta["classes"]).astype(str)
+        report["reference_accuracy"] = float(np.mean(classes[p_ref.argmax(1)] == y))
+        report["lite_accuracy"] = float(np.mean(classes[p_lite.argmax(1)] == y))
+    (art / "lite_report.json").write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
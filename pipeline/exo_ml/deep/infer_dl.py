@@ -1,19 +1,23 @@
 from __future__ import annotations
 import argparse, json
 from pathlib import Path
-import numpy as np
-import pandas as pd
-import joblib
-from tensorflow import keras
+from ..outputs import add_output_args
 
-from ..data import load_table
-
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Keras DL inference for TFOPWG (tabular)")
     ap.add_argument("--input", required=True, help="CSV/TSV to predict on")
     ap.add_argument("--artifacts", required=True, help="DL artifact folder (contains dl_model.keras & preprocessor.joblib)")
-    ap.add_argument("--output", default=None, help="Output CSV path (defaults to <artifacts>/predictions.csv)")
-    args = ap.parse_args()
+    ap.add_argument("--output", default=None, help="Output path (defaults to <artifacts>/predictions.<format>)")
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    import numpy as np
+    import pandas as pd
+    import joblib
+    from tensorflow import keras
+    from ..data import load_table
+    from ..outputs import write_predictions, default_path
+    from . import models_keras  # noqa: F401  (registers custom layers for load_model)
 
     art = Path(args.artifacts)
     pre = joblib.load(art / "preprocessor.joblib")
@@ -43,13 +47,12 @@ def main():
     pred_idx = np.argmax(proba, axis=1)
     pred_label = [classes[i] for i in pred_idx]
 
-    out = df.copy()
-    out["pred_label"] = pred_label
+    preds = pd.DataFrame({"pred_label": pred_label}, index=df.index)
     for i, c in enumerate(classes):
-        out[f"proba_{c}"] = proba[:, i]
+        preds[f"proba_{c}"] = proba[:, i]
 
-    out_path = Path(args.output) if args.output else (art / "predictions.csv")
-    out.to_csv(out_path, index=False)
+    out_path = Path(args.output) if args.output else default_path(art, args.format)
+    write_predictions(df, preds, out_path, args.format, args.keep_columns)
     print(f"Wrote: {out_path.resolve()}")
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from ..outputs import add_output_args
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Lean CPU inference for exported Keras / TabNet artifacts")
+    ap.add_argument("--input", required=True, help="CSV/TSV to predict on")
+    ap.add_argument("--artifacts", required=True, help="Artifact folder with model.tflite / model.onnx (see export_lite)")
+    ap.add_argument("--output", default=None, help="Output path (defaults to <artifacts>/predictions.<format>)")
+    add_output_args(ap)
+    ap.add_argument("--threads", type=int, default=None, help="Runtime intra-op threads")
+    ap.add_argument("--batch-size", type=int, default=1024)
+    args = ap.parse_args(argv)
+
+    import pandas as pd
+    from ..data import load_table
+    from ..outputs import write_predictions, default_path
+    from .lite_runtime import LiteModel
+
+    art = Path(args.artifacts)
+    model = LiteModel(art, num_threads=args.threads, batch_size=args.batch_size)
+
+    df = load_table(args.input)
+    df = df.drop(columns=model.meta.get("drop_cols", []) + [model.meta["target"]], errors="ignore")
+
+    proba = model.predict_proba(df)
+    preds = pd.DataFrame({"pred_label": model.classes_[proba.argmax(axis=1)]}, index=df.index)
+    for i, c in enumerate(model.classes_):
+        preds[f"proba_{c}"] = proba[:, i]
+
+    out_path = Path(args.output) if args.output else default_path(art, args.format)
+    write_predictions(df, preds, out_path, args.format, args.keep_columns)
+    print(f"Wrote: {out_path.resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Lean CPU inference for exported DL artifacts (no TensorFlow / torch at serve time).
+
+``export_lite`` writes ``model.tflite`` (Keras) or ``model.onnx`` (TabNet) next to the usual
+``preprocessor.joblib`` / ``feature_columns.json`` / ``metadata.json``. ``LiteModel`` loads that
+folder with the smallest runtime available:
+
+- TFLite: ``tflite_runtime`` → ``ai_edge_litert`` → ``tensorflow.lite`` (fallback)
+- ONNX:   ``onnxruntime``
+
+A TFLite ``Interpreter`` is not thread-safe (inputs are resized and outputs read in place), so each thread
+calling ``predict`` gets its own interpreter; an ONNX ``InferenceSession`` is shared.
+"""
+from __future__ import annotations
+import json
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+LITE_FILES = {"tflite": "model.tflite", "onnx": "model.onnx"}
+
+def find_lite_model(art_dir: str | Path) -> Path | None:
+    art = Path(art_dir)
+    for fname in LITE_FILES.values():
+        if (art / fname).exists():
+            return art / fname
+    return None
+
+def _tflite_interpreter(path: Path, num_threads: int | None):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tensorflow.lite import Interpreter
+            except ImportError as e:
+                raise ImportError("No TFLite runtime found. `pip install tflite-runtime` (or ai-edge-litert)") from e
+    return Interpreter(model_path=str(path), num_threads=num_threads)
+
+class LiteModel:
+    """Preprocessor + exported network; ``predict``/``predict_proba`` take raw feature frames."""
+
+    def __init__(self, art_dir: str | Path, num_threads: int | None = None, batch_size: int = 1024):
+        import joblib
+        art = Path(art_dir)
+        path = find_lite_model(art)
+        if path is None:
+            raise FileNotFoundError(f"No exported model ({', '.join(LITE_FILES.values())}) in {art}")
+        self.path = path
+        self.batch_size = batch_size
+        self.pre = joblib.load(art / "preprocessor.joblib")
+        self.feature_columns = json.loads((art / "feature_columns.json").read_text())
+        self.meta = json.loads((art / "metadata.json").read_text())
+        self.classes_ = np.asarray(self.meta["classes"])
+        self.model_kind = self.meta.get("model_kind", self.meta.get("model_name", "mlp"))
+        lite_meta = art / "lite_metadata.json"
+        self.version = json.loads(lite_meta.read_text()).get("version") if lite_meta.exists() else None
+
+        if path.suffix == ".tflite":
+            self._num_threads = num_threads
+            self._local = threading.local()
+            self._tflite()      # fail at load time, not on the first request
+            self._run = self._run_tflite
+        else:
+            try:
+                import onnxruntime as ort
+            except ImportError as e:
+                raise ImportError("onnxruntime is not installed. `pip install onnxruntime`") from e
+            opts = ort.SessionOptions()
+            if num_threads:
+                opts.intra_op_num_threads = num_threads
+                opts.inter_op_num_threads = 1
+            self._sess = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+            self._input_name = self._sess.get_inputs()[0].name
+            self._run = self._run_onnx
+
+    # --- runtimes ---
+    def _tflite(self):
+        """This thread's interpreter state (created on the thread's first call)."""
+        st = self._local
+        if not hasattr(st, "interp"):
+            st.interp = _tflite_interpreter(self.path, self._num_threads)
+            st.inp = st.interp.get_input_details()[0]
+            st.out = st.interp.get_output_details()[0]
+            st.shape = None
+        return st
+
+    def _run_tflite(self, X: np.ndarray) -> np.ndarray:
+        if self.model_kind == "cnn1d":
+            X = X.reshape((X.shape[0], X.shape[1], 1))
+        st = self._tflite()
+        if st.shape != X.shape:
+            st.interp.resize_tensor_input(st.inp["index"], list(X.shape))
+            st.interp.allocate_tensors()
+            st.shape = X.shape
+        st.interp.set_tensor(st.inp["index"], X.astype(st.inp["dtype"], copy=False))
+        st.interp.invoke()
+        return st.interp.get_tensor(st.out["index"]).copy()
+
+    def _run_onnx(self, X: np.ndarray) -> np.ndarray:
+        return self._sess.run(None, {self._input_name: X})[0]
+
+    # --- public API ---
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        X = self.pre.transform(df.reindex(columns=self.feature_columns, fill_value=np.nan))
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict_proba_transformed(self, X: np.ndarray) -> np.ndarray:
+        parts = [self._run(X[i:i + self.batch_size]) for i in range(0, len(X), self.batch_size)]
+        return np.vstack(parts) if parts else np.empty((0, len(self.classes_)), dtype=np.float32)
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        return self.predict_proba_transformed(self.transform(df))
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(df), axis=1)]
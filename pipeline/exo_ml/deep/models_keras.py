@@ -37,10 +37,15 @@ def build_cnn1d(seq_len: int, n_classes: int) -> keras.Model:
     outputs = layers.Dense(n_classes, activation="softmax")(x)
     return keras.Model(inputs, outputs, name="cnn1d_tabular")
 
+@keras.saving.register_keras_serializable(package="exo_ml")
 class TransformerBlock(layers.Layer):
-    def __init__(self, d_model: int, num_heads: int, mlp_ratio: float = 2.0, dropout: float = 0.1):
-        super().__init__()
-        self.attn = layers.MultiHeadAttention(num_heads=num_heads, key_dim=d_model)
+    def __init__(self, d_model: int, num_heads: int, mlp_ratio: float = 2.0, dropout: float = 0.1,
+                 key_dim: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        # key_dim=None keeps the original (per-head width == d_model) behaviour
+        self.d_model, self.num_heads, self.mlp_ratio, self.dropout = d_model, num_heads, mlp_ratio, dropout
+        self.key_dim = key_dim
+        self.attn = layers.MultiHeadAttention(num_heads=num_heads, key_dim=key_dim or d_model)
         self.drop1 = layers.Dropout(dropout)
         self.norm1 = layers.LayerNormalization(epsilon=1e-6)
         self.mlp = keras.Sequential([
@@ -58,6 +63,12 @@ class TransformerBlock(layers.Layer):
         h2 = self.drop2(h2, training=training)
         return self.norm2(x + h2)
 
+    def get_config(self):
+        cfg = super().get_config()
+        cfg.update(d_model=self.d_model, num_heads=self.num_heads, mlp_ratio=self.mlp_ratio,
+                   dropout=self.dropout, key_dim=self.key_dim)
+        return cfg
+
 def build_feature_transformer(seq_len: int, n_classes: int, d_model: int = 128, depth: int = 4, heads: int = 8, dropout: float = 0.1) -> keras.Model:
     inputs = keras.Input(shape=(seq_len,), name="features")
     x = layers.Reshape((seq_len, 1))(inputs)
@@ -73,3 +84,65 @@ def build_feature_transformer(seq_len: int, n_classes: int, d_model: int = 128,
     x = layers.Dropout(0.2)(x)
     outputs = layers.Dense(n_classes, activation="softmax")(x)
     return keras.Model(inputs, outputs, name="ft_transformer_light")
+
+@keras.saving.register_keras_serializable(package="exo_ml")
+class FeatureTokenizer(layers.Layer):
+    """One token per *raw* feature: x_i * W_i + b_i for numerics, an embedding per categorical field.
+
+    Input is the flat output of ``build_token_preprocessor``: ``n_num`` scaled numeric columns
+    followed by one ordinal code per categorical field (-1 = missing/unknown).
+    """
+    def __init__(self, n_num: int, cat_cardinalities: list[int], d_model: int, **kwargs):
+        super().__init__(**kwargs)
+        self.n_num = int(n_num)
+        self.cat_cardinalities = [int(c) for c in cat_cardinalities]
+        self.d_model = int(d_model)
+        # +1 per field reserves slot 0 for missing/unknown; offsets share a single table
+        sizes = [c + 1 for c in self.cat_cardinalities]
+        self._offsets = [sum(sizes[:i]) for i in range(len(sizes))]
+        self.cat_embedding = layers.Embedding(sum(sizes), d_model) if sizes else None
+
+    def build(self, input_shape):
+        if self.n_num:
+            self.num_weight = self.add_weight(name="num_weight", shape=(self.n_num, self.d_model),
+                                              initializer="glorot_uniform")
+            self.num_bias = self.add_weight(name="num_bias", shape=(self.n_num, self.d_model),
+                                            initializer="zeros")
+        super().build(input_shape)
+
+    def call(self, x):
+        tokens = []
+        if self.n_num:
+            x_num = x[:, :self.n_num]
+            tokens.append(x_num[:, :, None] * self.num_weight[None] + self.num_bias[None])
+        if self.cat_embedding is not None:
+            codes = tf.cast(tf.round(x[:, self.n_num:]), "int32") + 1
+            codes = tf.clip_by_value(codes, 0, tf.constant(self.cat_cardinalities)[None, :])
+            tokens.append(self.cat_embedding(codes + tf.constant(self._offsets)[None, :]))
+        return tf.concat(tokens, axis=1) if len(tokens) > 1 else tokens[0]
+
+    def get_config(self):
+        cfg = super().get_config()
+        cfg.update(n_num=self.n_num, cat_cardinalities=self.cat_cardinalities, d_model=self.d_model)
+        return cfg
+
+def build_tokenized_transformer(n_num: int, cat_cardinalities: list[int], n_classes: int, d_model: int = 64,
+                                depth: int = 2, heads: int = 4, key_dim: int | None = None,
+                                dropout: float = 0.1) -> keras.Model:
+    """FT-Transformer over raw features: seq_len == n_num + n_cat (~66) instead of the OHE width.
+
+    ``key_dim`` defaults to ``d_model // heads`` (heads split the model width instead of each
+    projecting to the full d_model), which keeps attention cost roughly independent of ``heads``.
+    """
+    n_cat = len(cat_cardinalities)
+    seq_len = n_num + n_cat
+    key_dim = key_dim or max(d_model // heads, 8)
+    inputs = keras.Input(shape=(seq_len,), name="features")
+    x = FeatureTokenizer(n_num, cat_cardinalities, d_model, name="feature_tokenizer")(inputs)
+    for _ in range(depth):
+        x = TransformerBlock(d_model, heads, mlp_ratio=2.0, dropout=dropout, key_dim=key_dim)(x)
+    x = layers.GlobalAveragePooling1D()(x)
+    x = layers.Dense(128, activation="relu")(x)
+    x = layers.Dropout(0.2)(x)
+    outputs = layers.Dense(n_classes, activation="softmax")(x)
+    return keras.Model(inputs, outputs, name="ft_transformer_tokenized")
@@ -0,0 +1,363 @@
+"""Local trial scheduler for DL architecture / hyperparameter search (Keras archs + TabNet).
+
+- The data is loaded, split and preprocessed **once** per study (``train_dl.prepare_data``) and stored as
+  ``<study>/data/*.npy`` + ``preprocessor.joblib``. Trials memory-map the arrays instead of re-reading the CSV.
+- Trials run in ``--workers`` spawned processes. Each worker is pinned to its own slice of CPUs
+  (``sched_setaffinity`` where available) and its TF / torch / OpenMP thread pools are sized to
+  ``--threads-per-trial``.
+- Median pruning: after ``--warmup-epochs``, a trial whose best ``val_accuracy`` so far is below the median
+  of the finished trials' best-so-far at the same epoch is stopped (status ``pruned``).
+- Every finished trial is appended to ``<study>/trials.jsonl``. Trial parameters are a deterministic function
+  of ``(seed, trial id)``, so rerunning the same command resumes: finished trials are skipped and
+  interrupted ones run again.
+- The best completed trial (by ``--metric`` on the validation split) is written as a standard artifact
+  folder (``dl_model.keras`` or ``tabnet.zip`` + ``preprocessor.joblib`` + metadata / metrics / predictions),
+  usable by ``infer-dl`` / ``export-lite``. The validation split drives early stopping, pruning and the
+  choice of trial, so it is reported as ``val_metrics.json``; ``test_metrics.json`` and the predictions come
+  from a ``--test-size`` split held out before any trial runs.
+
+    python -m exo_ml search-dl --input data/koi_toi_combined.csv --study studies/dl_v1 --trials 32 \\
+        --workers 4 --threads-per-trial 2 --epochs 80
+"""
+from __future__ import annotations
+import argparse, json, os
+from pathlib import Path
+import numpy as np
+
+KERAS_ARCHS = ["mlp", "mlp_bn", "cnn1d", "transformer"]
+
+# value forms: [choices...] | {"log": [lo, hi]} | {"uniform": [lo, hi]} | {"int": [lo, hi]} | constant
+DEFAULT_SPACE = {
+    "keras": {
+        "arch": KERAS_ARCHS,
+        "lr": {"log": [1e-4, 3e-3]},
+        "weight_decay": {"log": [1e-6, 1e-3]},
+        "batch_size": [128, 256, 512],
+    },
+    "tabnet": {
+        "n_d": [16, 32, 64],
+        "n_a": [16, 32, 64],
+        "n_steps": {"int": [3, 7]},
+        "gamma": {"uniform": [1.0, 2.0]},
+        "lambda_sparse": {"log": [1e-5, 1e-3]},
+        "lr": {"log": [1e-3, 2e-2]},
+    },
+}
+
+STUDY_FILE = "study.json"
+TRIALS_FILE = "trials.jsonl"
+
+def _sample(spec, rng):
+    if isinstance(spec, list):
+        return spec[int(rng.integers(len(spec)))]
+    if isinstance(spec, dict):
+        (kind, (lo, hi)), = spec.items()
+        if kind == "log":
+            return float(np.exp(rng.uniform(np.log(lo), np.log(hi))))
+        if kind == "uniform":
+            return float(rng.uniform(lo, hi))
+        if kind == "int":
+            return int(rng.integers(lo, hi + 1))
+        raise ValueError(f"Unknown search space form: {spec}")
+    return spec
+
+def sample_trial(space: dict, seed: int, trial_id: int) -> dict:
+    """Parameters for trial ``trial_id``; identical across runs so studies can resume."""
+    rng = np.random.default_rng([seed, trial_id])
+    families = sorted(space)
+    family = families[int(rng.integers(len(families)))]
+    params = {k: _sample(v, rng) for k, v in sorted(space[family].items())}
+    if family == "keras" and params.get("arch") not in KERAS_ARCHS:
+        raise ValueError(f"Unsupported arch in search space: {params.get('arch')} (choose from {KERAS_ARCHS})")
+    return {"family": family, **params}
+
+def should_prune(curve: list, finished: list, warmup: int, min_trials: int = 3) -> bool:
+    """Median stopping rule on best-so-far validation accuracy at the current epoch."""
+    e = len(curve) - 1
+    if e < warmup or not curve:
+        return False
+    peers = [max(c[:e + 1]) for c in finished if c]
+    if len(peers) < min_trials:
+        return False
+    return max(curve) < float(np.median(peers))
+
+def _cpu_slots(workers: int, threads: int) -> list:
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    # contiguous blocks of `threads` cores; wraps around (shares cores) when oversubscribed
+    return [sorted({cpus[(i * threads + j) % len(cpus)] for j in range(threads)}) for i in range(workers)]
+
+def _init_worker(slot_queue, threads: int):
+    """Runs once per spawned worker, before TF / torch are imported."""
+    cpus = slot_queue.get()
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            pass
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+def _run_keras(params, data, trial_dir: Path, epochs: int, finished: list, warmup: int, patience: int):
+    import tensorflow as tf
+    from tensorflow import keras
+    from .train_dl import pick_model, compute_class_weights
+    tf.config.threading.set_intra_op_parallelism_threads(int(os.environ.get("TF_NUM_INTRAOP_THREADS", "1")))
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    Xtr, Xv, ytr, yv = data["X_train_t"], data["X_val_t"], data["y_train"], data["y_val"]
+    input_dim, n_classes = Xtr.shape[1], data["n_classes"]
+    if params["arch"] == "cnn1d":
+        Xtr, Xv = Xtr.reshape((-1, input_dim, 1)), Xv.reshape((-1, input_dim, 1))
+    model = pick_model(params["arch"], input_dim, n_classes)
+    model.compile(optimizer=keras.optimizers.AdamW(learning_rate=params["lr"], weight_decay=params["weight_decay"]),
+                  loss=keras.losses.SparseCategoricalCrossentropy(), metrics=["accuracy"])
+    curve, state = [], {"pruned": False}
+
+    class Prune(keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            curve.append(float((logs or {}).get("val_accuracy", 0.0)))
+            if should_prune(curve, finished, warmup):
+                state["pruned"] = True
+                self.model.stop_training = True
+
+    es = keras.callbacks.EarlyStopping(patience=patience, restore_best_weights=True, monitor="val_accuracy")
+    model.fit(Xtr, ytr, validation_data=(Xv, yv), epochs=epochs, batch_size=int(params["batch_size"]),
+              class_weight=compute_class_weights(ytr), callbacks=[es, Prune()], verbose=0)
+    if state["pruned"]:
+        return curve, None, True
+    model.save(trial_dir / "dl_model.keras")
+    return curve, model.predict(Xv, verbose=0), False
+
+def _run_tabnet(params, data, trial_dir: Path, epochs: int, finished: list, warmup: int, patience: int):
+    import torch
+    from pytorch_tabnet.tab_model import TabNetClassifier
+    from pytorch_tabnet.callbacks import Callback
+    torch.set_num_threads(int(os.environ.get("OMP_NUM_THREADS", "1")))
+
+    Xtr, Xv, ytr, yv = data["X_train_t"], data["X_val_t"], data["y_train"], data["y_val"]
+    curve, state = [], {"pruned": False}
+
+    class Prune(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            curve.append(float((logs or {}).get("val_accuracy", 0.0)))
+            if should_prune(curve, finished, warmup):
+                state["pruned"] = True
+                self.trainer._stop_training = True
+
+    clf = TabNetClassifier(n_d=int(params["n_d"]), n_a=int(params["n_a"]), n_steps=int(params["n_steps"]),
+                           gamma=params["gamma"], lambda_sparse=params["lambda_sparse"],
+                           optimizer_fn=torch.optim.Adam, optimizer_params=dict(lr=params["lr"]),
+                           scheduler_params={"step_size": 50, "gamma": 0.9},
+                           scheduler_fn=torch.optim.lr_scheduler.StepLR, verbose=0, seed=42)
+    clf.fit(np.asarray(Xtr), ytr, eval_set=[(np.asarray(Xv), yv)], eval_name=["val"], eval_metric=["accuracy"],
+            max_epochs=epochs, patience=patience, batch_size=1024, virtual_batch_size=128, callbacks=[Prune()])
+    if state["pruned"]:
+        return curve, None, True
+    clf.save_model(str(trial_dir / "tabnet"))
+    return curve, clf.predict_proba(np.asarray(Xv)), False
+
+def run_trial(study_dir: str, trial_id: int, params: dict, epochs: int, finished: list, warmup: int,
+              patience: int) -> dict:
+    """Worker entry point: train one trial and return its record (never raises)."""
+    import time
+    study = Path(study_dir)
+    trial_dir = study / "trials" / f"{trial_id:04d}"
+    trial_dir.mkdir(parents=True, exist_ok=True)
+    rec = {"trial": trial_id, "params": params, "pid": os.getpid()}
+    t0 = time.perf_counter()
+    try:
+        data = load_arrays(study)
+        data["n_classes"] = len(json.loads((study / STUDY_FILE).read_text())["classes"])
+        run = _run_tabnet if params["family"] == "tabnet" else _run_keras
+        curve, proba, pruned = run(params, data, trial_dir, epochs, finished, warmup, patience)
+        rec.update(curve=curve, epochs=len(curve), status="pruned" if pruned else "complete")
+        if proba is not None:
+            from sklearn.metrics import accuracy_score, balanced_accuracy_score, f1_score
+            y_val, pred = np.asarray(data["y_val"]), np.argmax(proba, axis=1)
+            np.save(trial_dir / "val_proba.npy", proba)
+            rec["metrics"] = {"accuracy": float(accuracy_score(y_val, pred)),
+                              "balanced_accuracy": float(balanced_accuracy_score(y_val, pred)),
+                              "f1_macro": float(f1_score(y_val, pred, average="macro", zero_division=0))}
+    except Exception as e:
+        rec.update(status="failed", error=f"{type(e).__name__}: {e}")
+    rec["seconds"] = round(time.perf_counter() - t0, 2)
+    return rec
+
+ARRAYS = ("X_train_t", "X_val_t", "y_train", "y_val")
+TEST_ARRAYS = ("X_test_t", "y_test")     # only read when exporting the best trial
+
+def load_arrays(study: Path, keys=ARRAYS) -> dict:
+    return {k: np.load(study / "data" / f"{k}.npy", mmap_mode="r") for k in keys}
+
+def load_trials(study: Path) -> dict:
+    path = study / TRIALS_FILE
+    if not path.exists():
+        return {}
+    out = {}
+    for line in path.read_text().splitlines():
+        if line.strip():
+            rec = json.loads(line)
+            out[rec["trial"]] = rec
+    return out
+
+def prepare_study(study: Path, input_path: str, val_size: float, space: dict, seed: int,
+                  test_size: float = 0.2) -> dict:
+    """Create (or validate on resume) the study folder and its one-off preprocessed data."""
+    study.mkdir(parents=True, exist_ok=True)
+    meta_path = study / STUDY_FILE
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if (meta["seed"] != seed or meta["space"] != space or meta["val_size"] != val_size
+                or meta.get("test_size", 0.0) != test_size):
+            raise ValueError(f"{study} was created with a different seed / space / val_size / test_size; "
+                             "use a new --study")
+        return meta
+    import joblib
+    from .train_dl import prepare_data
+    d = prepare_data(input_path, val_size, random_state=seed, test_size=test_size)
+    (study / "data").mkdir(exist_ok=True)
+    for k in ARRAYS + (TEST_ARRAYS if test_size else ()):
+        a = np.asarray(d[k], dtype=np.float32 if k.startswith("X") else np.int64)
+        np.save(study / "data" / f"{k}.npy", a)
+    joblib.dump(d["pre"], study / "preprocessor.joblib")
+    d["X_val"].to_csv(study / "val_inputs.csv", index=False)
+    if test_size:
+        d["X_test"].to_csv(study / "test_inputs.csv", index=False)
+    meta = {"input": str(input_path), "val_size": val_size, "test_size": test_size, "seed": seed, "space": space,
+            "target": d["target"], "drop_cols": d["drop_cols"], "classes": [str(c) for c in d["classes"]],
+            "feature_columns": d["X_all"].columns.tolist(), "input_dim": int(d["X_train_t"].shape[1])}
+    meta_path.write_text(json.dumps(meta, indent=2))
+    return meta
+
+def _predict_proba(params: dict, trial_dir: Path, X) -> np.ndarray:
+    """Class probabilities of a saved trial model."""
+    X = np.asarray(X)
+    if params["family"] == "tabnet":
+        from pytorch_tabnet.tab_model import TabNetClassifier
+        clf = TabNetClassifier()
+        clf.load_model(str(trial_dir / "tabnet.zip"))
+        return clf.predict_proba(X)
+    from tensorflow import keras
+    from . import models_keras  # noqa: F401  (registers custom layers for load_model)
+    model = keras.models.load_model(trial_dir / "dl_model.keras")
+    if params["arch"] == "cnn1d":
+        X = X.reshape((-1, X.shape[1], 1))
+    return model.predict(X, verbose=0)
+
+def export_best(study: Path, meta: dict, best: dict, outdir_root: str, fmt: str = "csv") -> Path:
+    """Write the best trial as a standard DL artifact folder.
+
+    ``val_metrics.json`` scores the split the trial was selected on; ``test_metrics.json`` and the predictions
+    file score the held-out test split (studies created with ``--test-size 0`` get validation metrics only)."""
+    import shutil
+    import pandas as pd
+    from ..utils import timestamp_dir
+    from ..outputs import write_predictions, default_path
+    from .train_dl import _save_feature_columns, _save_metadata
+    from ..evaluate import evaluate_and_save
+
+    params = best["params"]
+    trial_dir = study / "trials" / f"{best['trial']:04d}"
+    outdir = timestamp_dir(outdir_root)
+    shutil.copy2(study / "preprocessor.joblib", outdir / "preprocessor.joblib")
+    if params["family"] == "tabnet":
+        shutil.copy2(trial_dir / "tabnet.zip", outdir / "tabnet.zip")
+        model_name = "tabnet"
+    else:
+        shutil.copy2(trial_dir / "dl_model.keras", outdir / "dl_model.keras")
+        model_name = params["arch"]
+    classes = meta["classes"]
+    _save_feature_columns(meta["feature_columns"], outdir)
+    _save_metadata(meta["target"], meta["drop_cols"], classes, outdir, arch=model_name, input_dim=meta["input_dim"],
+                   extra={"search": {"study": str(study), "trial": best["trial"], "params": params,
+                                     "val_metrics": best["metrics"]}})
+
+    y_val = load_arrays(study)["y_val"]
+    evaluate_and_save(y_val, np.argmax(np.load(trial_dir / "val_proba.npy"), axis=1), classes, outdir,
+                      prefix="val", encoded=True)
+    if not meta.get("test_size"):
+        return outdir
+    test = load_arrays(study, TEST_ARRAYS)
+    y_test, proba = np.asarray(test["y_test"]), _predict_proba(params, trial_dir, test["X_test_t"])
+    pred = np.argmax(proba, axis=1)
+    evaluate_and_save(y_test, pred, classes, outdir, prefix="test", encoded=True)
+    pred_df = pd.DataFrame({"true_label": [classes[i] for i in y_test], "pred_label": [classes[i] for i in pred]})
+    for i, c in enumerate(classes):
+        pred_df[f"proba_{c}"] = proba[:, i]
+    X_test = pd.read_csv(study / "test_inputs.csv", low_memory=False)
+    write_predictions(X_test, pred_df, default_path(outdir, fmt), fmt)
+    return outdir
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parallel DL architecture / hyperparameter search with pruning and resume")
+    ap.add_argument("--input", required=True, help="Path to CSV/TSV")
+    ap.add_argument("--study", required=True, help="Study folder (created, or resumed if it exists)")
+    ap.add_argument("--trials", type=int, default=24, help="Total trials in the study (including finished ones)")
+    ap.add_argument("--workers", type=int, default=2, help="Parallel trial processes")
+    ap.add_argument("--threads-per-trial", type=int, default=2, help="CPU cores / intra-op threads per worker")
+    ap.add_argument("--epochs", type=int, default=80)
+    ap.add_argument("--patience", type=int, default=12, help="Early-stopping patience (val_accuracy)")
+    ap.add_argument("--warmup-epochs", type=int, default=8, help="No pruning before this epoch")
+    ap.add_argument("--space", default=None, help="JSON search space (defaults to the built-in Keras + TabNet space)")
+    ap.add_argument("--metric", default="balanced_accuracy", choices=["balanced_accuracy", "accuracy", "f1_macro"])
+    ap.add_argument("--val-size", type=float, default=0.2, help="Validation fraction of the non-test rows")
+    ap.add_argument("--test-size", type=float, default=0.2,
+                    help="Held-out test fraction, scored only for the exported best trial (0 = none)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--outdir", default="artifacts/dl_search", help="Root for the best trial's artifact folder")
+    ap.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv", help="Predictions file format")
+    args = ap.parse_args(argv)
+
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    space = json.loads(Path(args.space).read_text()) if args.space else DEFAULT_SPACE
+    study = Path(args.study)
+    meta = prepare_study(study, args.input, args.val_size, space, args.seed, args.test_size)
+    done = {t: r for t, r in load_trials(study).items() if r["status"] in ("complete", "pruned")}
+    todo = [t for t in range(args.trials) if t not in done]
+    print(f"[search] {len(done)} finished trial(s) in {study}, {len(todo)} to run on {args.workers} worker(s)")
+
+    ctx = mp.get_context("spawn")   # TF / torch are not fork-safe
+    slots = ctx.Queue()
+    for s in _cpu_slots(args.workers, args.threads_per_trial):
+        slots.put(s)
+    log = open(study / TRIALS_FILE, "a")
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(slots, args.threads_per_trial)) as pool:
+            pending, queue = set(), list(todo)
+            while queue or pending:
+                while queue and len(pending) < args.workers:
+                    t = queue.pop(0)
+                    finished = [r["curve"] for r in done.values() if r["status"] == "complete"]
+                    pending.add(pool.submit(run_trial, str(study), t, sample_trial(space, args.seed, t), args.epochs,
+                                            finished, args.warmup_epochs, args.patience))
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in completed:
+                    rec = fut.result()
+                    log.write(json.dumps(rec) + "\n")
+                    log.flush()
+                    if rec["status"] != "failed":
+                        done[rec["trial"]] = rec
+                    score = rec.get("metrics", {}).get(args.metric)
+                    print(f"[search] trial {rec['trial']:>3} {rec['status']:<8} {rec['params']['family']:<6} "
+                          f"epochs={rec.get('epochs', 0):<3} {args.metric}={score if score is None else round(score, 4)} "
+                          f"({rec['seconds']}s)" + (f" {rec['error']}" if rec["status"] == "failed" else ""))
+    finally:
+        log.close()
+
+    complete = [r for r in done.values() if r["status"] == "complete"]
+    if not complete:
+        print("[search] no completed trials; nothing exported")
+        return
+    best = max(complete, key=lambda r: r["metrics"][args.metric])
+    outdir = export_best(study, meta, best, args.outdir, args.format)
+    n_pruned = sum(r["status"] == "pruned" for r in done.values())
+    print(f"[search] best trial {best['trial']} {best['params']} {args.metric}={best['metrics'][args.metric]:.4f} "
+          f"({len(complete)} complete, {n_pruned} pruned) -> {outdir.resolve()}")
+
+if __name__ == "__main__":
+    main()
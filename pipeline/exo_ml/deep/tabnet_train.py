@@ -2,21 +2,8 @@
 from __future__ import annotations
 import argparse, json
 import numpy as np
-import pandas as pd
 from pathlib import Path
-import joblib
-import matplotlib.pyplot as plt
-
-from ..config import load_config
-from ..data import load_table
-from ..preprocess import build_preprocessor
-from ..utils import timestamp_dir
-
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import (
-    accuracy_score, balanced_accuracy_score, precision_recall_fscore_support,
-    classification_report, confusion_matrix
-)
+from ..outputs import FORMATS
 
 def _save_feature_columns(cols, outdir: Path):
     (outdir / "feature_columns.json").write_text(json.dumps(list(cols), indent=2))
@@ -31,44 +18,7 @@ def _save_metadata(target, drop_cols, classes, outdir: Path, *, model_name: str
     }
     (outdir / "metadata.json").write_text(json.dumps(meta, indent=2))
 
-def _evaluate_and_save(y_true, y_pred, class_names, outdir: Path, prefix="test"):
-    acc  = accuracy_score(y_true, y_pred)
-    bacc = balanced_accuracy_score(y_true, y_pred)
-    prec_w, rec_w, f1_w, _ = precision_recall_fscore_support(y_true, y_pred, average="weighted", zero_division=0)
-    prec_m, rec_m, f1_m, _ = precision_recall_fscore_support(y_true, y_pred, average="macro", zero_division=0)
-
-    metrics = {
-        "accuracy": acc,
-        "balanced_accuracy": bacc,
-        "precision_weighted": prec_w,
-        "recall_weighted": rec_w,
-        "f1_weighted": f1_w,
-        "precision_macro": prec_m,
-        "recall_macro": rec_m,
-        "f1_macro": f1_m
-    }
-    (outdir / f"{prefix}_metrics.json").write_text(json.dumps(metrics, indent=2))
-
-    report = classification_report(y_true, y_pred, digits=4, target_names=class_names)
-    (outdir / f"{prefix}_classification_report.txt").write_text(report)
-
-    cm = confusion_matrix(y_true, y_pred, labels=range(len(class_names)))
-    fig = plt.figure(figsize=(5.2, 4.6), dpi=140)
-    ax = plt.gca()
-    im = ax.imshow(cm, interpolation="nearest")
-    ax.set_title("Confusion Matrix")
-    ax.set_xlabel("Predicted")
-    ax.set_ylabel("True")
-    ax.set_xticks(range(len(class_names))); ax.set_xticklabels(class_names, rotation=45, ha="right")
-    ax.set_yticks(range(len(class_names))); ax.set_yticklabels(class_names)
-    for (i, j), v in np.ndenumerate(cm):
-        ax.text(j, i, str(v), ha="center", va="center")
-    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-    fig.tight_layout()
-    fig.savefig(outdir / f"{prefix}_cm.png")
-    plt.close(fig)
-
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser(description="TabNet training for TFOPWG (tabular) — standardized artifacts")
     ap.add_argument("--input", required=True)
     ap.add_argument("--outdir", default="artifacts")
@@ -81,13 +31,22 @@ def main():
     ap.add_argument("--lr", type=float, default=2e-3)
     ap.add_argument("--max-epochs", type=int, default=200)
     ap.add_argument("--patience", type=int, default=20)
-    args = ap.parse_args()
+    ap.add_argument("--format", choices=sorted(FORMATS), default="csv", help="Predictions file format")
+    args = ap.parse_args(argv)
 
     try:
         from pytorch_tabnet.tab_model import TabNetClassifier
         import torch
     except Exception as e:
         raise RuntimeError("pip install pytorch-tabnet torch torchvision torchaudio") from e
+    import pandas as pd
+    import joblib
+    from sklearn.model_selection import train_test_split
+    from ..config import load_config
+    from ..data import load_table
+    from ..preprocess import build_preprocessor
+    from ..utils import timestamp_dir
+    from ..evaluate import evaluate_and_save
 
     cfg = load_config(None)
     target = cfg["target"]
@@ -150,13 +109,14 @@ def main():
 
     _save_feature_columns(feature_cols, outdir)
     _save_metadata(target, drop_cols, classes, outdir, model_name="tabnet")
-    _evaluate_and_save(y_val, y_val_pred, [str(c) for c in classes], outdir, prefix="test")
+    evaluate_and_save(y_val, y_val_pred, classes, outdir, prefix="test", encoded=True)
 
-    # predictions.csv with probabilities
-    pred_df = pd.DataFrame({"true_label": y_val, "pred_label": [classes[i] for i in y_val_pred]})
+    # predictions with probabilities
+    from ..outputs import write_predictions, default_path
+    pred_df = pd.DataFrame({"true_label": [classes[i] for i in y_val], "pred_label": [classes[i] for i in y_val_pred]})
     for i, c in enumerate(classes):
         pred_df[f"proba_{c}"] = y_val_proba[:, i]
-    pred_df.to_csv(outdir / "predictions.csv", index=False)
+    write_predictions(None, pred_df, default_path(outdir, args.format), args.format)
 
     print(f"Saved TabNet run to: {outdir.resolve()}")
 
@@ -2,31 +2,15 @@ from __future__ import annotations
 import argparse, json
 from pathlib import Path
 import numpy as np
-import pandas as pd
-import joblib
-import matplotlib.pyplot as plt
-
-import tensorflow as tf
-from tensorflow import keras
-
-from ..config import load_config
-from ..data import load_table
-from ..preprocess import build_preprocessor
-from ..utils import timestamp_dir
-from ..feature_select import drop_bad_columns
-from ..datafix import coerce_numeric
-from .models_keras import build_mlp, build_mlp_bn, build_cnn1d, build_feature_transformer
-
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import (
-    accuracy_score, balanced_accuracy_score, precision_recall_fscore_support,
-    classification_report, confusion_matrix
-)
+from ..outputs import add_output_args
+
+# TensorFlow, pandas and sklearn are imported inside the functions that use them,
+# so `python -m exo_ml train-dl --help` does not pay for the TF runtime.
 
 def _save_feature_columns(cols, outdir: Path):
     (outdir / "feature_columns.json").write_text(json.dumps(list(cols), indent=2))
 
-def _save_metadata(target, drop_cols, classes, outdir: Path, *, arch: str, input_dim: int):
+def _save_metadata(target, drop_cols, classes, outdir: Path, *, arch: str, input_dim: int, extra: dict | None = None):
     meta = {
         "pipeline_type": "DL",
         "model_name": arch,
@@ -35,52 +19,20 @@ def _save_metadata(target, drop_cols, classes, outdir: Path, *, arch: str, input
         "classes": list(classes),
         "input_dim": int(input_dim)
     }
+    meta.update(extra or {})
     (outdir / "metadata.json").write_text(json.dumps(meta, indent=2))
 
-def _evaluate_and_save(y_true, y_pred, class_names, outdir: Path, prefix="test"):
-    acc  = accuracy_score(y_true, y_pred)
-    bacc = balanced_accuracy_score(y_true, y_pred)
-    prec_w, rec_w, f1_w, _ = precision_recall_fscore_support(y_true, y_pred, average="weighted", zero_division=0)
-    prec_m, rec_m, f1_m, _ = precision_recall_fscore_support(y_true, y_pred, average="macro", zero_division=0)
-
-    metrics = {
-        "accuracy": acc,
-        "balanced_accuracy": bacc,
-        "precision_weighted": prec_w,
-        "recall_weighted": rec_w,
-        "f1_weighted": f1_w,
-        "precision_macro": prec_m,
-        "recall_macro": rec_m,
-        "f1_macro": f1_m
-    }
-    (outdir / f"{prefix}_metrics.json").write_text(json.dumps(metrics, indent=2))
-
-    report = classification_report(y_true, y_pred, digits=4, target_names=class_names)
-    (outdir / f"{prefix}_classification_report.txt").write_text(report)
-
-    cm = confusion_matrix(y_true, y_pred, labels=range(len(class_names)))
-    fig = plt.figure(figsize=(5.2, 4.6), dpi=140)
-    ax = plt.gca()
-    im = ax.imshow(cm, interpolation="nearest")
-    ax.set_title("Confusion Matrix")
-    ax.set_xlabel("Predicted")
-    ax.set_ylabel("True")
-    ax.set_xticks(range(len(class_names))); ax.set_xticklabels(class_names, rotation=45, ha="right")
-    ax.set_yticks(range(len(class_names))); ax.set_yticklabels(class_names)
-    for (i, j), v in np.ndenumerate(cm):
-        ax.text(j, i, str(v), ha="center", va="center")
-    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-    fig.tight_layout()
-    fig.savefig(outdir / f"{prefix}_cm.png")
-    plt.close(fig)
-
 def compute_class_weights(y: np.ndarray) -> dict:
     from sklearn.utils.class_weight import compute_class_weight
     classes = np.unique(y)
     weights = compute_class_weight(class_weight="balanced", classes=classes, y=y)
     return {int(c): float(w) for c, w in zip(classes, weights)}
 
-def pick_model(arch: str, input_dim: int, n_classes: int):
+TOKEN_ARCHS = ["ft_tokens"]
+
+def pick_model(arch: str, input_dim: int, n_classes: int, *, cat_cardinalities: list[int] | None = None,
+               transformer_kw: dict | None = None):
+    from .models_keras import build_mlp, build_mlp_bn, build_cnn1d, build_feature_transformer, build_tokenized_transformer
     arch = arch.lower()
     if arch == "mlp":
         return build_mlp(input_dim, n_classes)
@@ -90,24 +42,30 @@ def pick_model(arch: str, input_dim: int, n_classes: int):
         return build_cnn1d(input_dim, n_classes)
     if arch in ["transformer", "ft", "ft_transformer"]:
         return build_feature_transformer(input_dim, n_classes)
+    if arch in TOKEN_ARCHS:
+        cards = list(cat_cardinalities or [])
+        return build_tokenized_transformer(input_dim - len(cards), cards, n_classes, **(transformer_kw or {}))
     raise ValueError(f"Unknown arch: {arch}")
 
-def main():
-    ap = argparse.ArgumentParser(description="DL for TFOPWG (tabular) — standardized artifacts")
-    ap.add_argument("--input", required=True, help="Path to CSV/TSV")
-    ap.add_argument("--outdir", default="artifacts", help="Artifacts root directory")
-    ap.add_argument("--arch", default="mlp_bn", choices=["mlp_bn","mlp","transformer","cnn1d"], help="DL architecture")
-    ap.add_argument("--epochs", type=int, default=100)
-    ap.add_argument("--batch-size", type=int, default=256)
-    ap.add_argument("--val-size", type=float, default=0.2, help="Validation fraction for holdout")
-    args = ap.parse_args()
+def prepare_data(input_path, val_size: float = 0.2, *, tokenized: bool = False, random_state: int = 42,
+                 test_size: float = 0.0) -> dict:
+    """Load, clean, split and preprocess once; shared by ``main`` and the trial scheduler (``search.py``).
+
+    ``test_size`` > 0 first holds out a stratified test split (``X_test`` / ``X_test_t`` / ``y_test``) that
+    neither training nor validation sees; ``val_size`` is then a fraction of the remaining rows."""
+    from sklearn.model_selection import train_test_split
+    from ..config import load_config
+    from ..data import load_table
+    from ..preprocess import build_preprocessor, build_token_preprocessor
+    from ..feature_select import drop_bad_columns
+    from ..datafix import coerce_numeric
 
     cfg = load_config(None)
     target = cfg["target"]
     drop_cols = cfg["drop_cols"]
 
     # Load
-    df = load_table(args.input)
+    df = load_table(input_path)
     df = df.dropna(axis="columns", how="all")
     if target not in df.columns:
         raise ValueError(f"Target column '{target}' not in input.")
@@ -125,23 +83,66 @@ def main():
 
     # Split
     X_all = df.drop(columns=[target])
+    X_rest, y_rest, X_test, y_test = X_all, y, None, None
+    if test_size:
+        X_rest, X_test, y_rest, y_test = train_test_split(
+            X_all, y, test_size=test_size, stratify=y, random_state=random_state
+        )
     X_train, X_val, y_train, y_val = train_test_split(
-        X_all, y, test_size=args.val_size, stratify=y, random_state=42
+        X_rest, y_rest, test_size=val_size, stratify=y_rest, random_state=random_state
     )
 
-    # Preprocess
-    pre = build_preprocessor(X_train)
+    # Preprocess (tokenized transformer keeps one column per raw feature)
+    pre = build_token_preprocessor(X_train) if tokenized else build_preprocessor(X_train)
     X_train_t = pre.fit_transform(X_train)
     X_val_t   = pre.transform(X_val)
+    X_test_t  = pre.transform(X_test) if X_test is not None else None
     if hasattr(X_train_t, "toarray"):
         X_train_t = X_train_t.toarray()
         X_val_t   = X_val_t.toarray()
+        X_test_t  = X_test_t.toarray() if X_test_t is not None else None
+
+    return {"target": target, "drop_cols": drop_cols, "classes": classes, "pre": pre,
+            "X_all": X_all, "X_val": X_val, "X_train_t": X_train_t, "X_val_t": X_val_t,
+            "y_train": y_train, "y_val": y_val, "X_test": X_test, "X_test_t": X_test_t, "y_test": y_test}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="DL for TFOPWG (tabular) — standardized artifacts")
+    ap.add_argument("--input", required=True, help="Path to CSV/TSV")
+    ap.add_argument("--outdir", default="artifacts", help="Artifacts root directory")
+    ap.add_argument("--arch", default="mlp_bn", choices=["mlp_bn","mlp","transformer","cnn1d","ft_tokens"], help="DL architecture")
+    # ft_tokens only: one token per raw feature, lighter attention
+    ap.add_argument("--d-model", type=int, default=64)
+    ap.add_argument("--depth", type=int, default=2)
+    ap.add_argument("--heads", type=int, default=4)
+    ap.add_argument("--key-dim", type=int, default=None, help="Per-head key width (default d_model // heads)")
+    ap.add_argument("--epochs", type=int, default=100)
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--val-size", type=float, default=0.2, help="Validation fraction for holdout")
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    import joblib
+    import pandas as pd
+    from tensorflow import keras
+    from ..preprocess import token_cardinalities
+    from ..utils import timestamp_dir
+    from ..evaluate import evaluate_and_save, save_curves
+    from ..outputs import write_predictions, default_path
+
+    tokenized = args.arch in TOKEN_ARCHS
+    d = prepare_data(args.input, args.val_size, tokenized=tokenized)
+    target, drop_cols, classes, pre = d["target"], d["drop_cols"], d["classes"], d["pre"]
+    X_all, X_val = d["X_all"], d["X_val"]
+    X_train_t, X_val_t, y_train, y_val = d["X_train_t"], d["X_val_t"], d["y_train"], d["y_val"]
 
     input_dim = X_train_t.shape[1]
     n_classes = len(classes)
 
     # Model
-    model = pick_model(args.arch, input_dim, n_classes)
+    cat_cards = token_cardinalities(pre)[1] if tokenized else None
+    transformer_kw = dict(d_model=args.d_model, depth=args.depth, heads=args.heads, key_dim=args.key_dim)
+    model = pick_model(args.arch, input_dim, n_classes, cat_cardinalities=cat_cards, transformer_kw=transformer_kw)
     optimizer = keras.optimizers.AdamW(learning_rate=3e-4, weight_decay=1e-4)
     model.compile(optimizer=optimizer, loss=keras.losses.SparseCategoricalCrossentropy(), metrics=["accuracy"])
 
@@ -172,29 +173,22 @@ def main():
     # Standardized eval bundle (on validation split)
     y_val_pred_idx = np.argmax(model.predict(X_val_t, verbose=0), axis=1)
     _save_feature_columns(X_all.columns.tolist(), outdir)
-    _save_metadata(target, drop_cols, classes, outdir, arch=args.arch, input_dim=input_dim)
-    _evaluate_and_save(y_val, y_val_pred_idx, [str(c) for c in classes], outdir, prefix="test")
+    extra = {"cat_cardinalities": cat_cards, "transformer": transformer_kw} if tokenized else None
+    _save_metadata(target, drop_cols, classes, outdir, arch=args.arch, input_dim=input_dim, extra=extra)
+    evaluate_and_save(y_val, y_val_pred_idx, classes, outdir, prefix="test", encoded=True)
 
-    # predictions.csv (val set) with probabilities
+    # predictions (val set) with probabilities
     proba = model.predict(X_val_t, verbose=0)
     pred_label = [classes[i] for i in y_val_pred_idx]
-    pred_df = X_val.copy()
-    pred_df["true_label"] = y_val
-    pred_df["pred_label"] = pred_label
+    pred_df = pd.DataFrame({"true_label": [classes[i] for i in np.asarray(y_val)], "pred_label": pred_label}, index=X_val.index)
     for i, c in enumerate(classes):
         pred_df[f"proba_{c}"] = proba[:, i]
-    pred_df.to_csv(outdir / "predictions.csv", index=False)
-
-    # (Optional) training curves — names unchanged
-    try:
-        acc = hist.history.get("accuracy", [])
-        val_acc_hist = hist.history.get("val_accuracy", [])
-        loss = hist.history.get("loss", [])
-        val_loss_hist = hist.history.get("val_loss", [])
-        plt.figure(); plt.plot(acc, label="acc"); plt.plot(val_acc_hist, label="val_acc"); plt.legend(); plt.xlabel("epoch"); plt.ylabel("acc"); plt.tight_layout(); plt.savefig(outdir / "dl_accuracy.png", dpi=150); plt.close()
-        plt.figure(); plt.plot(loss, label="loss"); plt.plot(val_loss_hist, label="val_loss"); plt.legend(); plt.xlabel("epoch"); plt.ylabel("loss"); plt.tight_layout(); plt.savefig(outdir / "dl_loss.png", dpi=150); plt.close()
-    except Exception as e:
-        (outdir / "plot_warn.txt").write_text(str(e))
+    write_predictions(X_val, pred_df, default_path(outdir, args.format), args.format, args.keep_columns)
+
+    # (Optional) training curves — names unchanged; rendered off-thread
+    h = hist.history
+    save_curves({"acc": h.get("accuracy", []), "val_acc": h.get("val_accuracy", [])}, outdir / "dl_accuracy.png", ylabel="acc")
+    save_curves({"loss": h.get("loss", []), "val_loss": h.get("val_loss", [])}, outdir / "dl_loss.png", ylabel="loss")
 
     print(f"Saved DL run to: {outdir.resolve()}")
 
@@ -0,0 +1,205 @@
+"""Feature-drift profiles built from constant-memory sketches (see ``sketch.py``).
+
+A ``DriftProfile`` holds, per numeric feature, ``RunningMoments`` (count / nulls / mean / range), a
+``QuantileSketch``, and counts of values below / above the reference range. Profiles are mergeable,
+so per-process or per-chunk profiles combine exactly like the sketches. ``train.py`` writes the profile of
+the labelled rows as loaded (before incomplete rows are dropped) to ``drift_reference.json``. ``compare``
+scores a live profile against it per feature:
+
+- ``psi``: population stability index over the reference deciles (> 0.2 is conventionally "shifted").
+- ``ks``: max CDF gap between the two sketches (approximate Kolmogorov-Smirnov statistic).
+- null-rate delta and out-of-range rate.
+
+CLI:
+    python -m exo_ml.drift --artifacts artifacts/rf/<run> --input data/new_batch.csv [--output drift.json]
+"""
+from __future__ import annotations
+import argparse
+import json
+from pathlib import Path
+import numpy as np
+
+from .sketch import RunningMoments, QuantileSketch
+
+REFERENCE_FILE = "drift_reference.json"
+
+class FeatureProfile:
+    def __init__(self, max_size: int = 256, lo: float | None = None, hi: float | None = None):
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(max_size)
+        self.lo, self.hi = lo, hi   # reference range; values outside it are counted
+        self.n_below = 0
+        self.n_above = 0
+
+    def update(self, x) -> "FeatureProfile":
+        x = np.asarray(x, dtype=np.float64)
+        self.moments.update(x)
+        self.sketch.update(x)
+        if self.lo is not None:
+            self.n_below += int(np.count_nonzero(x < self.lo))
+            self.n_above += int(np.count_nonzero(x > self.hi))
+        return self
+
+    def merge(self, o: "FeatureProfile") -> "FeatureProfile":
+        self.moments.merge(o.moments)
+        self.sketch.merge(o.sketch)
+        self.n_below += o.n_below
+        self.n_above += o.n_above
+        return self
+
+    @property
+    def out_of_range_rate(self) -> float:
+        return (self.n_below + self.n_above) / self.moments.n if self.moments.n else 0.0
+
+    def to_dict(self) -> dict:
+        return {"moments": self.moments.to_dict(), "sketch": self.sketch.to_dict(), "lo": self.lo, "hi": self.hi,
+                "n_below": self.n_below, "n_above": self.n_above}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "FeatureProfile":
+        p = cls(lo=d.get("lo"), hi=d.get("hi"))
+        p.moments = RunningMoments.from_dict(d["moments"])
+        p.sketch = QuantileSketch.from_dict(d["sketch"])
+        p.n_below, p.n_above = int(d.get("n_below", 0)), int(d.get("n_above", 0))
+        return p
+
+class DriftProfile:
+    def __init__(self, features: dict):
+        self.features = features  # column -> FeatureProfile
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.features)
+
+    @classmethod
+    def from_frame(cls, df, max_size: int = 256) -> "DriftProfile":
+        """Profile of the numeric columns of a DataFrame (categoricals are not tracked)."""
+        num = df.select_dtypes(include="number")
+        return cls({c: FeatureProfile(max_size).update(num[c].to_numpy(dtype=np.float64, na_value=np.nan))
+                    for c in num.columns})
+
+    @classmethod
+    def from_sketches(cls, stats: dict) -> "DriftProfile":
+        """From already-streamed ``{column: (RunningMoments, QuantileSketch)}`` (chunked training)."""
+        out = {}
+        for c, (moments, sketch) in stats.items():
+            p = FeatureProfile(sketch.max_size)
+            p.moments, p.sketch = moments, sketch
+            out[c] = p
+        return cls(out)
+
+    def live_like(self, max_size: int | None = None) -> "DriftProfile":
+        """Empty profile over the same columns, counting values outside this profile's observed range."""
+        out = {}
+        for c, p in self.features.items():
+            lo, hi = (p.moments.min, p.moments.max) if p.moments.n else (None, None)
+            out[c] = FeatureProfile(max_size or p.sketch.max_size, lo, hi)
+        return DriftProfile(out)
+
+    def update(self, X) -> "DriftProfile":
+        """Add rows; ``X`` is a DataFrame or a 2-D array whose columns follow ``self.columns``."""
+        if hasattr(X, "columns"):
+            import pandas as pd
+            for c, p in self.features.items():
+                if c in X.columns:
+                    p.update(pd.to_numeric(X[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan))
+            return self
+        X = np.asarray(X, dtype=np.float64)
+        for j, p in enumerate(self.features.values()):
+            p.update(X[:, j])
+        return self
+
+    def merge(self, o: "DriftProfile") -> "DriftProfile":
+        for c, p in o.features.items():
+            if c in self.features:
+                self.features[c].merge(p)
+        return self
+
+    def to_dict(self) -> dict:
+        return {"features": {c: p.to_dict() for c, p in self.features.items()}}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "DriftProfile":
+        return cls({c: FeatureProfile.from_dict(v) for c, v in d["features"].items()})
+
+def save_reference(profile: DriftProfile, outdir: Path) -> Path:
+    path = Path(outdir) / REFERENCE_FILE
+    with open(path, "w") as f:
+        json.dump(profile.to_dict(), f)
+    return path
+
+def load_reference(path) -> DriftProfile:
+    path = Path(path)
+    if path.is_dir():
+        path = path / REFERENCE_FILE
+    with open(path) as f:
+        return DriftProfile.from_dict(json.load(f))
+
+def feature_drift(ref: FeatureProfile, live: FeatureProfile, bins: int = 10, eps: float = 1e-4) -> dict:
+    rm, lm = ref.moments, live.moments
+    out = {"count": lm.count, "null_rate": round(lm.missing_rate, 6), "ref_null_rate": round(rm.missing_rate, 6),
+           "null_rate_delta": round(lm.missing_rate - rm.missing_rate, 6),
+           "out_of_range_rate": round(live.out_of_range_rate, 6),
+           "mean": lm.mean if lm.n else None, "ref_mean": rm.mean if rm.n else None, "psi": None, "ks": None}
+    if not (rm.n and lm.n):
+        return out
+    edges = np.unique(ref.sketch.quantile(np.linspace(0, 1, bins + 1)[1:-1]))
+    p_ref = np.diff(np.concatenate([[0.0], ref.sketch.cdf(edges), [1.0]])).clip(eps)
+    p_live = np.diff(np.concatenate([[0.0], live.sketch.cdf(edges), [1.0]])).clip(eps)
+    out["psi"] = round(float(((p_live - p_ref) * np.log(p_live / p_ref)).sum()), 6)
+    grid = np.concatenate([ref.sketch.means, live.sketch.means])
+    out["ks"] = round(float(np.abs(ref.sketch.cdf(grid) - live.sketch.cdf(grid)).max()), 6)
+    return out
+
+def compare(reference: DriftProfile, live: DriftProfile, psi_threshold: float = 0.2, ks_threshold: float = 0.1,
+            null_threshold: float = 0.1, min_count: int = 30) -> dict:
+    """Per-feature drift of ``live`` vs ``reference`` plus a summary of flagged features."""
+    features = {}
+    for c, ref in reference.features.items():
+        if c not in live.features:
+            continue
+        d = feature_drift(ref, live.features[c])
+        if d["count"] < min_count:
+            d["status"] = "insufficient_data"
+        else:
+            shifted = (d["psi"] is not None and d["psi"] > psi_threshold) or (d["ks"] is not None and d["ks"] > ks_threshold)
+            d["status"] = "drift" if shifted or abs(d["null_rate_delta"]) > null_threshold else "ok"
+        features[c] = d
+    drifted = sorted((c for c, d in features.items() if d["status"] == "drift"),
+                     key=lambda c: -(features[c]["psi"] or 0.0))
+    counts = [d["count"] for d in features.values()]
+    return {"rows": max(counts) if counts else 0, "n_features": len(features), "n_drifted": len(drifted),
+            "drifted": drifted, "thresholds": {"psi": psi_threshold, "ks": ks_threshold, "null_rate": null_threshold,
+                                               "min_count": min_count},
+            "features": features}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare a batch of rows against an artifact's training drift reference")
+    ap.add_argument("--artifacts", required=True, help=f"Artifact folder containing {REFERENCE_FILE}")
+    ap.add_argument("--input", required=True, help="CSV/TSV of new rows")
+    ap.add_argument("--output", default=None, help="Optional JSON report path")
+    ap.add_argument("--psi", type=float, default=0.2, help="PSI threshold")
+    ap.add_argument("--ks", type=float, default=0.1, help="KS threshold")
+    args = ap.parse_args(argv)
+
+    from .data import load_table
+    from .datafix import coerce_numeric
+    ref = load_reference(args.artifacts)
+    # no basic_clean: incomplete rows are part of what the null-rate delta measures
+    live = ref.live_like().update(coerce_numeric(load_table(args.input)))
+    report = compare(ref, live, psi_threshold=args.psi, ks_threshold=args.ks)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    def fmt(v, spec=".3f"):
+        # psi / ks are None when a side has no non-null values (e.g. an all-null live column)
+        return "-" if v is None else format(v, spec)
+    print(f"{report['n_drifted']}/{report['n_features']} features drifted over {report['rows']} rows")
+    for c in report["drifted"][:20]:
+        d = report["features"][c]
+        print(f"  {c:<24} psi={fmt(d['psi'])} ks={fmt(d['ks'])} null_delta={fmt(d['null_rate_delta'], '+.3f')} "
+              f"oor={fmt(d['out_of_range_rate'])}")
+
+if __name__ == "__main__":
+    main()
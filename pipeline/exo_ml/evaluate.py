@@ -0,0 +1,240 @@
+"""Shared evaluation engine for every model family (sklearn, chunked, Keras, TabNet, search).
+
+``evaluate_and_save`` writes one metrics schema to ``<prefix>_metrics.json``:
+
+- point metrics at the top level (``accuracy``, ``balanced_accuracy``, ``{precision,recall,f1}_{macro,weighted}``);
+- ``ci``: percentile bootstrap intervals for each of them;
+- ``per_class``: precision / recall / f1 / support with intervals (minority classes such as FA have only a
+  handful of test rows, so their point estimates alone are noise);
+- ``labels``, ``n``, ``confusion_matrix`` and the sklearn ``classification_report`` text.
+
+The bootstrap is vectorised: a ``(B, n)`` resample-index matrix is turned into ``B`` confusion matrices with
+one ``bincount`` (processed in blocks to bound memory), and every metric is computed on the stacked matrices.
+Figures use matplotlib's object API (no pyplot state) and render on a background thread; the executor's
+threads are joined at interpreter exit, or explicitly with ``wait_for_figures()``.
+
+CLI (re-evaluate an existing predictions file with ``true_label`` / ``pred_label``):
+    python -m exo_ml evaluate --predictions artifacts/dl_mlpbn/<run>/predictions.csv [--n-boot 5000]
+"""
+from __future__ import annotations
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+
+METRICS = ["accuracy", "balanced_accuracy", "precision_macro", "recall_macro", "f1_macro",
+           "precision_weighted", "recall_weighted", "f1_weighted"]
+
+_figures = None
+_pending = []
+
+def _figure_pool() -> ThreadPoolExecutor:
+    global _figures
+    if _figures is None:
+        _figures = ThreadPoolExecutor(max_workers=1, thread_name_prefix="figures")
+    return _figures
+
+def submit_figure(fn, *args, **kwargs):
+    """Render a figure off the calling thread; failures are written next to the target as a warning file."""
+    fut = _figure_pool().submit(fn, *args, **kwargs)
+    _pending.append(fut)
+    return fut
+
+def wait_for_figures():
+    while _pending:
+        _pending.pop().result()
+
+def encode(y_true, y_pred, labels) -> tuple[np.ndarray, np.ndarray]:
+    """Integer codes (index into ``labels``) for label arrays; unknown predictions map to -1."""
+    pos = {str(l): i for i, l in enumerate(labels)}
+    t = np.array([pos.get(str(v), -1) for v in np.asarray(y_true)], dtype=np.int64)
+    p = np.array([pos.get(str(v), -1) for v in np.asarray(y_pred)], dtype=np.int64)
+    if (t < 0).any():
+        raise ValueError("y_true contains values outside labels")
+    return t, p
+
+def confusion_matrices(t: np.ndarray, p: np.ndarray, k: int, n_boot: int = 0, rng: np.random.Generator | None = None,
+                       block_elems: int = 1 << 22) -> np.ndarray:
+    """``(k, k)`` confusion matrix, or ``(n_boot, k, k)`` over bootstrap resamples drawn from ``rng``.
+
+    Resample indices are drawn one block of at most ``block_elems`` at a time, so memory does not grow
+    with ``n_boot``.
+    """
+    valid = p >= 0
+    cell = np.where(valid, t * k + np.where(valid, p, 0), k * k)   # predictions outside labels -> dropped bin
+    if not n_boot:
+        return np.bincount(cell, minlength=k * k + 1)[:k * k].reshape(k, k)
+    n = len(t)
+    rng = rng if rng is not None else np.random.default_rng()
+    dtype = np.int64 if n > 2**31 - 1 else np.int32
+    out = np.empty((n_boot, k, k), dtype=np.int64)
+    step = max(1, block_elems // max(n, 1))
+    for s in range(0, n_boot, step):
+        b = min(step, n_boot - s)
+        blk = rng.integers(0, n, size=(b, n), dtype=dtype)
+        flat = cell[blk] + (np.arange(b) * (k * k + 1))[:, None]
+        out[s:s + b] = np.bincount(flat.ravel(), minlength=b * (k * k + 1)).reshape(b, k * k + 1)[:, :k * k].reshape(b, k, k)
+    return out
+
+def _div(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b > 0, a / np.where(b > 0, b, 1), 0.0)
+
+def metrics_from_cm(cm: np.ndarray) -> dict:
+    """Metrics for a ``(..., k, k)`` stack of confusion matrices (sklearn semantics, zero_division=0)."""
+    cm = cm.astype(np.float64)
+    tp = np.diagonal(cm, axis1=-2, axis2=-1)
+    support = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+    total = support.sum(axis=-1)
+    precision = _div(tp, predicted)
+    recall = _div(tp, support)
+    f1 = _div(2 * precision * recall, precision + recall)
+    present = support > 0                    # balanced accuracy: classes present in y_true
+    seen = present | (predicted > 0)         # macro averages: labels in y_true or y_pred
+    n_present, n_seen = present.sum(axis=-1), seen.sum(axis=-1)
+    out = {
+        "accuracy": _div(tp.sum(axis=-1), total),
+        "balanced_accuracy": _div((recall * present).sum(axis=-1), n_present),
+        "precision_macro": _div((precision * seen).sum(axis=-1), n_seen),
+        "recall_macro": _div((recall * seen).sum(axis=-1), n_seen),
+        "f1_macro": _div((f1 * seen).sum(axis=-1), n_seen),
+        "precision_weighted": _div((precision * support).sum(axis=-1), total),
+        "recall_weighted": _div((recall * support).sum(axis=-1), total),
+        "f1_weighted": _div((f1 * support).sum(axis=-1), total),
+    }
+    # per-class recall is undefined when a resample has no rows of that class
+    return out | {"precision": precision, "recall": np.where(present, recall, np.nan), "f1": f1, "support": support}
+
+def bootstrap_metrics(t, p, k: int, n_boot: int = 2000, level: float = 0.95, seed: int = 0) -> dict:
+    """Point estimates plus percentile bootstrap intervals for all metrics and per-class scores."""
+    point = metrics_from_cm(confusion_matrices(t, p, k))
+    boot = metrics_from_cm(confusion_matrices(t, p, k, n_boot, np.random.default_rng(seed)))
+    q = [(1 - level) / 2 * 100, (1 + level) / 2 * 100]
+    with np.errstate(all="ignore"):
+        ci = {m: np.nanpercentile(boot[m], q, axis=0) for m in METRICS + ["precision", "recall", "f1"]}
+    return {"point": point, "ci": ci, "n_boot": n_boot, "level": level}
+
+def _render_cm(cm: np.ndarray, labels: list, path: Path, title: str):
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=(6, 5))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        im = ax.imshow(cm, interpolation="nearest")
+        ax.set_title(title)
+        fig.colorbar(im, ax=ax)
+        ax.set_xticks(range(len(labels)), labels, rotation=45, ha="right")
+        ax.set_yticks(range(len(labels)), labels)
+        for i in range(cm.shape[0]):
+            for j in range(cm.shape[1]):
+                ax.text(j, i, f"{cm[i, j]}", ha="center", va="center")
+        ax.set_xlabel("Predicted")
+        ax.set_ylabel("True")
+        fig.tight_layout()
+        fig.savefig(path, dpi=150)
+    except Exception as e:
+        path.with_name(path.stem.replace("_cm", "") + "_plot_warning.txt").write_text(str(e))
+
+def _render_lines(series: dict, path: Path, xlabel: str, ylabel: str):
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        for name, ys in series.items():
+            ax.plot(ys, label=name)
+        ax.legend()
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        fig.tight_layout()
+        fig.savefig(path, dpi=150)
+    except Exception as e:
+        path.with_name("plot_warn.txt").write_text(str(e))
+
+def save_curves(series: dict, path, xlabel: str = "epoch", ylabel: str = ""):
+    """Line plot (e.g. training curves) rendered off-thread."""
+    return submit_figure(_render_lines, {k: list(v) for k, v in series.items()}, Path(path), xlabel, ylabel)
+
+def evaluate(y_true, y_pred, labels, *, encoded: bool = False, n_boot: int = 2000, level: float = 0.95,
+             seed: int = 0) -> dict:
+    """Metrics dict in the shared schema. ``encoded``: ``y_*`` are integer indexes into ``labels``."""
+    labels = [str(l) for l in labels]
+    if encoded:
+        t, p = np.asarray(y_true, dtype=np.int64), np.asarray(y_pred, dtype=np.int64)
+    else:
+        t, p = encode(y_true, y_pred, labels)
+    k = len(labels)
+    res = bootstrap_metrics(t, p, k, n_boot, level, seed) if n_boot else {"point": metrics_from_cm(confusion_matrices(t, p, k))}
+    pt = res["point"]
+    out = {m: float(pt[m]) for m in METRICS}
+    if n_boot:
+        out["ci"] = {"method": "percentile_bootstrap", "level": level, "n_boot": n_boot,
+                     "metrics": {m: [float(v) for v in res["ci"][m]] for m in METRICS}}
+    out["per_class"] = {}
+    for i, l in enumerate(labels):
+        row = {"precision": float(pt["precision"][i]), "recall": float(np.nan_to_num(pt["recall"][i])),
+               "f1": float(pt["f1"][i]), "support": int(pt["support"][i])}
+        if n_boot:
+            for m in ("precision", "recall", "f1"):
+                lo, hi = res["ci"][m][:, i]
+                row[f"{m}_ci"] = [None if np.isnan(lo) else float(lo), None if np.isnan(hi) else float(hi)]
+        out["per_class"][l] = row
+    out["labels"] = labels
+    out["n"] = int(len(t))
+    out["confusion_matrix"] = confusion_matrices(t, p, k).tolist()
+    return out
+
+def evaluate_and_save(y_true, y_pred, labels, outdir: Path, prefix: str = "test", *, encoded: bool = False,
+                      n_boot: int = 2000, seed: int = 0) -> dict:
+    """Write ``<prefix>_metrics.json``, ``<prefix>_classification_report.txt`` and (off-thread) ``<prefix>_cm.png``."""
+    from sklearn.metrics import classification_report
+    outdir = Path(outdir)
+    out = evaluate(y_true, y_pred, labels, encoded=encoded, n_boot=n_boot, seed=seed)
+    labels = out["labels"]
+    if encoded:
+        report = classification_report(y_true, y_pred, labels=range(len(labels)), target_names=labels,
+                                       digits=4, zero_division=0)
+    else:
+        report = classification_report(np.asarray(y_true).astype(str), np.asarray(y_pred).astype(str),
+                                       labels=labels, digits=4, zero_division=0)
+    out["classification_report"] = report
+    with open(outdir / f"{prefix}_metrics.json", "w") as f:
+        json.dump(out, f, indent=2)
+    with open(outdir / f"{prefix}_classification_report.txt", "w") as f:
+        f.write(report)
+    submit_figure(_render_cm, np.asarray(out["confusion_matrix"]), labels, outdir / f"{prefix}_cm.png",
+                  f"Confusion Matrix ({prefix})")
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bootstrap evaluation report for a predictions file")
+    ap.add_argument("--predictions", required=True, help="CSV/Parquet/Arrow with true_label and pred_label columns")
+    ap.add_argument("--outdir", default=None, help="Output folder (defaults to the predictions file's folder)")
+    ap.add_argument("--prefix", default="eval")
+    ap.add_argument("--n-boot", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    import pandas as pd
+    path = Path(args.predictions)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=["true_label", "pred_label"])
+    elif path.suffix == ".arrow":
+        df = pd.read_feather(path, columns=["true_label", "pred_label"])
+    else:
+        df = pd.read_csv(path, usecols=["true_label", "pred_label"])
+    labels = sorted(set(df["true_label"].astype(str)) | set(df["pred_label"].astype(str)))
+    outdir = Path(args.outdir) if args.outdir else path.parent
+    out = evaluate_and_save(df["true_label"], df["pred_label"], labels, outdir, args.prefix,
+                            n_boot=args.n_boot, seed=args.seed)
+    wait_for_figures()
+    for m in METRICS:
+        lo, hi = out["ci"]["metrics"][m] if args.n_boot else (float("nan"),) * 2
+        print(f"{m:<20} {out[m]:.4f}  [{lo:.4f}, {hi:.4f}]")
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,11 @@ import pandas as pd
 def drop_bad_columns(df: pd.DataFrame,
                      max_missing_pct: float = 0.8,
                      min_unique_ratio: float = 0.0005) -> pd.DataFrame:
-    out = df.copy()
+    # both checks run on the input; the kept columns are copied once
     # 1) drop columns with too many NaNs
-    keep = out.columns[out.isna().mean() <= max_missing_pct]
-    out = out[keep]
+    keep = df.columns[df.isna().mean() <= max_missing_pct]
     # 2) drop near-constant columns
-    n = len(out)
-    keep = [c for c in out.columns
-            if out[c].nunique(dropna=False) / max(n,1) >= min_unique_ratio]
-    return out[keep]
\ No newline at end of file
+    n = len(df)
+    keep = [c for c in keep
+            if df[c].nunique(dropna=False) / max(n,1) >= min_unique_ratio]
+    return df[keep]
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""State store for incremental catalog rescoring.
+
+One row per catalog entry: ``key``, ``row_hash`` (content hash of the aligned feature row),
+``model_version`` and the previously written prediction columns. A row is rescored only if it is
+new, its features changed, or the model changed; everything else is reused from the store.
+"""
+from __future__ import annotations
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+STATE_COLS = ["key", "row_hash", "model_version"]
+
+def row_hashes(X: pd.DataFrame) -> np.ndarray:
+    """Vectorized 64-bit content hash per row (stored as int64 so it round-trips through CSV)."""
+    return pd.util.hash_pandas_object(X, index=False).to_numpy().view(np.int64)
+
+def load_state(path: str | Path) -> pd.DataFrame | None:
+    p = Path(path)
+    if not p.exists():
+        return None
+    return pd.read_csv(p, dtype={"key": str, "model_version": str})
+
+def save_state(state: pd.DataFrame, path: str | Path):
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    state.to_csv(tmp, index=False)
+    tmp.replace(p)  # atomic: an interrupted run never leaves a half-written store
+
+def plan(keys: pd.Series, hashes: np.ndarray, model_version: str, pred_cols: list[str],
+         prev: pd.DataFrame | None) -> tuple[np.ndarray, pd.DataFrame | None]:
+    """Return (mask of rows to score, previous predictions aligned to ``keys`` or None)."""
+    if keys.duplicated().any():
+        dup = keys[keys.duplicated()].iloc[:5].tolist()
+        raise ValueError(f"Incremental mode needs a unique row key; duplicates: {dup}")
+    n = len(keys)
+    if prev is None or not set(pred_cols).issubset(prev.columns):
+        return np.ones(n, dtype=bool), None
+    # nullable Int64 so keys missing from the store don't turn the hashes into (lossy) floats
+    prev = prev.astype({"row_hash": "Int64"}).set_index("key").reindex(keys.to_numpy())
+    same = (prev["row_hash"] == hashes).to_numpy(dtype=bool, na_value=False) \
+        & (prev["model_version"] == model_version).to_numpy(dtype=bool, na_value=False)
+    return ~same, prev.reset_index(drop=True)
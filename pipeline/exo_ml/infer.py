@@ -1,46 +1,108 @@
-
 from __future__ import annotations
 import argparse
 from pathlib import Path
-import pandas as pd
-import numpy as np
+from .outputs import add_output_args
+
+def score_frame(pipe, X, classes=None, with_proba: bool = False):
+    """Prediction columns (``pred_label`` [+ ``proba_<class>``]) for an aligned feature frame."""
+    import pandas as pd
+    out = pd.DataFrame({"pred_label": pipe.predict(X)}, index=X.index)
+    if with_proba and hasattr(pipe, "predict_proba"):
+        proba = pipe.predict_proba(X)
+        if classes is None:
+            classes = getattr(pipe, "classes_", None)
+        if classes is None:
+            classes = [f"class_{i}" for i in range(proba.shape[1])]
+        for i, c in enumerate(classes):
+            out[f"proba_{c}"] = proba[:, i]
+    return out
+
+def load_joins(art_dir, lightcurves=None):
+    """``(lc, sky)`` feature joins recorded at training time (``None`` when the artifact has none).
 
-from .data import load_table
-from .utils import load_artifacts
+    ``lc`` is ``(features, key)`` for ``lightcurve.join_features``, ``sky`` is ``(cfg, SkyIndex)``.
+    ``lightcurves`` overrides the recorded light-curve source.
+    """
+    from .lightcurve import load_settings, load_features
+    from .sky import load_settings as load_sky
+    lc_cfg, lc = load_settings(art_dir), None
+    if lc_cfg is not None:
+        key = lc_cfg.get("key", "tid")
+        lc = (load_features(lightcurves or lc_cfg["source"], lc_cfg.get("cache_dir"), lc_cfg.get("n_jobs", -1),
+                            lc_cfg.get("params"), key), key)
+    sky_cfg, sky_index = load_sky(art_dir)
+    return lc, ((sky_cfg, sky_index) if sky_cfg is not None else None)
 
-def main():
+def align(df_raw, feat_cols, drop_cols, lc=None, sky=None):
+    """``(inputs, X)``: ``df_raw`` with the training-time joins applied, and its model-aligned feature frame."""
+    import numpy as np
+    if lc is not None:
+        from .lightcurve import join_features
+        df_raw = join_features(df_raw, *lc)
+    if sky is not None:
+        from .sky import add_crowding_features
+        df_raw = add_crowding_features(df_raw, sky[1], sky[0])
+    X = df_raw.drop(columns=drop_cols, errors="ignore").reindex(columns=feat_cols, fill_value=np.nan)
+    return df_raw, X
+
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Run inference with saved pipeline")
     ap.add_argument("--input", required=True, help="Path to new CSV/TSV to predict on")
     ap.add_argument("--artifacts", required=True, help="Path to artifact folder (timestamped)")
-    ap.add_argument("--output", default=None, help="Path to save predictions CSV")
+    ap.add_argument("--output", default=None, help="Predictions path (defaults to <artifacts>/predictions.<format>)")
     ap.add_argument("--with-proba", action="store_true", help="Also output per-class probabilities")
-    args = ap.parse_args()
+    ap.add_argument("--state", default=None,
+                    help="Incremental mode: state store CSV (row key + content hash + model version + predictions); "
+                         "only new/changed rows are scored")
+    ap.add_argument("--lightcurves", default=None,
+                    help="Light-curve FITS directory or lc-features table (defaults to the source recorded at training)")
+    ap.add_argument("--key", default="toi", help="Unique row key column for --state (read before drop_cols)")
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    import pandas as pd
+    from .data import load_table, load_plan
+    from .utils import load_artifacts, artifact_version
 
     pipe, feat_cols, meta = load_artifacts(args.artifacts)
     drop_cols = meta.get("drop_cols", [])
     classes = meta.get("classes", None)
 
-    df_new = load_table(args.input)
-    df_new = df_new.drop(columns=drop_cols, errors="ignore")
+    df_raw = load_table(args.input, load_plan(args.artifacts))   # training-time dtypes when the artifact has a plan
+    df_raw, X_new = align(df_raw, feat_cols, drop_cols, *load_joins(args.artifacts, args.lightcurves))
+    df_new = df_raw.drop(columns=drop_cols, errors="ignore")
 
-    # Align columns
-    X_new = df_new.reindex(columns=feat_cols, fill_value=np.nan)
+    if args.state is None:
+        preds = score_frame(pipe, X_new, classes, args.with_proba)
+    else:
+        from .incremental import row_hashes, load_state, save_state, plan
+        if args.key not in df_raw.columns:
+            raise ValueError(f"Key column '{args.key}' not found in input.")
+        keys = df_raw[args.key].astype(str).reset_index(drop=True)
+        hashes = row_hashes(X_new)
+        version = artifact_version(args.artifacts)
+        pred_cols = ["pred_label"] + ([f"proba_{c}" for c in classes] if args.with_proba and classes else [])
 
-    y_pred = pipe.predict(X_new)
-    out = df_new.copy()
-    out["pred_label"] = y_pred
+        prev_state = load_state(args.state)
+        todo, prev = plan(keys, hashes, version, pred_cols, prev_state)
+        preds = pd.DataFrame(index=X_new.index, columns=pred_cols)
+        if prev is not None:
+            preds.loc[~todo, pred_cols] = prev.loc[~todo, pred_cols].to_numpy()
+        if todo.any():
+            scored = score_frame(pipe, X_new[todo], classes, args.with_proba)
+            preds.loc[todo, scored.columns] = scored.to_numpy()
+        preds = preds.infer_objects()
 
-    if args.with_proba and hasattr(pipe, "predict_proba"):
-        proba = pipe.predict_proba(X_new)
-        if classes is None:
-            classes = getattr(pipe, "classes_", None)
-        if classes is None:
-            classes = [f"class_{i}" for i in range(proba.shape[1])]
-        for i, c in enumerate(classes):
-            out[f"proba_{c}"] = proba[:, i]
+        state = pd.DataFrame({"key": keys, "row_hash": hashes, "model_version": version})
+        state = pd.concat([state, preds.reset_index(drop=True)], axis=1)
+        save_state(state, args.state)
+        n_dropped = 0 if prev_state is None else int((~prev_state["key"].isin(keys)).sum())
+        print(f"Incremental: scored {int(todo.sum())} new/changed rows, reused {int((~todo).sum())}, "
+              f"dropped {n_dropped} removed rows (model {version})")
 
-    out_path = Path(args.output) if args.output else (Path(args.artifacts) / "predictions.csv")
-    out.to_csv(out_path, index=False)
+    from .outputs import write_predictions, default_path
+    out_path = Path(args.output) if args.output else default_path(args.artifacts, args.format)
+    write_predictions(df_new, preds, out_path, args.format, args.keep_columns)
     print(f"Predictions written to: {out_path.resolve()}")
 
 if __name__ == "__main__":
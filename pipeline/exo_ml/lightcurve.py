@@ -0,0 +1,283 @@
+"""Per-target light-curve features from local FITS files, joined onto the catalog before preprocessing.
+
+Works fully offline on a directory of pre-downloaded light curves (TESS/Kepler SPOC ``*lc.fits``: a
+``LIGHTCURVE`` table with ``TIME``, ``PDCSAP_FLUX`` / ``SAP_FLUX``, ``QUALITY``). Files are opened with
+``memmap=True`` and only the needed columns are copied out. Per file:
+
+- variability: robust/plain scatter, point-to-point scatter, 5–95% range, skew, kurtosis, dip fraction;
+- a box-least-squares style search on the detrended flux: the phase-folded flux of a block of trial periods
+  is binned with one ``bincount``, every box width is scored from cumulative sums over the bins, and the best
+  (period, epoch, duration) gives ``lc_bls_*`` period / depth / duration / SNR / power (the epoch itself is
+  absolute time and is not used as a feature).
+
+Files are processed in a process pool. Each result is cached as ``<cache_dir>/<sha256 of file>-<params>.json``,
+so re-runs only touch new or changed files (renames and copies hit the cache). Targets with several files
+(sectors/quarters) keep the BLS columns of their highest-SNR file and the median of the rest.
+
+    pip install astropy
+    python -m exo_ml lc-features --dir data/lightcurves --output data/lc_features.parquet
+    python -m exo_ml train --input data/TOI.csv --lightcurves data/lightcurves      # or the .parquet table
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+import numpy as np
+
+FEATURE_VERSION = 1
+SETTINGS_FILE = "lightcurves.json"
+PATTERNS = ("*.fits", "*.fit")
+FLUX_COLUMNS = ("PDCSAP_FLUX", "SAP_FLUX", "FLUX")
+ID_KEYWORDS = ("TICID", "KEPLERID", "TARGETID")
+
+DEFAULT_PARAMS = {
+    "min_period": 0.5,          # days
+    "max_period": 20.0,         # days; capped at half the baseline
+    "n_periods": 2000,          # uniform in frequency
+    "n_bins": 200,              # phase bins per trial period
+    "widths": [1, 2, 3, 5, 8],  # box widths in bins (0.5%–4% of the period)
+    "detrend_days": 1.0,        # running-median window; 0 disables
+    "period_block": 64,         # trial periods folded per bincount
+}
+
+def params_digest(params: dict) -> str:
+    blob = json.dumps({"v": FEATURE_VERSION, **params}, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:10]
+
+def find_files(root) -> list[Path]:
+    root = Path(root)
+    return sorted({p for pat in PATTERNS for p in root.rglob(pat)})
+
+def _target_id(header, path: Path):
+    for k in ID_KEYWORDS:
+        if header.get(k) not in (None, ""):
+            return int(header[k])
+    m = re.search(r"(?:tic|kplr|-)0*(\d{5,})", path.name, re.IGNORECASE)
+    return int(m.group(1)) if m else None
+
+def read_lightcurve(path) -> tuple[int | None, np.ndarray, np.ndarray]:
+    """(target id, time [days], flux) with bad-quality and non-finite cadences removed."""
+    try:
+        from astropy.io import fits
+    except ImportError as e:
+        raise ImportError("Reading light-curve FITS files needs astropy (pip install astropy)") from e
+    path = Path(path)
+    with fits.open(path, memmap=True) as hdul:
+        tid = _target_id(hdul[0].header, path)
+        hdu = hdul["LIGHTCURVE"] if "LIGHTCURVE" in hdul else hdul[1]
+        names = hdu.columns.names
+        col = next((c for c in FLUX_COLUMNS if c in names), None)
+        if col is None:
+            raise ValueError(f"{path.name}: no flux column (looked for {FLUX_COLUMNS})")
+        data = hdu.data
+        t = np.array(data["TIME"], dtype=np.float64)
+        f = np.array(data[col], dtype=np.float64)
+        good = np.isfinite(t) & np.isfinite(f)
+        if "QUALITY" in names:
+            good &= np.asarray(data["QUALITY"]) == 0
+        del data
+    order = np.argsort(t[good], kind="stable")
+    return tid, t[good][order], f[good][order]
+
+def _detrend(t, f, window_days):
+    if not window_days or len(t) < 16:
+        return f / np.median(f), np.zeros(1)
+    from scipy.ndimage import median_filter
+    cadence = float(np.median(np.diff(t)))
+    size = max(3, int(round(window_days / max(cadence, 1e-6))) | 1)
+    trend = median_filter(f, size=size, mode="nearest")
+    return f / trend, trend / np.median(trend) - 1.0
+
+def box_search(t, y, periods, n_bins=200, widths=(1, 2, 3, 5, 8), block=64) -> dict:
+    """Best dip over ``periods`` x phase x ``widths`` (in bins) for zero-mean ``y``; vectorised per period block."""
+    n = len(y)
+    widths = np.asarray(sorted(widths), dtype=np.int64)
+    wmax = int(widths[-1])
+    best = {"power": 0.0, "period": np.nan, "t0": np.nan, "width": 0, "n_in": 0, "sum_in": 0.0}
+    dt = t - t[0]
+    for s in range(0, len(periods), block):
+        P = periods[s:s + block]
+        b = len(P)
+        bins = np.minimum(((dt[None, :] / P[:, None]) % 1.0 * n_bins).astype(np.int64), n_bins - 1)
+        flat = (bins + (np.arange(b) * n_bins)[:, None]).ravel()
+        cnt = np.bincount(flat, minlength=b * n_bins).reshape(b, n_bins).astype(np.float64)
+        sm = np.bincount(flat, weights=np.broadcast_to(y, (b, n)).ravel(), minlength=b * n_bins).reshape(b, n_bins)
+        # wrap so boxes can straddle phase 0, then box sums from cumulative sums
+        cc = np.concatenate([np.zeros((b, 1)), np.cumsum(np.concatenate([cnt, cnt[:, :wmax - 1]], axis=1), axis=1)], axis=1)
+        cs = np.concatenate([np.zeros((b, 1)), np.cumsum(np.concatenate([sm, sm[:, :wmax - 1]], axis=1), axis=1)], axis=1)
+        for w in widths:
+            c_in = cc[:, w:w + n_bins] - cc[:, :n_bins]
+            s_in = cs[:, w:w + n_bins] - cs[:, :n_bins]
+            ok = (c_in > 0) & (c_in < n) & (s_in < 0)       # dips only
+            with np.errstate(divide="ignore", invalid="ignore"):
+                power = np.where(ok, s_in ** 2 / (c_in * (1.0 - c_in / n)), 0.0)
+            i, j = np.unravel_index(np.argmax(power), power.shape)
+            if power[i, j] > best["power"]:
+                best = {"power": float(power[i, j]), "period": float(P[i]),
+                        "t0": float(t[0] + (j + w / 2) / n_bins * P[i]), "width": int(w),
+                        "n_in": int(c_in[i, j]), "sum_in": float(s_in[i, j])}
+    return best
+
+def lightcurve_features(t: np.ndarray, f: np.ndarray, params: dict | None = None) -> dict:
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    out = {"lc_n_points": int(len(t))}
+    if len(t) < 32:
+        return out
+    flat, trend = _detrend(t, f, p["detrend_days"])
+    y = flat - 1.0
+    n = len(y)
+    mad = float(np.median(np.abs(y - np.median(y))) * 1.4826)
+    std = float(y.std())
+    z = (y - y.mean()) / (std or 1.0)
+    baseline = float(t[-1] - t[0])
+    out |= {
+        "lc_baseline_days": baseline,
+        "lc_cadence_min": float(np.median(np.diff(t)) * 1440.0),
+        "lc_std_ppm": std * 1e6,
+        "lc_mad_ppm": mad * 1e6,
+        "lc_p2p_ppm": float(np.median(np.abs(np.diff(y))) * 1e6),
+        "lc_range_5_95_ppm": float(np.subtract(*np.percentile(y, [95, 5])) * 1e6),
+        "lc_skew": float((z ** 3).mean()),
+        "lc_kurtosis": float((z ** 4).mean() - 3.0),
+        "lc_frac_below_3sigma": float((y < -3 * (mad or std)).mean()),
+        "lc_trend_std_ppm": float(trend.std() * 1e6),
+    }
+    max_p = min(p["max_period"], baseline / 2)
+    if max_p <= p["min_period"]:
+        return out
+    periods = 1.0 / np.linspace(1.0 / max_p, 1.0 / p["min_period"], int(p["n_periods"]))
+    best = box_search(t, y - y.mean(), periods, int(p["n_bins"]), p["widths"], int(p["period_block"]))
+    if not best["n_in"]:
+        return out
+    c, s = best["n_in"], best["sum_in"]
+    depth = -s * n / (c * (n - c))
+    noise = (mad or std) * np.sqrt(1.0 / c + 1.0 / (n - c))
+    out |= {
+        "lc_bls_period": best["period"],
+        "lc_bls_duration_hours": best["width"] / p["n_bins"] * best["period"] * 24.0,
+        "lc_bls_depth_ppm": depth * 1e6,
+        "lc_bls_snr": float(depth / noise) if noise > 0 else np.nan,
+        "lc_bls_power": best["power"] / (n * (mad or std) ** 2),
+        "lc_bls_n_transits": float(baseline / best["period"]),
+    }
+    return out
+
+def file_features(path, cache_dir=None, params: dict | None = None) -> dict:
+    """Features for one file, served from / written to the content-hash cache."""
+    from .run_index import file_sha256
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    path = Path(path)
+    cache = None
+    if cache_dir:
+        cache = Path(cache_dir) / f"{file_sha256(path)}-{params_digest(p)}.json"
+        if cache.exists():
+            try:
+                return json.loads(cache.read_text()) | {"lc_file": path.name, "cached": True}
+            except ValueError:
+                pass
+    try:
+        tid, t, f = read_lightcurve(path)
+        rec = {"tid": tid, **lightcurve_features(t, f, p)}
+    except (OSError, ValueError, KeyError) as e:
+        rec = {"tid": None, "error": f"{type(e).__name__}: {e}"}
+    if cache is not None:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(rec))
+        os.replace(tmp, cache)
+    return rec | {"lc_file": path.name, "cached": False}
+
+def _file_features_star(args):
+    return file_features(*args)
+
+def aggregate(records, key: str = "tid"):
+    """One row per target: BLS columns from the highest-SNR file, medians for the rest, ``lc_n_files``."""
+    import pandas as pd
+    df = pd.DataFrame([r for r in records if r.get("tid") is not None and "error" not in r])
+    if df.empty:
+        return pd.DataFrame(columns=[key])
+    df = df.drop(columns=["lc_file", "cached"], errors="ignore").rename(columns={"tid": key})
+    feats = [c for c in df.columns if c.startswith("lc_")]
+    bls = [c for c in feats if c.startswith("lc_bls_")]
+    rest = [c for c in feats if c not in bls]
+    out = df.groupby(key)[rest].median()
+    out["lc_n_files"] = df.groupby(key).size()
+    if bls:
+        order = df.assign(_snr=df["lc_bls_snr"].fillna(-np.inf)).sort_values("_snr", ascending=False)
+        out = out.join(order.drop_duplicates(key).set_index(key)[bls])
+    return out.reset_index()
+
+def extract(root_or_files, cache_dir=".lc_cache", n_jobs: int = -1, params: dict | None = None,
+            key: str = "tid", verbose: bool = True):
+    """Feature table (one row per ``key``) for a directory or list of FITS files, in a process pool."""
+    from concurrent.futures import ProcessPoolExecutor
+    files = find_files(root_or_files) if isinstance(root_or_files, (str, Path)) else [Path(p) for p in root_or_files]
+    if not files:
+        raise FileNotFoundError(f"No light-curve FITS files under {root_or_files}")
+    workers = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(1, int(n_jobs))
+    jobs = [(f, cache_dir, params) for f in files]
+    if workers == 1 or len(files) == 1:
+        records = [_file_features_star(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as ex:
+            records = list(ex.map(_file_features_star, jobs, chunksize=max(1, len(files) // (workers * 4))))
+    if verbose:
+        n_cached = sum(r.get("cached", False) for r in records)
+        errors = [r for r in records if "error" in r]
+        print(f"[lightcurves] {len(files)} files: {n_cached} cached, {len(files) - n_cached} computed, {len(errors)} failed")
+        for r in errors[:5]:
+            print(f"  {r['lc_file']}: {r['error']}")
+    return aggregate(records, key)
+
+def load_features(source, cache_dir=".lc_cache", n_jobs: int = -1, params: dict | None = None, key: str = "tid"):
+    """``source`` is a directory of FITS files (extracted with the cache) or a precomputed .csv/.parquet table."""
+    import pandas as pd
+    source = Path(source)
+    if source.is_dir():
+        return extract(source, cache_dir, n_jobs, params, key)
+    return pd.read_parquet(source) if source.suffix == ".parquet" else pd.read_csv(source)
+
+def join_features(df, feats, key: str = "tid"):
+    """Left-join ``lc_*`` columns on ``key``; targets without a light curve get NaN (imputed downstream)."""
+    import pandas as pd
+    if key not in df.columns:
+        raise ValueError(f"Light-curve join key '{key}' not found in input.")
+    cols = [c for c in feats.columns if c.startswith("lc_")]
+    right = (feats.assign(_k=pd.to_numeric(feats[key], errors="coerce").astype("float64"))
+             .dropna(subset=["_k"]).drop_duplicates("_k").set_index("_k")[cols])
+    joined = right.reindex(pd.to_numeric(df[key], errors="coerce").astype("float64").to_numpy())
+    joined.index = df.index
+    return pd.concat([df.drop(columns=cols, errors="ignore"), joined], axis=1)
+
+def save_settings(cfg: dict, outdir: Path):
+    (Path(outdir) / SETTINGS_FILE).write_text(json.dumps(cfg, indent=2))
+
+def load_settings(art_dir) -> dict | None:
+    p = Path(art_dir) / SETTINGS_FILE
+    return json.loads(p.read_text()) if p.exists() else None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Extract per-target light-curve features from local FITS files")
+    ap.add_argument("--dir", required=True, help="Directory of pre-downloaded light-curve FITS files (searched recursively)")
+    ap.add_argument("--output", default="lc_features.csv", help="Feature table (.csv or .parquet)")
+    ap.add_argument("--cache-dir", default=".lc_cache", help="Per-file result cache keyed by content hash ('' disables)")
+    ap.add_argument("--n-jobs", type=int, default=-1)
+    ap.add_argument("--key", default="tid", help="Catalog column the target id maps to")
+    ap.add_argument("--params", default=None, help=f"JSON overrides for {sorted(DEFAULT_PARAMS)}")
+    args = ap.parse_args(argv)
+
+    params = json.loads(args.params) if args.params else None
+    feats = extract(args.dir, args.cache_dir or None, args.n_jobs, params, args.key)
+    out = Path(args.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix == ".parquet":
+        feats.to_parquet(out, index=False)
+    else:
+        feats.to_csv(out, index=False)
+    print(f"Wrote features for {len(feats)} targets -> {out.resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,8 @@ from sklearn.ensemble import (
     HistGradientBoostingClassifier,
     StackingClassifier,
 )
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import GaussianNB
 from sklearn.svm import SVC
 
 def build_model(name: str, params: Dict[str, Any]):
@@ -29,6 +30,15 @@ def build_model(name: str, params: Dict[str, Any]):
         cfg = {**defaults, **(params or {})}
         return LogisticRegression(**cfg)
 
+    if name in ["sgd", "sgd_logreg"]:
+        # linear model with partial_fit (out-of-core training); log_loss -> predict_proba
+        defaults = {"loss": "log_loss", "alpha": 1e-4, "random_state": 42}
+        cfg = {**defaults, **(params or {})}
+        return SGDClassifier(**cfg)
+
+    if name in ["gaussian_nb", "nb"]:
+        return GaussianNB(**(params or {}))
+
     if name in ["svc", "svm"]:
         # enable probabilities for soft-voting
         defaults = {"probability": True}
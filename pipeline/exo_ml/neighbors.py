@@ -0,0 +1,233 @@
+"""Nearest labelled neighbours in the model's feature space ("similar known objects").
+
+Built at training time over the fitted preprocessor output (``pipeline.named_steps["preprocessor"]``) for every
+labelled row and saved as ``neighbors.joblib`` in the artifact folder. Rows are partitioned by class, so a query
+returns the k nearest overall and/or the k nearest per class (e.g. confirmed planets and false positives).
+
+- ``exact``: float32 brute force via ``|q|^2 - 2 q.x + |x|^2`` (one BLAS matmul per query block) + ``argpartition``;
+- ``ivf``: inverted lists from a k-means coarse quantizer (``MiniBatchKMeans``, ~sqrt(n) lists). A query visits
+  the ``n_probe`` closest lists and re-ranks their rows exactly. CPU-only, and used when a partition has more
+  than ``exact_max`` rows with ``method="auto"``.
+
+    python -m exo_ml similar --artifacts artifacts/ml_rf/<run> --input data/new_candidates.csv --k 5 --classes CP FP
+    python -m exo_ml similar --artifacts artifacts/ml_rf/<run> --build data/TOI.csv   # index an existing run
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import numpy as np
+
+NEIGHBORS_FILE = "neighbors.joblib"
+ALL = "all"
+
+def _dense32(M) -> np.ndarray:
+    if hasattr(M, "toarray"):
+        M = M.toarray()
+    return np.ascontiguousarray(M, dtype=np.float32)
+
+def _topk(d: np.ndarray, k: int):
+    """Row-wise k smallest of ``d`` (sorted), as ``(dist, col)``."""
+    k = min(k, d.shape[1])
+    if k == 0:
+        return np.empty((len(d), 0), np.float32), np.empty((len(d), 0), np.int64)
+    part = np.argpartition(d, k - 1, axis=1)[:, :k] if k < d.shape[1] else np.tile(np.arange(d.shape[1]), (len(d), 1))
+    pd_ = np.take_along_axis(d, part, axis=1)
+    o = np.argsort(pd_, axis=1, kind="stable")
+    return np.sqrt(np.maximum(np.take_along_axis(pd_, o, axis=1), 0)), np.take_along_axis(part, o, axis=1)
+
+class ExactIndex:
+    kind = "exact"
+
+    def __init__(self, x: np.ndarray, block: int = 256):
+        self.x = x
+        self.sq = np.einsum("ij,ij->i", x, x)
+        self.block = block
+
+    def __len__(self):
+        return len(self.x)
+
+    def search(self, Q: np.ndarray, k: int):
+        dist, idx = [], []
+        for s in range(0, len(Q), self.block):
+            q = Q[s:s + self.block]
+            d = self.sq[None, :] - 2.0 * (q @ self.x.T) + np.einsum("ij,ij->i", q, q)[:, None]
+            a, b = _topk(d, k)
+            dist.append(a)
+            idx.append(b)
+        return np.concatenate(dist), np.concatenate(idx)
+
+class IVFIndex:
+    kind = "ivf"
+
+    def __init__(self, x: np.ndarray, n_lists: int | None = None, n_probe: int = 8, seed: int = 0):
+        from sklearn.cluster import MiniBatchKMeans
+        n_lists = int(n_lists or max(1, round(np.sqrt(len(x)))))
+        km = MiniBatchKMeans(n_clusters=n_lists, random_state=seed, n_init=3, batch_size=4096).fit(x)
+        self.centroids = km.cluster_centers_.astype(np.float32)
+        self.coarse = ExactIndex(self.centroids)
+        order = np.argsort(km.labels_, kind="stable")
+        self.order = order                                   # list-sorted position -> original position
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(km.labels_, minlength=n_lists))])
+        self.x = np.ascontiguousarray(x[order])
+        self.sq = np.einsum("ij,ij->i", self.x, self.x)
+        self.n_probe = min(n_probe, n_lists)
+
+    def __len__(self):
+        return len(self.x)
+
+    def search(self, Q: np.ndarray, k: int, n_probe: int | None = None):
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        _, lists = self.coarse.search(Q, n_probe)
+        k = min(k, len(self.x))
+        dist = np.full((len(Q), k), np.inf, dtype=np.float32)
+        idx = np.full((len(Q), k), -1, dtype=np.int64)
+        for i, q in enumerate(Q):
+            cand = np.concatenate([np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists[i]])
+            d = self.sq[cand] - 2.0 * (self.x[cand] @ q) + q @ q
+            a, b = _topk(d[None, :], k)
+            dist[i, :a.shape[1]] = a[0]
+            idx[i, :b.shape[1]] = self.order[cand[b[0]]]
+        return dist, idx
+
+class NeighborIndex:
+    def __init__(self, vectors, labels, ids: dict | None = None, feature_columns=None, method: str = "auto",
+                 exact_max: int = 50_000, n_lists: int | None = None, n_probe: int = 8, seed: int = 0):
+        x = _dense32(vectors)
+        self.labels = np.asarray(labels).astype(str)
+        self.ids = {c: np.asarray(v) for c, v in (ids or {}).items()}
+        self.feature_columns = list(feature_columns) if feature_columns is not None else None
+        self.classes = sorted(set(self.labels))
+
+        def make(v):
+            if method == "exact" or (method == "auto" and len(v) <= exact_max):
+                return ExactIndex(v)
+            return IVFIndex(v, n_lists, n_probe, seed)
+
+        self.parts = {ALL: (np.arange(len(x)), make(x))}
+        for c in self.classes:
+            rows = np.flatnonzero(self.labels == c)
+            self.parts[c] = (rows, make(np.ascontiguousarray(x[rows])))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @staticmethod
+    def transform(pipe, X) -> np.ndarray:
+        pipe = getattr(pipe, "best_estimator_", pipe)     # saved GridSearchCV artifacts
+        return _dense32(pipe.named_steps["preprocessor"].transform(X))
+
+    @classmethod
+    def from_pipeline(cls, pipe, X, y, ids=None, **kw):
+        """Index the labelled rows ``X`` / ``y``; ``ids`` is a frame of identifier columns aligned with ``X``."""
+        ids = {c: ids[c].to_numpy() for c in ids.columns} if ids is not None else None
+        return cls(cls.transform(pipe, X), np.asarray(y), ids, list(X.columns), **kw)
+
+    def describe(self) -> dict:
+        return {"rows": len(self), "classes": {c: len(self.parts[c][0]) for c in self.classes},
+                "kind": {g: p[1].kind for g, p in self.parts.items()}, "id_columns": list(self.ids)}
+
+    def search(self, Q: np.ndarray, k: int = 5, classes=None) -> dict:
+        """``{group: (dist (n, k), row (n, k))}`` for ``all`` (``classes=None``) or each requested class."""
+        Q = _dense32(Q)
+        groups = [ALL] if not classes else list(classes)
+        unknown = [g for g in groups if g not in self.parts]
+        if unknown:
+            raise KeyError(f"unknown classes {unknown}; index has {self.classes}")
+        out = {}
+        for g in groups:
+            rows, index = self.parts[g]
+            d, i = index.search(Q, k)
+            out[g] = (d, np.where(i >= 0, rows[np.maximum(i, 0)], -1))
+        return out
+
+    def records(self, Q: np.ndarray, k: int = 5, classes=None) -> list[dict]:
+        """Per query row: ``{group: [{rank, distance, label, row, <ids>...}, ...]}`` (JSON-ready)."""
+        res = self.search(Q, k, classes)
+        out = [dict() for _ in range(len(Q))]
+        for g, (d, r) in res.items():
+            for qi in range(len(Q)):
+                out[qi][g] = [
+                    {"rank": j + 1, "distance": float(d[qi, j]), "label": self.labels[r[qi, j]], "row": int(r[qi, j]),
+                     **{c: v[r[qi, j]].item() if hasattr(v[r[qi, j]], "item") else v[r[qi, j]] for c, v in self.ids.items()}}
+                    for j in range(d.shape[1]) if r[qi, j] >= 0]
+        return out
+
+    def frame(self, Q: np.ndarray, k: int = 5, classes=None):
+        """Long-form DataFrame: ``query, group, rank, distance, label, row, <ids>``."""
+        import pandas as pd
+        parts = []
+        for g, (d, r) in self.search(Q, k, classes).items():
+            q, j = np.nonzero(r >= 0)
+            rows = r[q, j]
+            parts.append(pd.DataFrame({"query": q, "group": g, "rank": j + 1, "distance": d[q, j],
+                                       "label": self.labels[rows], "row": rows,
+                                       **{c: v[rows] for c, v in self.ids.items()}}))
+        return pd.concat(parts, ignore_index=True).sort_values(["query", "group", "rank"], kind="stable")
+
+    def save(self, outdir) -> Path:
+        import joblib
+        path = Path(outdir) / NEIGHBORS_FILE
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path) -> "NeighborIndex":
+        import joblib
+        p = Path(path)
+        return joblib.load(p / NEIGHBORS_FILE if p.is_dir() else p)
+
+def _artifact_frames(art_dir, table, meta, feat_cols, lightcurves=None, labelled=False):
+    """``(rows, X)`` of a table read like ``infer`` does: the artifact's dtype plan and training-time joins."""
+    from .data import load_table, load_plan
+    from .infer import align, load_joins
+    df = load_table(table, load_plan(art_dir))
+    if labelled:
+        df = df[df[meta["target"]].notna()]
+    lc, sky = load_joins(art_dir, lightcurves)
+    return align(df, feat_cols, meta.get("drop_cols", []), lc, sky)
+
+def build_for_artifact(art_dir, table, id_cols=("toi", "tid"), lightcurves=None, **kw) -> Path:
+    """(Re)build the index of an existing sklearn artifact from a labelled table."""
+    from .utils import load_artifacts
+    pipe, feat_cols, meta = load_artifacts(art_dir)
+    df, X = _artifact_frames(art_dir, table, meta, feat_cols, lightcurves, labelled=True)
+    ids = df[[c for c in id_cols if c in df.columns]]
+    y = df[meta["target"]].astype(str)
+    return NeighborIndex.from_pipeline(pipe, X, y, ids if len(ids.columns) else None, **kw).save(art_dir)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="k nearest labelled training objects in the model's feature space")
+    ap.add_argument("--artifacts", required=True, help="sklearn artifact folder (pipeline.joblib + neighbors.joblib)")
+    ap.add_argument("--input", default=None, help="Rows to query (CSV/TSV)")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--classes", nargs="+", default=None, help="k nearest per class (default: k nearest overall)")
+    ap.add_argument("--output", default=None, help="Long-form results CSV (defaults to <artifacts>/similar.csv)")
+    ap.add_argument("--build", default=None, metavar="TABLE", help="Build neighbors.joblib from this labelled table")
+    ap.add_argument("--method", choices=["auto", "exact", "ivf"], default="auto")
+    ap.add_argument("--lightcurves", default=None,
+                    help="Light-curve FITS directory or lc-features table (defaults to the source recorded at training)")
+    args = ap.parse_args(argv)
+
+    if args.build:
+        path = build_for_artifact(args.artifacts, args.build, lightcurves=args.lightcurves, method=args.method)
+        print(f"Neighbour index written to: {path.resolve()}")
+    if not args.input:
+        return
+
+    import time
+    from .utils import load_artifacts
+    pipe, feat_cols, meta = load_artifacts(args.artifacts)
+    index = NeighborIndex.load(args.artifacts)
+    df, X = _artifact_frames(args.artifacts, args.input, meta, feat_cols, args.lightcurves)
+    t0 = time.perf_counter()
+    res = index.frame(index.transform(pipe, X), args.k, args.classes)
+    ms = (time.perf_counter() - t0) * 1e3
+    for c in ("toi", "tid"):
+        if c in df.columns:
+            res.insert(1, f"query_{c}", df[c].to_numpy()[res["query"].to_numpy()])
+    out = Path(args.output) if args.output else Path(args.artifacts) / "similar.csv"
+    res.to_csv(out, index=False)
+    print(f"{len(df)} queries in {ms:.1f} ms ({ms / max(len(df), 1):.3f} ms/row) -> {out.resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Prediction output writers shared by the inference and training CLIs.
+
+``--format csv|parquet|arrow`` picks the container. Parquet (zstd) and Arrow IPC need ``pyarrow``.
+``--keep-columns`` limits which input columns are carried next to the predictions. The default ``all``
+keeps today's full copy of the input; use e.g. ``toi,tid`` for keys only, ``auto`` for whichever of
+``toi`` / ``tid`` exist, or ``none`` for prediction columns only. Only the selected columns are copied.
+"""
+from __future__ import annotations
+from pathlib import Path
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+ID_COLUMNS = ("toi", "tid")
+
+def add_output_args(ap, default_format: str = "csv"):
+    ap.add_argument("--format", choices=sorted(FORMATS), default=default_format,
+                    help="Predictions file format (parquet/arrow need pyarrow)")
+    ap.add_argument("--keep-columns", default="all",
+                    help="Input columns to carry into the predictions file: 'all', 'none', or a comma list")
+
+def keep_columns(spec: str | None, available) -> list:
+    if spec is None or spec == "all":
+        return list(available)
+    if spec == "none":
+        return []
+    if spec == "auto":
+        return [c for c in ID_COLUMNS if c in available]
+    cols = [c.strip() for c in spec.split(",") if c.strip()]
+    missing = [c for c in cols if c not in available]
+    if missing:
+        raise ValueError(f"--keep-columns not found in input: {missing}")
+    return cols
+
+def default_path(art_dir, fmt: str = "csv", stem: str = "predictions") -> Path:
+    return Path(art_dir) / f"{stem}{FORMATS[fmt]}"
+
+def write_predictions(inputs, preds, path, fmt: str | None = None, keep: str | None = "all") -> Path:
+    """Write ``inputs[keep] | preds`` side by side (``preds`` shares ``inputs``' index)."""
+    import pandas as pd
+    path = Path(path)
+    if fmt is None:
+        fmt = next((f for f, ext in FORMATS.items() if path.suffix == ext), "csv")
+    cols = keep_columns(keep, inputs.columns) if inputs is not None else []
+    out = pd.concat([inputs[cols], preds], axis=1) if cols else preds
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        out.to_csv(path, index=False)
+    elif fmt == "parquet":
+        out.to_parquet(path, index=False, compression="zstd")
+    elif fmt == "arrow":
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        feather.write_feather(pa.Table.from_pandas(out, preserve_index=False), path, compression="zstd")
+    else:
+        raise ValueError(f"Unknown format '{fmt}'; choose from {sorted(FORMATS)}")
+    return path
+
+def concat_parts(parts, path, fmt: str | None = None) -> Path:
+    """Join prediction files written chunk by chunk (same columns, same format) into one file at ``path``.
+
+    Parts are streamed: CSV bodies are appended without their header, Parquet / Arrow tables are cast to the
+    union of the parts' schemas (types inferred per chunk may differ, e.g. int64 vs double, or null for a chunk
+    where a column is empty) and appended part by part.
+    """
+    import shutil
+    path = Path(path)
+    if fmt is None:
+        fmt = next((f for f, ext in FORMATS.items() if path.suffix == ext), "csv")
+    parts = [Path(p) for p in parts]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        with open(path, "wb") as out:
+            for i, p in enumerate(parts):
+                with open(p, "rb") as f:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    shutil.copyfileobj(f, out)
+        return path
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'; choose from {sorted(FORMATS)}")
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    read = pq.read_table if fmt == "parquet" else feather.read_table
+    # schemas only: Parquet footers / memory-mapped Arrow files, no column data is read here
+    schemas = [pq.read_schema(p) if fmt == "parquet" else feather.read_table(p, memory_map=True).schema for p in parts]
+    schema = pa.unify_schemas(schemas, promote_options="permissive") if schemas else None
+    writer = None
+    try:
+        for p in parts:
+            table = read(p)
+            if writer is None:
+                writer = (pq.ParquetWriter(path, schema, compression="zstd") if fmt == "parquet" else
+                          pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")))
+            writer.write_table(table.select(schema.names).cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
@@ -5,7 +5,7 @@ import numpy as np
 import pandas as pd
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
 from sklearn.impute import SimpleImputer
 
 def detect_feature_types(X: pd.DataFrame) -> Tuple[List[str], List[str]]:
@@ -30,3 +30,33 @@ def build_preprocessor(X: pd.DataFrame) -> ColumnTransformer:
         ]
     )
     return pre
+
+def build_token_preprocessor(X: pd.DataFrame) -> ColumnTransformer:
+    """Like build_preprocessor, but one output column per raw feature (ordinal codes instead of OHE).
+
+    Output layout is ``[numeric..., categorical...]``; unknown/missing categories encode to -1.
+    Used by the tokenized FT-Transformer so its sequence length is the raw feature count.
+    """
+    num_cols, cat_cols = detect_feature_types(X)
+    numeric = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="median")),
+        ("scaler", StandardScaler()),
+    ])
+    categorical = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("ordinal", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)),
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ("num", numeric, num_cols),
+            ("cat", categorical, cat_cols),
+        ]
+    )
+
+def token_cardinalities(pre: ColumnTransformer) -> Tuple[int, List[int]]:
+    """(n_numeric, per-categorical-field cardinality) of a fitted token preprocessor."""
+    n_num = len(pre.transformers_[0][2])
+    cat = pre.named_transformers_.get("cat")
+    if cat is None or not len(pre.transformers_[1][2]):
+        return n_num, []
+    return n_num, [len(c) for c in cat.named_steps["ordinal"].categories_]
@@ -0,0 +1,82 @@
+"""Permutation-importance feature pruning for the sklearn training pipeline.
+
+The validation split is transformed by the fitted preprocessor once; each (feature, repeat) task then
+shuffles only that feature's output columns (all one-hot columns of a categorical move together) and
+re-runs ``clf.predict`` — no re-preprocessing, and the baseline predictions are computed once per round.
+Tasks run in parallel with joblib. Pruning drops the least important ``step`` fraction per round and
+refits, stopping before the validation score falls more than ``tolerance`` below the full-feature score.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from .explain import output_groups
+from .preprocess import build_preprocessor
+
+def _permuted_score(clf, Xt, y, cols, seed, scorer):
+    rng = np.random.default_rng(seed)
+    Xp = Xt.copy()
+    Xp[:, cols] = Xt[rng.permutation(len(Xt))][:, cols]
+    return scorer(clf, Xp, y)
+
+def permutation_importance(pipe: Pipeline, X_val: pd.DataFrame, y_val, *, scoring: str = "balanced_accuracy",
+                           n_repeats: int = 5, n_jobs: int | None = -1, random_state: int = 42):
+    """Mean/std score drop per input column of ``X_val`` (grouped through the ColumnTransformer)."""
+    pre, clf = pipe.named_steps["preprocessor"], pipe.named_steps["clf"]
+    scorer = get_scorer(scoring)
+    Xt = pre.transform(X_val)
+    Xt = np.asarray(Xt.toarray() if hasattr(Xt, "toarray") else Xt)
+    y = np.asarray(y_val)
+    baseline = scorer(clf, Xt, y)
+    groups = output_groups(pre, list(X_val.columns))
+    cols_of = {f: np.flatnonzero(groups == i) for i, f in enumerate(X_val.columns)}
+    tasks = [(f, cols, random_state + r) for f, cols in cols_of.items() if len(cols) for r in range(n_repeats)]
+    scores = Parallel(n_jobs=n_jobs)(delayed(_permuted_score)(clf, Xt, y, cols, seed, scorer) for _, cols, seed in tasks)
+    drops = pd.DataFrame({"feature": [t[0] for t in tasks], "drop": baseline - np.asarray(scores)})
+    agg = drops.groupby("feature", sort=False)["drop"].agg(["mean", "std"]).reindex(X_val.columns).fillna(0.0)
+    return float(baseline), agg
+
+def refit_subset(template: Pipeline, X: pd.DataFrame, y) -> Pipeline:
+    """Clone ``template``'s classifier behind a preprocessor rebuilt for ``X``'s columns and fit it."""
+    pipe = Pipeline(steps=[("preprocessor", build_preprocessor(X)), ("clf", clone(template.named_steps["clf"]))])
+    return pipe.fit(X, y)
+
+def prune_features(template: Pipeline, X_train: pd.DataFrame, y_train, cfg: dict, *, scoring: str = "balanced_accuracy",
+                   random_state: int = 42) -> tuple[list[str], dict]:
+    """Iteratively drop low-importance columns; returns (kept_columns, report)."""
+    tol = float(cfg.get("tolerance", 0.005))
+    step = float(cfg.get("step", 0.1))
+    min_features = int(cfg.get("min_features", 5))
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=cfg.get("val_size", 0.2),
+                                                  random_state=random_state, stratify=y_train)
+    features = list(X_train.columns)
+    pipe = refit_subset(template, X_fit[features], y_fit)
+    reference = None
+    rounds = []
+    while True:
+        score, imp = permutation_importance(pipe, X_val[features], y_val, scoring=scoring,
+                                            n_repeats=int(cfg.get("n_repeats", 5)), n_jobs=cfg.get("n_jobs", -1),
+                                            random_state=random_state)
+        if reference is None:
+            reference = score
+        rounds.append({"n_features": len(features), "score": score,
+                       "importance": {f: {"mean": float(r["mean"]), "std": float(r["std"])} for f, r in imp.iterrows()}})
+        n_drop = min(max(1, int(len(features) * step)), len(features) - min_features)
+        if n_drop <= 0:
+            break
+        drop = imp["mean"].sort_values(kind="stable").index[:n_drop].tolist()
+        candidate = [f for f in features if f not in drop]
+        cand_pipe = refit_subset(template, X_fit[candidate], y_fit)
+        cand_score = get_scorer(scoring)(cand_pipe, X_val[candidate], y_val)
+        if reference - cand_score > tol:
+            rounds.append({"n_features": len(candidate), "score": float(cand_score), "rejected": drop})
+            break
+        features, pipe = candidate, cand_pipe
+    report = {"scoring": scoring, "tolerance": tol, "reference_score": reference, "kept": features,
+              "dropped": [f for f in X_train.columns if f not in features], "rounds": rounds}
+    return features, report
@@ -0,0 +1,94 @@
+"""Run index: one small JSON summarising every artifact run folder.
+
+Each ``<root>/<family>/<run>/`` folder with a ``metadata.json`` (or ``dl_metadata.json``) becomes one record:
+family, run id, metadata, ``test_metrics.json``, and a file manifest (size + sha256). The dashboard reads
+this file instead of walking directories, and sync tooling can diff manifests to copy only changed runs.
+Hashes are reused from the previous index when a file's size and mtime are unchanged, so re-indexing
+only reads new or modified files.
+
+    python -m exo_ml run-index --roots artifacts dl_artifacts --output artifacts/run_index.json
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+INDEX_FILE = "run_index.json"
+METADATA_FILES = ("metadata.json", "dl_metadata.json")
+
+def file_sha256(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def find_runs(base: Path, roots: list[str]):
+    """Yield (root, family, run_dir) for every run folder with a metadata file."""
+    for root in roots:
+        root_dir = base / root
+        if not root_dir.is_dir():
+            continue
+        for family_dir in sorted(p for p in root_dir.iterdir() if p.is_dir()):
+            for run_dir in sorted(p for p in family_dir.iterdir() if p.is_dir()):
+                if any((run_dir / m).exists() for m in METADATA_FILES):
+                    yield root, family_dir.name, run_dir
+
+def run_record(base: Path, root: str, family: str, run_dir: Path, prev_files: dict | None = None) -> dict:
+    meta = next((m for m in (_read_json(run_dir / f) for f in METADATA_FILES) if m is not None), {})
+    files = {}
+    for p in sorted(run_dir.rglob("*")):
+        if not p.is_file():
+            continue
+        st = p.stat()
+        rel = p.relative_to(run_dir).as_posix()
+        old = (prev_files or {}).get(rel)
+        if old and old.get("size") == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+            files[rel] = old
+        else:
+            files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(p)}
+    digest = hashlib.sha256("".join(f"{k}:{v['sha256']}\n" for k, v in files.items()).encode()).hexdigest()
+    return {"id": f"{family}/{run_dir.name}", "root": root, "family": family, "runId": run_dir.name,
+            "path": run_dir.relative_to(base).as_posix(), "metadata": meta,
+            "metrics": _read_json(run_dir / "test_metrics.json"), "digest": digest, "files": files}
+
+def build_index(base, roots: list[str], prev: dict | None = None) -> dict:
+    base = Path(base)
+    prev_runs = {r["path"]: r for r in (prev or {}).get("runs", [])}
+    runs = [run_record(base, root, family, run_dir, prev_runs.get(run_dir.relative_to(base).as_posix(), {}).get("files"))
+            for root, family, run_dir in find_runs(base, roots)]
+    runs.sort(key=lambda r: (r["runId"], r["family"]), reverse=True)
+    return {"generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "roots": roots, "runs": runs}
+
+def write_index(index: dict, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(index, indent=1))
+    os.replace(tmp, path)
+    return path
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write a run index (metadata + metrics + file manifest) for artifact folders")
+    ap.add_argument("--base", default=".", help="Directory the roots are relative to (pipeline/)")
+    ap.add_argument("--roots", nargs="+", default=["artifacts"], help="Artifact roots laid out as <root>/<family>/<run>/")
+    ap.add_argument("--output", default=None, help=f"Index path (defaults to <base>/{INDEX_FILE})")
+    args = ap.parse_args(argv)
+
+    out = Path(args.output) if args.output else Path(args.base) / INDEX_FILE
+    prev = _read_json(out) if out.exists() else None
+    index = build_index(args.base, args.roots, prev)
+    write_index(index, out)
+    print(f"Indexed {len(index['runs'])} runs -> {out.resolve()}")
+
+if __name__ == "__main__":
+    main()
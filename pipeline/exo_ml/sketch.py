@@ -0,0 +1,190 @@
+"""Constant-memory, mergeable column statistics for streaming passes over large tables.
+
+- ``RunningMoments``: count / missing / mean / M2 / min / max (Chan et al. parallel merge).
+- ``QuantileSketch``: bounded set of weighted centroids (equal-weight compression), mergeable,
+  so medians / quantiles over any number of chunks cost O(max_size) memory.
+- ``HeavyHitters``: Misra-Gries frequent-items summary keeping at most ``max_size`` values; every value
+  more frequent than ``n / (max_size + 1)`` is kept, and counts are low by at most ``error``.
+
+All serialize to plain dicts (``to_dict`` / ``from_dict``) so they can be written into artifact JSON.
+"""
+from __future__ import annotations
+import math
+import numpy as np
+
+class RunningMoments:
+    def __init__(self):
+        self.n = 0          # non-missing values seen
+        self.n_missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x) -> "RunningMoments":
+        x = np.asarray(x, dtype=np.float64)
+        finite = x[~np.isnan(x)]
+        self.n_missing += int(x.size - finite.size)
+        if finite.size:
+            other = RunningMoments()
+            other.n = int(finite.size)
+            other.mean = float(finite.mean())
+            other.m2 = float(((finite - other.mean) ** 2).sum())
+            other.min, other.max = float(finite.min()), float(finite.max())
+            self._merge_values(other)
+        return self
+
+    def _merge_values(self, o: "RunningMoments"):
+        n = self.n + o.n
+        if n == 0:
+            return
+        delta = o.mean - self.mean
+        self.mean += delta * o.n / n
+        self.m2 += o.m2 + delta * delta * self.n * o.n / n
+        self.n = n
+        self.min, self.max = min(self.min, o.min), max(self.max, o.max)
+
+    def merge(self, o: "RunningMoments") -> "RunningMoments":
+        self.n_missing += o.n_missing
+        self._merge_values(o)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.n + self.n_missing
+
+    @property
+    def var(self) -> float:
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def missing_rate(self) -> float:
+        return self.n_missing / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "n_missing": self.n_missing, "mean": self.mean, "m2": self.m2,
+                "min": self.min if self.n else None, "max": self.max if self.n else None}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningMoments":
+        m = cls()
+        m.n, m.n_missing, m.mean, m.m2 = int(d["n"]), int(d["n_missing"]), float(d["mean"]), float(d["m2"])
+        m.min = math.inf if d.get("min") is None else float(d["min"])
+        m.max = -math.inf if d.get("max") is None else float(d["max"])
+        return m
+
+def _compress(means: np.ndarray, weights: np.ndarray, max_size: int):
+    order = np.argsort(means, kind="stable")
+    means, weights = means[order], weights[order]
+    if means.size <= max_size:
+        return means, weights
+    cw = np.cumsum(weights)
+    # bucket by centroid mid-rank -> at most max_size equal-weight buckets
+    bucket = np.minimum(((cw - weights / 2) / cw[-1] * max_size).astype(np.int64), max_size - 1)
+    w = np.bincount(bucket, weights=weights, minlength=max_size)
+    m = np.bincount(bucket, weights=weights * means, minlength=max_size)
+    keep = w > 0
+    return m[keep] / w[keep], w[keep]
+
+class QuantileSketch:
+    def __init__(self, max_size: int = 256):
+        self.max_size = int(max_size)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, x) -> "QuantileSketch":
+        x = np.asarray(x, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        if x.size:
+            self.means, self.weights = _compress(np.concatenate([self.means, x]),
+                                                 np.concatenate([self.weights, np.ones(x.size)]), self.max_size)
+        return self
+
+    def merge(self, o: "QuantileSketch") -> "QuantileSketch":
+        if o.weights.size:
+            self.means, self.weights = _compress(np.concatenate([self.means, o.means]),
+                                                 np.concatenate([self.weights, o.weights]), self.max_size)
+        return self
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def quantile(self, q):
+        """Approximate quantile(s); NaN for an empty sketch."""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.weights.size:
+            return np.full(q.shape, np.nan) if q.ndim else float("nan")
+        mid = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        out = np.interp(q, mid, self.means)
+        return out if q.ndim else float(out)
+
+    def cdf(self, x):
+        """Approximate P(X <= x)."""
+        x = np.asarray(x, dtype=np.float64)
+        if not self.weights.size:
+            return np.zeros(x.shape) if x.ndim else 0.0
+        mid = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        out = np.interp(x, self.means, mid, left=0.0, right=1.0)
+        return out if x.ndim else float(out)
+
+    def to_dict(self) -> dict:
+        return {"max_size": self.max_size, "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "QuantileSketch":
+        s = cls(d.get("max_size", 256))
+        s.means = np.asarray(d["means"], dtype=np.float64)
+        s.weights = np.asarray(d["weights"], dtype=np.float64)
+        return s
+
+class HeavyHitters:
+    def __init__(self, max_size: int = 256):
+        self.max_size = int(max_size)
+        self.counts = {}
+        self.n = 0
+        self.error = 0      # upper bound on how far any kept count is below the true count
+
+    def update(self, values) -> "HeavyHitters":
+        vals, counts = np.unique(np.asarray(values, dtype=str), return_counts=True)
+        for v, k in zip(vals.tolist(), counts.tolist()):
+            self.counts[v] = self.counts.get(v, 0) + k
+        self.n += int(counts.sum())
+        self._prune()
+        return self
+
+    def merge(self, o: "HeavyHitters") -> "HeavyHitters":
+        for v, k in o.counts.items():
+            self.counts[v] = self.counts.get(v, 0) + k
+        self.n += o.n
+        self.error += o.error
+        self._prune()
+        return self
+
+    def _prune(self):
+        if len(self.counts) <= self.max_size:
+            return
+        # subtract the (max_size + 1)-th largest count from every counter and drop those that reach zero
+        c = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        cut = int(np.partition(c, len(c) - self.max_size - 1)[len(c) - self.max_size - 1])
+        self.counts = {v: k - cut for v, k in self.counts.items() if k > cut}
+        self.error += cut
+
+    def most_common(self, n: int | None = None) -> list:
+        return sorted(self.counts.items(), key=lambda kv: -kv[1])[:n]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self):
+        return iter(self.counts)
+
+    def to_dict(self) -> dict:
+        return {"max_size": self.max_size, "counts": self.counts, "n": self.n, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "HeavyHitters":
+        h = cls(d.get("max_size", 256))
+        h.counts = {str(v): int(k) for v, k in d["counts"].items()}
+        h.n, h.error = int(d["n"]), int(d["error"])
+        return h
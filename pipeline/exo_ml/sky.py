@@ -0,0 +1,214 @@
+"""Spherical sky index (KD-tree on unit vectors) for neighbour / crowding features and catalog cross-match.
+
+RA/Dec are mapped to unit vectors, where the Euclidean (chord) distance is monotonic in angular separation.
+A radius query on the sphere is then an ordinary ball query, and each query costs O(log N) instead of an
+O(N) scan. ``SkyIndex`` wraps ``scipy.spatial.cKDTree`` and is built once per catalog and persisted with
+joblib. ``SkyIndex.for_table`` caches it next to the data as ``<table>.sky.joblib``, keyed by the table's
+sha256, so it is rebuilt only when the file changes.
+
+Crowding features for each row are computed against a reference catalog (the training table by default).
+Matches closer than ``self_arcsec`` are the same star (several TOIs share a host) and are ignored:
+
+- ``sky_n_<r>as``: neighbours within each radius (defaults 21/63/126 arcsec = 1/3/6 TESS pixels);
+- ``sky_nn_sep_arcsec`` / ``sky_nn_dmag``: nearest neighbour within the largest radius and its magnitude offset;
+- ``sky_contam``: flux-ratio contamination proxy, sum of ``10^(-0.4 dmag) * exp(-sep^2 / 2 psf^2)``.
+
+    python -m exo_ml sky --input data/TOI.csv --crossmatch data/KOI.csv --radius 2 --output data/toi_x_koi.csv
+"""
+from __future__ import annotations
+import argparse
+import json
+from pathlib import Path
+import numpy as np
+
+ARCSEC = np.pi / (180.0 * 3600.0)
+SETTINGS_FILE = "sky.json"
+INDEX_FILE = "sky_index.joblib"
+
+def unit_vectors(ra_deg, dec_deg) -> np.ndarray:
+    ra = np.radians(np.asarray(ra_deg, dtype=np.float64))
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cd = np.cos(dec)
+    return np.column_stack([cd * np.cos(ra), cd * np.sin(ra), np.sin(dec)])
+
+def chord(arcsec) -> float:
+    return 2.0 * np.sin(np.asarray(arcsec, dtype=np.float64) * ARCSEC / 2.0)
+
+def separation_arcsec(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Angular separation between rows of unit-vector arrays (chord -> angle, stable at small separations)."""
+    d = np.linalg.norm(a - b, axis=-1)
+    return 2.0 * np.arcsin(np.clip(d / 2.0, 0.0, 1.0)) / ARCSEC
+
+class SkyIndex:
+    def __init__(self, ra, dec, ids=None, mags=None):
+        from scipy.spatial import cKDTree
+        ra, dec = np.asarray(ra, dtype=np.float64), np.asarray(dec, dtype=np.float64)
+        ok = np.isfinite(ra) & np.isfinite(dec)
+        self.rows = np.flatnonzero(ok)                  # positions in the source table
+        self.vectors = unit_vectors(ra[ok], dec[ok])
+        self.ids = None if ids is None else np.asarray(ids)[ok]
+        self.mags = None if mags is None else np.asarray(mags, dtype=np.float64)[ok]
+        self.tree = cKDTree(self.vectors, balanced_tree=False, compact_nodes=False)
+        self.source_sha256 = None
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @classmethod
+    def from_frame(cls, df, ra_col="ra", dec_col="dec", id_col=None, mag_col=None):
+        ids = df[id_col].to_numpy() if id_col and id_col in df.columns else None
+        mags = df[mag_col].to_numpy() if mag_col and mag_col in df.columns else None
+        return cls(df[ra_col].to_numpy(), df[dec_col].to_numpy(), ids, mags)
+
+    @classmethod
+    def for_table(cls, path, ra_col="ra", dec_col="dec", id_col=None, mag_col=None, cache: bool = True):
+        """Index for a table file, reusing ``<path>.sky.joblib`` while the file's sha256 is unchanged."""
+        import joblib
+        from .data import load_table
+        from .run_index import file_sha256
+        path = Path(path)
+        sha = file_sha256(path)
+        cached = path.with_name(path.name + ".sky.joblib")
+        spec = [ra_col, dec_col, id_col, mag_col]
+        if cache and cached.exists():
+            obj = joblib.load(cached)
+            if obj.source_sha256 == sha and getattr(obj, "spec", None) == spec:
+                return obj
+        obj = cls.from_frame(load_table(path), ra_col, dec_col, id_col, mag_col)
+        obj.source_sha256, obj.spec = sha, spec
+        if cache:
+            joblib.dump(obj, cached)
+        return obj
+
+    def save(self, path):
+        import joblib
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path) -> "SkyIndex":
+        import joblib
+        return joblib.load(path)
+
+    def query_radius(self, ra, dec, radius_arcsec: float, workers: int = -1):
+        """Flattened pairs within ``radius_arcsec``: ``(query_pos, index_pos, sep_arcsec)`` arrays."""
+        q = unit_vectors(ra, dec)
+        ok = np.flatnonzero(np.isfinite(q).all(axis=1))
+        lists = self.tree.query_ball_point(q[ok], float(chord(radius_arcsec)), workers=workers)
+        counts = np.fromiter((len(l) for l in lists), dtype=np.int64, count=len(lists))
+        cols = np.fromiter((j for l in lists for j in l), dtype=np.int64, count=int(counts.sum()))
+        rows = np.repeat(ok, counts)
+        return rows, cols, separation_arcsec(q[rows], self.vectors[cols])
+
+    def query_knn(self, ra, dec, k: int = 1, max_arcsec: float | None = None, workers: int = -1):
+        """``(sep_arcsec, index_pos)`` of shape ``(n, k)``; missing neighbours have sep=inf, pos=len(self)."""
+        q = unit_vectors(ra, dec)
+        bound = np.inf if max_arcsec is None else float(chord(max_arcsec))
+        sep = np.full((len(q), k), np.inf)
+        pos = np.full((len(q), k), len(self), dtype=np.int64)
+        ok = np.flatnonzero(np.isfinite(q).all(axis=1))
+        if len(ok) and len(self):
+            d, i = self.tree.query(q[ok], k=k, distance_upper_bound=bound, workers=workers)
+            d, i = d.reshape(len(ok), k), i.reshape(len(ok), k)
+            sep[ok] = np.where(np.isfinite(d), 2.0 * np.arcsin(np.clip(d / 2.0, 0.0, 1.0)) / ARCSEC, np.inf)
+            pos[ok] = i
+        return sep, pos
+
+def reference_index(source, mag_col: str | None = None, ra_col="ra", dec_col="dec") -> SkyIndex:
+    """Index for a local table (cached next to it) or, for URLs, built in memory."""
+    if Path(str(source)).exists():
+        return SkyIndex.for_table(source, ra_col, dec_col, mag_col=mag_col)
+    from .data import load_table
+    return SkyIndex.from_frame(load_table(source), ra_col, dec_col, mag_col=mag_col)
+
+def crowding_features(index: SkyIndex, ra, dec, mags=None, radii_arcsec=(21.0, 63.0, 126.0),
+                      self_arcsec: float = 1.0, psf_arcsec: float = 21.0):
+    """Neighbour counts / nearest neighbour / contamination proxy per query row (DataFrame, query order)."""
+    import pandas as pd
+    n = len(np.asarray(ra))
+    radii = sorted(float(r) for r in radii_arcsec)
+    rows, cols, sep = index.query_radius(ra, dec, radii[-1])
+    keep = sep >= self_arcsec
+    rows, cols, sep = rows[keep], cols[keep], sep[keep]
+    out = {f"sky_n_{r:g}as": np.bincount(rows[sep <= r], minlength=n).astype(np.float64) for r in radii}
+
+    nn_sep = np.full(n, np.inf)
+    np.minimum.at(nn_sep, rows, sep)
+    has = np.isfinite(nn_sep)
+    out["sky_nn_sep_arcsec"] = np.where(has, nn_sep, np.nan)
+    if mags is not None and index.mags is not None:
+        mags = np.asarray(mags, dtype=np.float64)
+        dmag = index.mags[cols] - mags[rows]
+        is_nn = sep == nn_sep[rows]
+        nn_pair = np.full(n, -1, dtype=np.int64)
+        nn_pair[rows[is_nn]] = np.flatnonzero(is_nn)
+        out["sky_nn_dmag"] = np.where(nn_pair >= 0, dmag[np.maximum(nn_pair, 0)], np.nan)
+        w = np.nan_to_num(10.0 ** (-0.4 * dmag)) * np.exp(-0.5 * (sep / psf_arcsec) ** 2)
+        out["sky_contam"] = np.bincount(rows, weights=w, minlength=n)
+    return pd.DataFrame(out)
+
+def add_crowding_features(df, index: SkyIndex, cfg: dict):
+    """``df`` with ``sky_*`` columns appended (same index); rows without coordinates get NaN."""
+    import pandas as pd
+    num = lambda c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64)
+    ra, dec = num(cfg.get("ra_col", "ra")), num(cfg.get("dec_col", "dec"))
+    mag_col = cfg.get("mag_col")
+    mags = num(mag_col) if mag_col and mag_col in df.columns else None
+    feats = crowding_features(index, ra, dec, mags, cfg.get("radii_arcsec", (21.0, 63.0, 126.0)),
+                              cfg.get("self_arcsec", 1.0), cfg.get("psf_arcsec", 21.0))
+    feats.loc[~(np.isfinite(ra) & np.isfinite(dec)), :] = np.nan
+    feats.index = df.index
+    return pd.concat([df.drop(columns=feats.columns, errors="ignore"), feats], axis=1)
+
+def cross_match(left, right, radius_arcsec: float = 2.0, ra_col="ra", dec_col="dec", prefix: str = "xm_",
+                how: str = "left", index: SkyIndex | None = None):
+    """Nearest-neighbour join of ``right`` onto ``left`` within ``radius_arcsec`` (adds ``<prefix>sep_arcsec``)."""
+    import pandas as pd
+    index = index or SkyIndex.from_frame(right, ra_col, dec_col)
+    sep, pos = index.query_knn(left[ra_col].to_numpy(), left[dec_col].to_numpy(), k=1, max_arcsec=radius_arcsec)
+    sep, pos = sep[:, 0], pos[:, 0]
+    hit = np.isfinite(sep)
+    matched = right.iloc[index.rows[pos[hit]]].add_prefix(prefix).reset_index(drop=True)
+    matched.index = left.index[hit]
+    out = left.join(matched, how="left")
+    out[f"{prefix}sep_arcsec"] = np.where(hit, sep, np.nan)
+    if how == "inner":
+        out = out[hit]
+    return out
+
+def save_settings(cfg: dict, index: SkyIndex, outdir: Path):
+    """Record sky settings and the reference index inside an artifact folder."""
+    index.save(Path(outdir) / INDEX_FILE)
+    (Path(outdir) / SETTINGS_FILE).write_text(json.dumps(cfg, indent=2))
+
+def load_settings(art_dir):
+    """``(cfg, SkyIndex)`` for an artifact trained with sky features, else ``(None, None)``."""
+    art = Path(art_dir)
+    if not (art / SETTINGS_FILE).exists():
+        return None, None
+    return json.loads((art / SETTINGS_FILE).read_text()), SkyIndex.load(art / INDEX_FILE)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sky index: crowding features and catalog cross-match")
+    ap.add_argument("--input", required=True, help="Catalog CSV with ra/dec (degrees)")
+    ap.add_argument("--output", required=True, help="CSV with sky_* columns (and xm_* with --crossmatch)")
+    ap.add_argument("--reference", default=None, help="Neighbour catalog for crowding (default: the input itself)")
+    ap.add_argument("--crossmatch", default=None, help="Second catalog to nearest-neighbour join (e.g. KOI onto TOI)")
+    ap.add_argument("--radius", type=float, default=2.0, help="Cross-match radius (arcsec)")
+    ap.add_argument("--radii", type=float, nargs="+", default=[21.0, 63.0, 126.0], help="Crowding radii (arcsec)")
+    ap.add_argument("--mag-col", default="st_tmag")
+    ap.add_argument("--prefix", default="xm_")
+    args = ap.parse_args(argv)
+
+    from .data import load_table
+    df = load_table(args.input)
+    ref = SkyIndex.for_table(args.reference or args.input, mag_col=args.mag_col)
+    out = add_crowding_features(df, ref, {"radii_arcsec": args.radii, "mag_col": args.mag_col})
+    if args.crossmatch:
+        out = cross_match(out, load_table(args.crossmatch), args.radius, prefix=args.prefix,
+                          index=SkyIndex.for_table(args.crossmatch))
+        print(f"Cross-matched {int(out[f'{args.prefix}sep_arcsec'].notna().sum())}/{len(out)} rows within {args.radius}\"")
+    out.to_csv(args.output, index=False)
+    print(f"Wrote {len(out)} rows -> {Path(args.output).resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Out-of-core training: three streaming passes over the CSV, never more than ~2 chunks in memory.
+
+1. stats  — per-column RunningMoments + QuantileSketch (numeric) / value counts (categorical), labels,
+            and a reserve of the first ``max(50, chunksize // 20)`` train rows per class
+2. fit    — preprocessor built from those stats; ``partial_fit`` estimators see every chunk,
+            forests grow ``warm_start`` trees chunk by chunk (classes missing from a chunk are
+            filled in from the reserve)
+3. eval   — held-out rows scored chunk by chunk
+
+The result is the same ``Pipeline(preprocessor, clf)`` saved as ``pipeline.joblib`` by ``train.py``.
+Rows are split train/test with a seeded RNG re-created every pass, so each pass sees the same split.
+Unlike the in-memory path, incomplete rows are imputed rather than dropped (``basic_clean``), and
+column pruning uses missing-rate and constant checks only (no exact distinct counts).
+
+Categorical value counts are ``HeavyHitters`` summaries of at most ``max_categories`` values per column, so
+pass 1 stays bounded on high-cardinality columns. Only the kept (most frequent) values become one-hot /
+ordinal categories; rarer values are encoded as unknown, like categories first seen at inference.
+"""
+from __future__ import annotations
+import math
+from collections import Counter
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from .data import iter_table
+from .models import build_model
+from .preprocess import build_preprocessor
+from .sketch import RunningMoments, QuantileSketch, HeavyHitters
+from .drift import DriftProfile, save_reference
+from .utils import timestamp_dir, save_pipeline, save_feature_columns, save_metadata
+from .evaluate import evaluate_and_save
+
+WARM_START_MODELS = ["rf", "random_forest", "random-forest", "et", "extra_trees", "extra-trees"]
+
+def _to_numeric(s: pd.Series) -> pd.Series:
+    # same parsing as datafix.coerce_numeric
+    if pd.api.types.is_numeric_dtype(s):
+        return s
+    return pd.to_numeric(s.astype(str).str.replace(",", "").str.strip(), errors="coerce")
+
+class ChunkStream:
+    """Re-iterable (X, y, is_test) chunks with a fixed schema taken from the first chunk."""
+
+    def __init__(self, path, chunksize: int, target: str, drop_cols: list, test_size: float, random_state: int,
+                 min_numeric_ratio: float = 0.95):
+        self.path, self.chunksize, self.target = path, chunksize, target
+        self.drop_cols, self.test_size, self.random_state = drop_cols, test_size, random_state
+        first = self._clean(next(iter_table(path, chunksize)))
+        if target not in first.columns:
+            raise ValueError(f"Target column '{target}' not found in input.")
+        self.columns = [c for c in first.columns if c != target]
+        self.numeric = []
+        for c in self.columns:
+            s = first[c]
+            if pd.api.types.is_numeric_dtype(s) or _to_numeric(s).notna().mean() >= min_numeric_ratio:
+                self.numeric.append(c)
+        self.categorical = [c for c in self.columns if c not in self.numeric]
+
+    def select(self, features: list):
+        self.columns = list(features)
+        self.numeric = [c for c in self.numeric if c in features]
+        self.categorical = [c for c in self.categorical if c in features]
+
+    def _clean(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = chunk.drop(columns=[c for c in self.drop_cols if c in chunk.columns])
+        return chunk[chunk[self.target].notna()] if self.target in chunk.columns else chunk
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.random_state)
+        for chunk in iter_table(self.path, self.chunksize):
+            chunk = self._clean(chunk)
+            is_test = rng.random(len(chunk)) < self.test_size
+            X = chunk.reindex(columns=self.columns)
+            for c in self.numeric:
+                X[c] = _to_numeric(X[c]).astype(np.float64)
+            yield X, chunk[self.target].astype(str), is_test
+
+def _collect_stats(stream: ChunkStream, sketch_size: int, max_categories: int):
+    reserve_rows = max(50, stream.chunksize // 20)
+    reserve = {}            # label -> first ``reserve_rows`` train rows of that class (for warm-start fits)
+    moments = {c: RunningMoments() for c in stream.numeric}
+    sketches = {c: QuantileSketch(sketch_size) for c in stream.numeric}
+    cat_counts = {c: HeavyHitters(max_categories) for c in stream.categorical}
+    cat_missing = Counter()
+    labels = Counter()
+    n_train_chunks = 0
+    for X, y, is_test in stream:
+        X, y = X[~is_test], y[~is_test]
+        if not len(X):
+            continue
+        n_train_chunks += 1
+        labels.update(y.tolist())
+        for label in y.unique():
+            have = len(reserve.get(label, ()))
+            if have < reserve_rows:
+                rows = X[(y == label).to_numpy()].iloc[:reserve_rows - have]
+                reserve[label] = pd.concat([reserve[label], rows]) if have else rows.copy()
+        for c in stream.numeric:
+            v = X[c].to_numpy()
+            moments[c].update(v)
+            sketches[c].update(v)
+        for c in stream.categorical:
+            s = X[c]
+            cat_missing[c] += int(s.isna().sum())
+            cat_counts[c].update(s.dropna().astype(str).to_numpy())
+    return moments, sketches, cat_counts, cat_missing, labels, n_train_chunks, reserve
+
+def _build_fitted_preprocessor(num_cols, cat_cols, medians, moments, cat_counts):
+    """Fit the standard ColumnTransformer structure on a tiny proto frame, then install streamed statistics."""
+    n_proto = max([len(cat_counts[c]) for c in cat_cols] + [2])
+    proto = {}
+    for c in num_cols:
+        proto[c] = np.full(n_proto, medians[c])
+    for c in cat_cols:
+        proto[c] = np.resize(np.array(sorted(cat_counts[c]), dtype=object), n_proto)
+    X_proto = pd.DataFrame(proto)[num_cols + cat_cols]
+    pre = build_preprocessor(X_proto).fit(X_proto)
+
+    if num_cols:
+        num = pre.named_transformers_["num"]
+        med = np.array([medians[c] for c in num_cols], dtype=np.float64)
+        num.named_steps["imputer"].statistics_ = med
+        # moments *after* median imputation: merge observed values with n_missing points at the median
+        n_tot = np.array([moments[c].count for c in num_cols], dtype=np.float64)
+        n_obs = np.array([moments[c].n for c in num_cols], dtype=np.float64)
+        mean_obs = np.array([moments[c].mean for c in num_cols])
+        m2_obs = np.array([moments[c].m2 for c in num_cols])
+        n_miss = n_tot - n_obs
+        mean = (n_obs * mean_obs + n_miss * med) / n_tot
+        var = (m2_obs + n_obs * n_miss / n_tot * (mean_obs - med) ** 2) / n_tot
+        scaler = num.named_steps["scaler"]
+        scaler.mean_, scaler.var_ = mean, var
+        scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+        scaler.n_samples_seen_ = int(n_tot.max())
+    if cat_cols:
+        modes = [cat_counts[c].most_common(1)[0][0] for c in cat_cols]
+        pre.named_transformers_["cat"].named_steps["imputer"].statistics_ = np.array(modes, dtype=object)
+    return pre
+
+def _fit_partial(clf, pre, stream, labels, class_weight):
+    import inspect
+    takes_sw = "sample_weight" in inspect.signature(clf.partial_fit).parameters
+    for X, y, is_test in stream:
+        X, y = X[~is_test], y[~is_test]
+        if not len(X):
+            continue
+        kw = {"sample_weight": y.map(class_weight).to_numpy()} if (takes_sw and class_weight) else {}
+        clf.partial_fit(pre.transform(X), y.to_numpy(), classes=np.array(labels), **kw)
+    return clf
+
+def _fit_warm_start(clf, pre, stream, labels, n_train_chunks, reserve):
+    """Grow ``n_estimators`` trees in total, a slice per chunk; every fit needs all classes present.
+
+    A chunk missing some classes is topped up with those classes' rows reserved in pass 1 (a few per
+    class), so each chunk is fitted as soon as it arrives and memory stays at one chunk plus the reserve,
+    even for a rare class or a file sorted by label.
+    """
+    total = int(clf.get_params().get("n_estimators", 100))
+    per_chunk = max(1, math.ceil(total / max(n_train_chunks, 1)))
+    clf.set_params(warm_start=True, n_estimators=0)
+    want = set(labels)
+    for X, y, is_test in stream:
+        X, y = X[~is_test], y[~is_test]
+        if not len(X):
+            continue
+        missing = sorted(want - set(y.unique()))
+        if missing:
+            X = pd.concat([X] + [reserve[c].reindex(columns=X.columns) for c in missing])
+            y = pd.concat([y] + [pd.Series(c, index=reserve[c].index) for c in missing])
+        clf.set_params(n_estimators=clf.n_estimators + per_chunk)
+        clf.fit(pre.transform(X), y.to_numpy())
+    return clf
+
+def train_streaming(input_path, cfg: dict, outdir_root, chunksize: int, sketch_size: int = 512,
+                    max_missing_pct: float = 0.80, max_categories: int = 256) -> Path:
+    target, drop_cols = cfg["target"], cfg["drop_cols"]
+    if cfg.get("stacking", {}).get("enabled", False):
+        raise ValueError("Stacking is not supported in chunked training mode.")
+    if cfg.get("grid_search", {}).get("enabled", False):
+        print("[chunked] grid_search is ignored in chunked mode; using model.params as-is")
+
+    stream = ChunkStream(input_path, chunksize, target, drop_cols, cfg["test_size"], cfg["random_state"])
+
+    # Pass 1: streaming statistics
+    (moments, sketches, cat_counts, cat_missing, label_counts,
+     n_train_chunks, reserve) = _collect_stats(stream, sketch_size, max_categories)
+    n_train = sum(label_counts.values())
+    labels = sorted(label_counts)
+    num_cols = [c for c in stream.numeric
+                if moments[c].n and moments[c].missing_rate <= max_missing_pct and moments[c].max > moments[c].min]
+    cat_cols = [c for c in stream.categorical
+                if len(cat_counts[c]) + (cat_missing[c] > 0) >= 2 and cat_missing[c] / max(n_train, 1) <= max_missing_pct]
+    features = [c for c in stream.columns if c in num_cols or c in cat_cols]
+    num_cols = [c for c in features if c in num_cols]
+    cat_cols = [c for c in features if c in cat_cols]
+    medians = {c: sketches[c].quantile(0.5) for c in num_cols}
+    pre = _build_fitted_preprocessor(num_cols, cat_cols, medians, moments, cat_counts)
+    stream.select(features)
+    print(f"[chunked] pass 1: {n_train} train rows in {n_train_chunks} chunks, "
+          f"{len(num_cols)} numeric + {len(cat_cols)} categorical features")
+
+    # Pass 2: fit
+    model_cfg = cfg["model"]
+    params = dict(model_cfg.get("params") or {})
+    clf = build_model(model_cfg["name"], params)
+    name = model_cfg["name"].lower()
+    if hasattr(clf, "partial_fit"):
+        class_weight = None
+        if clf.get_params().get("class_weight") == "balanced":
+            # partial_fit rejects 'balanced' (needs all labels up front); apply it as per-row sample weights
+            clf.set_params(class_weight=None)
+            class_weight = {c: n_train / (len(labels) * label_counts[c]) for c in labels}
+        clf = _fit_partial(clf, pre, stream, labels, class_weight)
+    elif name in WARM_START_MODELS:
+        clf = _fit_warm_start(clf, pre, stream, labels, n_train_chunks, reserve)
+    else:
+        raise ValueError(f"Model '{model_cfg['name']}' supports neither partial_fit nor warm_start tree growth; "
+                         f"use one of: sgd, gaussian_nb, {', '.join(WARM_START_MODELS)}")
+    pipe = Pipeline(steps=[("preprocessor", pre), ("clf", clf)])
+
+    # Pass 3: evaluate on the held-out rows
+    y_true, y_pred = [], []
+    for X, y, is_test in stream:
+        if is_test.any():
+            y_true.append(y[is_test].to_numpy())
+            y_pred.append(np.asarray(pipe.predict(X[is_test])).astype(str))
+    y_true = np.concatenate(y_true) if y_true else np.array([], dtype=str)
+    y_pred = np.concatenate(y_pred) if y_pred else np.array([], dtype=str)
+
+    outdir = timestamp_dir(outdir_root)
+    save_pipeline(pipe, outdir)
+    save_feature_columns(features, outdir)
+    save_metadata(target, drop_cols, labels, outdir,
+                  notes=f"Chunked out-of-core {model_cfg['name']} (chunksize={chunksize})")
+    if len(y_true):
+        evaluate_and_save(y_true, y_pred, labels, outdir, prefix="test", **cfg.get("evaluation", {}))
+    save_reference(DriftProfile.from_sketches({c: (moments[c], sketches[c]) for c in num_cols}), outdir)
+    return outdir
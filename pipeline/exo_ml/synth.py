@@ -0,0 +1,191 @@
+"""Synthetic catalog generator for scale testing.
+
+Profiles a real table (schema, column order, ``#`` comment header, class frequencies, class-conditional
+numeric marginals as quantile functions, category frequencies, and the most common row-level NaN
+patterns), then samples any number of rows chunk by chunk, optionally widened with extra columns.
+
+    python -m exo_ml.synth --input data/TOI_2025.10.03_10.51.46.csv --rows 1000000 --output data/synth_1M.csv
+    python -m exo_ml.synth --profile synth_profile.json --rows 10000000 --extra-cols 200 --output data/synth_10M_w.csv
+"""
+from __future__ import annotations
+import argparse, json
+from pathlib import Path
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+N_QUANTILES = 101
+MAX_CATEGORIES = 200
+MAX_NAN_PATTERNS = 256
+
+def _comment_header(path) -> list[str]:
+    lines = []
+    try:
+        with open(path, "r", errors="replace") as f:
+            for line in f:
+                if not line.startswith("#"):
+                    break
+                lines.append(line.rstrip("\n"))
+    except (OSError, TypeError):
+        pass
+    return lines
+
+def profile_table(df: pd.DataFrame, target: str | None = None, header: list[str] | None = None) -> dict:
+    import pandas as pd
+    qs = np.linspace(0, 1, N_QUANTILES)
+    y = df[target].astype(str) if target and target in df.columns else None
+    classes = y.value_counts(normalize=True) if y is not None else None
+    cols = []
+    for c in df.columns:
+        s = df[c]
+        col = {"name": c, "null_rate": float(s.isna().mean())}
+        if c == target:
+            col["kind"] = "target"
+        elif pd.api.types.is_numeric_dtype(s):
+            v = s.dropna().to_numpy(dtype=np.float64)
+            col["kind"] = "numeric"
+            col["integer"] = bool(v.size and np.all(np.mod(v, 1) == 0))
+            uniq = np.unique(v)
+            if 0 < uniq.size <= 20:
+                # flags / counts (e.g. *_lim, pl_pnum): keep the exact discrete distribution
+                vals, counts = np.unique(v, return_counts=True)
+                col["discrete"] = {"values": vals.tolist(), "p": (counts / counts.sum()).tolist()}
+            else:
+                col["quantiles"] = np.quantile(v, qs).tolist() if v.size else []
+                if y is not None:
+                    col["class_quantiles"] = {
+                        k: np.quantile(g.dropna().to_numpy(dtype=np.float64), qs).tolist()
+                        for k, g in s.groupby(y) if g.notna().sum() >= 10
+                    }
+        else:
+            vc = s.dropna().astype(str).value_counts()
+            col["kind"] = "categorical"
+            col["n_unique"] = int(vc.size)
+            if vc.size > MAX_CATEGORIES and vc.size > 0.5 * max(s.notna().sum(), 1):
+                col["unique_like"] = True  # ids / timestamps: generate distinct strings
+                col["example"] = str(vc.index[0])
+            else:
+                vc = vc.iloc[:MAX_CATEGORIES]
+                col["categories"] = vc.index.tolist()
+                col["p"] = (vc / vc.sum()).tolist()
+        cols.append(col)
+    mask = df.isna().to_numpy()
+    patterns = pd.Series([np.flatnonzero(r).tobytes() for r in mask]).value_counts().iloc[:MAX_NAN_PATTERNS]
+    return {
+        "rows": int(len(df)),
+        "target": target if y is not None else None,
+        "header": header or [],
+        "classes": {"values": classes.index.tolist(), "p": classes.tolist()} if classes is not None else None,
+        "columns": cols,
+        "nan_patterns": {"columns": [np.frombuffer(b, dtype=np.int64).tolist() for b in patterns.index],
+                         "p": (patterns / patterns.sum()).tolist()},
+    }
+
+def _sample_quantiles(q: list, u: np.ndarray) -> np.ndarray:
+    return np.interp(u, np.linspace(0, 1, len(q)), q)
+
+def generate_chunk(profile: dict, n: int, rng: np.random.Generator, extra_cols: int = 0, offset: int = 0) -> pd.DataFrame:
+    import pandas as pd
+    cols = profile["columns"]
+    out = {}
+    labels = None
+    if profile.get("classes"):
+        labels = rng.choice(np.asarray(profile["classes"]["values"], dtype=object), size=n, p=profile["classes"]["p"])
+    numeric = []
+    for col in cols:
+        name, kind = col["name"], col["kind"]
+        if kind == "target":
+            out[name] = labels
+        elif kind == "numeric":
+            numeric.append(col)
+            if "discrete" in col:
+                v = rng.choice(np.asarray(col["discrete"]["values"]), size=n, p=col["discrete"]["p"])
+            elif not col.get("quantiles"):
+                v = np.full(n, np.nan)
+            else:
+                u = rng.random(n)
+                v = _sample_quantiles(col["quantiles"], u)
+                for k, q in (col.get("class_quantiles") or {}).items():
+                    m = labels == k
+                    v[m] = _sample_quantiles(q, u[m])
+                if col.get("integer"):
+                    v = np.round(v)
+            out[name] = v
+        elif col.get("unique_like"):
+            out[name] = [f"{col['example'][:8]}_{i}" for i in range(offset, offset + n)]
+        elif col.get("categories"):
+            out[name] = rng.choice(np.asarray(col["categories"], dtype=object), size=n, p=col["p"])
+        else:
+            out[name] = np.full(n, None, dtype=object)
+    df = pd.DataFrame(out, columns=[c["name"] for c in cols])
+
+    # Row-level NaN patterns reproduce co-missingness (err1/err2/lim columns go missing together)
+    pats = profile.get("nan_patterns") or {}
+    if pats.get("p"):
+        idx = rng.choice(len(pats["p"]), size=n, p=np.asarray(pats["p"]) / np.sum(pats["p"]))
+        mask = np.zeros((n, len(cols)), dtype=bool)
+        for j, pcols in enumerate(pats["columns"]):
+            rows = np.flatnonzero(idx == j)
+            if rows.size and pcols:
+                mask[np.ix_(rows, pcols)] = True
+        for k, col in enumerate(cols):
+            if col["kind"] != "target" and mask[:, k].any():
+                df.iloc[mask[:, k], k] = np.nan
+
+    # Extra columns for width sweeps: resampled copies of existing numeric marginals
+    for i in range(extra_cols):
+        if not numeric:
+            break
+        base = numeric[i % len(numeric)]
+        if base.get("quantiles"):
+            v = _sample_quantiles(base["quantiles"], rng.random(n))
+        else:
+            v = rng.normal(size=n)
+        v[rng.random(n) < base["null_rate"]] = np.nan
+        df[f"syn_{i:04d}"] = v
+    return df
+
+def write_synthetic(profile: dict, rows: int, output: str | Path, *, extra_cols: int = 0, seed: int = 0,
+                    chunksize: int = 100_000) -> Path:
+    out = Path(output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    with open(out, "w", newline="") as f:
+        for line in profile.get("header") or []:
+            f.write(line + "\n")
+        for start in range(0, rows, chunksize):
+            n = min(chunksize, rows - start)
+            generate_chunk(profile, n, rng, extra_cols, offset=start).to_csv(f, index=False, header=(start == 0))
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic catalog matching a real table's schema and marginals")
+    ap.add_argument("--input", default=None, help="Real CSV/TSV to profile")
+    ap.add_argument("--profile", default=None, help="Use a saved profile JSON instead of --input")
+    ap.add_argument("--profile-out", default=None, help="Save the profile JSON here")
+    ap.add_argument("--target", default="tfopwg_disp")
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--extra-cols", type=int, default=0, help="Add N synthetic numeric columns")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--chunksize", type=int, default=100_000)
+    ap.add_argument("--output", default=None, help="Synthetic CSV path")
+    args = ap.parse_args(argv)
+
+    if args.profile:
+        profile = json.loads(Path(args.profile).read_text())
+    elif args.input:
+        from .data import load_table
+        profile = profile_table(load_table(args.input), args.target, _comment_header(args.input))
+    else:
+        ap.error("one of --input or --profile is required")
+    if args.profile_out:
+        Path(args.profile_out).write_text(json.dumps(profile))
+    if args.output:
+        out = write_synthetic(profile, args.rows, args.output, extra_cols=args.extra_cols, seed=args.seed,
+                              chunksize=args.chunksize)
+        print(f"Wrote {args.rows} synthetic rows to: {out.resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,93 @@
 
 from __future__ import annotations
 import argparse
-from pathlib import Path
-import pandas as pd
-
-from .config import load_config
-from .data import load_table, basic_clean, train_test_split_df
-from .preprocess import build_preprocessor
-from .models import build_pipeline
-from .datafix import coerce_numeric
-from .feature_select import drop_bad_columns
-from sklearn.model_selection import GridSearchCV
-from .utils import timestamp_dir, save_pipeline, save_feature_columns, save_metadata, evaluate_and_save
-
-def main():
+
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Train Exoplanet TFOPWG disposition classifier")
     ap.add_argument("--input", required=True, help="Path to training CSV/TSV")
     ap.add_argument("--config", default=None, help="Path to JSON config (optional)")
     ap.add_argument("--outdir", default="artifacts", help="Artifacts root directory")
-    args = ap.parse_args()
+    ap.add_argument("--chunksize", type=int, default=None,
+                    help="Out-of-core mode: stream the input in chunks of this many rows (partial_fit / warm_start models)")
+    ap.add_argument("--prune", action="store_true", help="Enable permutation-importance feature pruning")
+    ap.add_argument("--lightcurves", default=None,
+                    help="Join light-curve features: directory of local FITS files or a precomputed lc-features table")
+    ap.add_argument("--sky", action="store_true", help="Add sky crowding features (neighbour counts, contamination proxy)")
+    args = ap.parse_args(argv)
+
+    # Heavy imports deferred until after argument parsing (fast --help / cold start)
+    import pandas as pd
+    from sklearn.model_selection import GridSearchCV
+    from .config import load_config
+    from .data import load_table, basic_clean, train_test_split_df, plan_dtypes, apply_plan, save_plan, memory_report
+    from .preprocess import build_preprocessor
+    from .models import build_pipeline
+    from .datafix import coerce_numeric
+    from .feature_select import drop_bad_columns
+    from .utils import timestamp_dir, save_pipeline, save_feature_columns, save_metadata
+    from .evaluate import evaluate_and_save
+    from .drift import DriftProfile, save_reference
 
     cfg = load_config(args.config)
+    if args.prune:
+        cfg["feature_pruning"] = {**cfg.get("feature_pruning", {}), "enabled": True}
+    if args.lightcurves:
+        cfg["lightcurves"] = {**cfg.get("lightcurves", {}), "enabled": True, "source": args.lightcurves}
+    if args.sky:
+        cfg["sky"] = {**cfg.get("sky", {}), "enabled": True}
+    lc_cfg, sky_cfg = cfg.get("lightcurves", {}), cfg.get("sky", {})
+    if args.chunksize:
+        if lc_cfg.get("enabled", False) or sky_cfg.get("enabled", False):
+            raise ValueError("Light-curve / sky features are not supported in chunked training mode; "
+                             "join precomputed lc-features / sky tables into the input instead.")
+        from .stream_train import train_streaming
+        outdir = train_streaming(args.input, cfg, args.outdir, args.chunksize)
+        print(f"Training complete. Artifacts saved to: {outdir.resolve()}")
+        return
+
     target = cfg["target"]
     drop_cols = cfg["drop_cols"]
 
-    # Load & clean
-    df = load_table(args.input)
-    df = basic_clean(df)
+    # Load (with a dtype plan: compact dtypes, numeric parsing during the read) & clean
+    dt_cfg = cfg.get("dtypes", {})
+    plan = None
+    if dt_cfg.get("enabled", False):
+        plan = plan_dtypes(args.input, exact=drop_cols, **{k: v for k, v in dt_cfg.items() if k != "enabled"})
+    df = load_table(args.input, plan, defer_parse=True)
+    mem = memory_report(df)
+    print(f"Loaded {mem['rows']} rows x {mem['columns']} columns: {mem['mb']:.1f} MB"
+          + (" (dtype plan)" if plan else ""))
     if target not in df.columns:
         raise ValueError(f"Target column '{target}' not found in input.")
+    # drift reference from the labelled rows as loaded: basic_clean drops every row with a null, which would
+    # leave a reference null rate of 0 for every feature. Profiled one column at a time: selecting the labelled
+    # rows of all columns at once would copy the whole table while it is at its largest
+    labelled, ref = df[target].notna().to_numpy(), {}
+    for c in df.columns.difference([target, *drop_cols], sort=False):
+        ref.update(DriftProfile.from_frame(coerce_numeric(df.loc[labelled, [c]])).features)
+    raw_reference = DriftProfile(ref)
+    df = basic_clean(df)
+    # junk-token columns are parsed only now, so the plan doesn't change which rows basic_clean keeps
+    df = apply_plan(df, plan)
+    if lc_cfg.get("enabled", False):
+        from .lightcurve import load_features, join_features
+        feats = load_features(lc_cfg["source"], lc_cfg.get("cache_dir"), lc_cfg.get("n_jobs", -1),
+                              lc_cfg.get("params"), lc_cfg.get("key", "tid"))
+        df = join_features(df, feats, lc_cfg.get("key", "tid"))
+        print(f"Joined light-curve features for {int(df.filter(like='lc_').notna().any(axis=1).sum())}/{len(df)} rows")
+    if sky_cfg.get("enabled", False):
+        from .sky import reference_index, add_crowding_features
+        sky_index = reference_index(sky_cfg.get("reference") or args.input, sky_cfg.get("mag_col"))
+        df = add_crowding_features(df, sky_index, sky_cfg)
+
+    nb_cfg = cfg.get("neighbors", {})
+    id_frame = df[[c for c in nb_cfg.get("id_cols", ["toi", "tid"]) if c in df.columns]]
 
     # Drop columns, keep only rows with target
     df = df.drop(columns=[c for c in drop_cols if c in df.columns], errors="ignore")
-    df = df[~df[target].isna()].copy()
+    unlabelled = df[target].isna()
+    if unlabelled.any():
+        df = df[~unlabelled]
     df = drop_bad_columns(df, max_missing_pct=0.80, min_unique_ratio=0.0005)
     df = coerce_numeric(df)
     # Split
@@ -79,6 +134,20 @@ def main():
 
     # Fit
     pipe.fit(X_train, y_train)
+
+    # Optional permutation-importance pruning, then refit on the kept columns
+    prune_report = None
+    if cfg.get("feature_pruning", {}).get("enabled", False):
+        import json
+        from .prune import prune_features, refit_subset
+        template = getattr(pipe, "best_estimator_", pipe)
+        kept, prune_report = prune_features(template, X_train, y_train, cfg["feature_pruning"],
+                                            scoring=cfg.get("scoring", "balanced_accuracy"),
+                                            random_state=cfg["random_state"])
+        X_train, X_test = X_train[kept], X_test[kept]
+        pipe = refit_subset(template, X_train, y_train)
+        print(f"Feature pruning kept {len(kept)} columns (dropped {len(prune_report['dropped'])})")
+
     # Evaluate
     y_pred = pipe.predict(X_test)
     labels = sorted(list(pd.unique(y_train)))
@@ -88,7 +157,35 @@ def main():
     save_pipeline(pipe, outdir)
     save_feature_columns(X_train.columns.tolist(), outdir)
     save_metadata(target, drop_cols, labels, outdir, notes="RF pipeline with scaling+OHE")
-    evaluate_and_save(y_test, y_pred, labels, outdir, prefix="test")
+    evaluate_and_save(y_test, y_pred, labels, outdir, prefix="test", **cfg.get("evaluation", {}))
+    # features added after loading (light-curve / sky joins) are profiled from the training split
+    joined = DriftProfile.from_frame(X_train[[c for c in X_train.columns if c not in raw_reference.features]])
+    save_reference(DriftProfile({c: raw_reference.features.get(c) or joined.features[c]
+                                 for c in X_train.select_dtypes(include="number").columns
+                                 if c in raw_reference.features or c in joined.features}), outdir)
+    if plan is not None:
+        save_plan(plan, outdir)
+    if lc_cfg.get("enabled", False):
+        from .lightcurve import save_settings
+        save_settings({**lc_cfg, "source": str(lc_cfg["source"])}, outdir)
+    if sky_cfg.get("enabled", False):
+        from .sky import save_settings as save_sky
+        save_sky(sky_cfg, sky_index, outdir)
+    if prune_report is not None:
+        with open(outdir / "feature_pruning.json", "w") as f:
+            json.dump(prune_report, f, indent=2)
+    if nb_cfg.get("enabled", True):
+        # optional extra: a failure here must not fail an otherwise complete run
+        try:
+            from .neighbors import NeighborIndex
+            X_all, y_all = pd.concat([X_train, X_test]), pd.concat([y_train, y_test])
+            ids = id_frame.loc[X_all.index] if len(id_frame.columns) else None
+            kw = {k: nb_cfg[k] for k in ("method", "exact_max", "n_probe") if k in nb_cfg}
+            # GridSearchCV (grid search without pruning) has no named_steps; index its refit pipeline
+            fitted = getattr(pipe, "best_estimator_", pipe)
+            NeighborIndex.from_pipeline(fitted, X_all, y_all, ids, **kw).save(outdir)
+        except Exception as e:
+            print(f"Warning: similar-objects index not built ({type(e).__name__}: {e})")
 
     print(f"Training complete. Artifacts saved to: {outdir.resolve()}")
 
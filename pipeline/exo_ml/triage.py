@@ -0,0 +1,158 @@
+"""Streaming top-K triage: score a catalog in chunks, keep only the best rows per class.
+
+Each chunk is scored with ``infer.score_frame``. Per ranking target, the chunk's best ``K`` rows are picked
+with ``argpartition`` and merged into the running top ``K``, so memory is O(K) regardless of catalog size.
+Only the shortlist is written: ``rank_by``, ``rank``, ``score``, ``row`` (catalog row number), ``pred_label``,
+``proba_*``, plus the ``--keep-columns`` inputs (``toi`` / ``tid`` by default).
+
+A ranking target is a class (``PC``) or a sum of classes (``PC+CP`` ranks by P(PC) + P(CP)). ``--min-proba``
+drops rows below a score threshold before they enter the heap. Ties keep catalog order.
+
+    python -m exo_ml triage --input data/TOI.csv --artifacts artifacts/ml_rf/<run> --rank PC CP PC+CP --top-k 300
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import numpy as np
+from .outputs import FORMATS, default_path
+
+class TopK:
+    """Bounded best-``k`` rows by score (ties broken by first-seen row number)."""
+
+    def __init__(self, k: int, min_score: float | None = None):
+        self.k = k
+        self.min_score = min_score
+        self.scores = np.empty(0)
+        self.order = np.empty(0, dtype=np.int64)
+        self.rows = None
+        self.passed = 0
+
+    def _best(self, scores, order):
+        if len(scores) <= self.k:
+            return np.arange(len(scores))
+        # partition on score, then resolve ties at the cut by row order
+        cut = scores[np.argpartition(-scores, self.k - 1)[:self.k]].min()
+        above = np.flatnonzero(scores > cut)
+        at = np.flatnonzero(scores == cut)
+        at = at[np.argsort(order[at], kind="stable")][:self.k - len(above)]
+        return np.concatenate([above, at])
+
+    def push(self, scores: np.ndarray, order: np.ndarray, rows):
+        if self.min_score is not None:
+            keep = np.flatnonzero(scores >= self.min_score)
+            scores, order, rows = scores[keep], order[keep], rows.iloc[keep]
+        self.passed += len(scores)
+        if not len(scores):
+            return
+        sel = self._best(scores, order)
+        scores, order, rows = scores[sel], order[sel], rows.iloc[sel]
+        if self.rows is not None:
+            import pandas as pd
+            scores = np.concatenate([self.scores, scores])
+            order = np.concatenate([self.order, order])
+            rows = pd.concat([self.rows, rows])
+            sel = self._best(scores, order)
+            scores, order, rows = scores[sel], order[sel], rows.iloc[sel]
+        self.scores, self.order, self.rows = scores, order, rows
+
+    def ranked(self):
+        """Rows best-first with ``rank`` (1-based) and ``score`` columns."""
+        if self.rows is None:
+            return None
+        ix = np.lexsort((self.order, -self.scores))
+        out = self.rows.iloc[ix].copy()
+        out.insert(0, "row", self.order[ix])
+        out.insert(0, "score", self.scores[ix])
+        out.insert(0, "rank", np.arange(1, len(ix) + 1))
+        return out
+
+def parse_targets(specs, classes) -> dict:
+    """``{"PC+CP": ["PC", "CP"], ...}`` validated against the model classes."""
+    out = {}
+    for spec in specs:
+        parts = [p.strip() for p in spec.split("+") if p.strip()]
+        unknown = [p for p in parts if p not in classes]
+        if not parts or unknown:
+            raise ValueError(f"--rank '{spec}': unknown classes {unknown}; model classes are {list(classes)}")
+        out[spec] = parts
+    return out
+
+def triage(input_path, pipe, feat_cols, meta, targets: dict, k: int, chunksize: int = 50_000,
+           min_proba: float | None = None, keep: list | str | None = None, lc=None, sky=None, plan=None):
+    """Return ``(shortlist DataFrame, stats)``.
+
+    ``lc`` is an optional ``(features, key)`` light-curve join, ``sky`` an optional ``(cfg, SkyIndex)``,
+    ``plan`` the artifact's dtype plan (``data.load_plan``).
+    """
+    import pandas as pd
+    from .data import iter_table
+    from .infer import score_frame, align
+    from .outputs import keep_columns
+
+    classes = meta.get("classes") or list(getattr(pipe, "classes_", []))
+    drop_cols = meta.get("drop_cols", [])
+    heaps = {name: TopK(k, min_proba) for name in targets}
+    n_rows, offset, keep_cols = 0, 0, None
+    for chunk in iter_table(input_path, chunksize, plan):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        chunk, X = align(chunk, feat_cols, drop_cols, lc, sky)
+        if keep_cols is None:
+            keep_cols = keep_columns(keep or "auto", chunk.columns)
+        preds = score_frame(pipe, X, classes, with_proba=True)
+        rows = pd.concat([chunk[keep_cols], preds], axis=1) if keep_cols else preds
+        order = chunk.index.to_numpy()
+        for name, parts in targets.items():
+            score = preds[[f"proba_{c}" for c in parts]].to_numpy().sum(axis=1)
+            heaps[name].push(score, order, rows)
+        n_rows += len(chunk)
+
+    ranked = [h.ranked().assign(rank_by=name) for name, h in heaps.items() if h.rows is not None]
+    stats = {"rows_scored": n_rows, "top_k": k, "min_proba": min_proba,
+             "targets": {name: {"passed_threshold": h.passed, "kept": 0 if h.rows is None else len(h.rows)}
+                         for name, h in heaps.items()}}
+    if not ranked:
+        return pd.DataFrame(columns=["rank_by", "rank", "score"]), stats
+    out = pd.concat(ranked, ignore_index=True)
+    out = out[["rank_by"] + [c for c in out.columns if c != "rank_by"]]
+    return out, stats
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Rank a catalog in chunks and write only the top-K rows per class")
+    ap.add_argument("--input", required=True, help="CSV/TSV catalog to score")
+    ap.add_argument("--artifacts", required=True, help="sklearn artifact folder (pipeline.joblib)")
+    ap.add_argument("--rank", nargs="+", default=None,
+                    help="Classes to rank by; 'A+B' ranks by the summed probability (default: PC and CP if present)")
+    ap.add_argument("--top-k", type=int, default=500)
+    ap.add_argument("--min-proba", type=float, default=None, help="Drop rows whose score is below this")
+    ap.add_argument("--chunksize", type=int, default=50_000)
+    ap.add_argument("--keep-columns", default="auto",
+                    help="Input columns carried into the shortlist: 'auto' (toi/tid if present), 'all', 'none', or a comma list")
+    ap.add_argument("--output", default=None, help="Shortlist path (defaults to <artifacts>/triage.<format>)")
+    ap.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    ap.add_argument("--lightcurves", default=None, help="Light-curve source override (artifacts trained with --lightcurves)")
+    args = ap.parse_args(argv)
+
+    import json
+    from .utils import load_artifacts
+    from .outputs import write_predictions
+    from .infer import load_joins
+    from .data import load_plan
+
+    pipe, feat_cols, meta = load_artifacts(args.artifacts)
+    classes = meta.get("classes") or list(getattr(pipe, "classes_", []))
+    specs = args.rank or [c for c in ("PC", "CP") if c in classes]
+    targets = parse_targets(specs, classes)
+    lc, sky = load_joins(args.artifacts, args.lightcurves)
+
+    shortlist, stats = triage(args.input, pipe, feat_cols, meta, targets, args.top_k, args.chunksize,
+                              args.min_proba, args.keep_columns, lc, sky, load_plan(args.artifacts))
+    out_path = Path(args.output) if args.output else default_path(args.artifacts, args.format, stem="triage")
+    write_predictions(None, shortlist, out_path, args.format)
+    out_path.with_name(out_path.stem + "_stats.json").write_text(json.dumps(stats, indent=2))
+    for name, s in stats["targets"].items():
+        print(f"{name:<10} kept {s['kept']} of {s['passed_threshold']} passing rows")
+    print(f"Scored {stats['rows_scored']} rows; shortlist written to: {out_path.resolve()}")
+
+if __name__ == "__main__":
+    main()
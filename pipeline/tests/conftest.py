@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# exo_ml is run from pipeline/ (``python -m exo_ml``) rather than installed
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,52 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from exo_ml.evaluate import confusion_matrices, metrics_from_cm
+
+skm = pytest.importorskip("sklearn.metrics")
+
+
+@pytest.fixture
+def labels():
+    # 5 label slots: class 3 is only ever predicted, class 4 never occurs
+    rng = np.random.default_rng(0)
+    t = rng.integers(0, 3, 400)
+    p = np.where(rng.random(400) < 0.7, t, rng.integers(0, 4, 400))
+    return t, p
+
+
+def test_confusion_matrix_matches_sklearn(labels):
+    t, p = labels
+    np.testing.assert_array_equal(confusion_matrices(t, p, 5), skm.confusion_matrix(t, p, labels=range(5)))
+
+
+def test_predictions_outside_labels_are_dropped():
+    t, p = np.array([0, 1, 1]), np.array([0, -1, 1])
+    assert confusion_matrices(t, p, 2).tolist() == [[1, 0], [0, 1]]
+
+
+def test_metrics_match_sklearn(labels):
+    t, p = labels
+    m = metrics_from_cm(confusion_matrices(t, p, 5))
+    assert m["accuracy"] == pytest.approx(skm.accuracy_score(t, p))
+    with warnings.catch_warnings():     # sklearn: y_pred contains classes not in y_true
+        warnings.simplefilter("ignore")
+        assert m["balanced_accuracy"] == pytest.approx(skm.balanced_accuracy_score(t, p))
+    for avg in ("macro", "weighted"):
+        assert m[f"precision_{avg}"] == pytest.approx(skm.precision_score(t, p, average=avg, zero_division=0))
+        assert m[f"recall_{avg}"] == pytest.approx(skm.recall_score(t, p, average=avg, zero_division=0))
+        assert m[f"f1_{avg}"] == pytest.approx(skm.f1_score(t, p, average=avg, zero_division=0))
+    np.testing.assert_allclose(m["precision"][:4], skm.precision_score(t, p, average=None, zero_division=0))
+    assert np.isnan(m["recall"][3]) and np.isnan(m["recall"][4])
+
+
+def test_bootstrap_stack(labels):
+    t, p = labels
+    boot = confusion_matrices(t, p, 5, n_boot=37, rng=np.random.default_rng(1), block_elems=1000)
+    assert boot.shape == (37, 5, 5)
+    assert (boot.sum(axis=(1, 2)) == len(t)).all()
+    m = metrics_from_cm(boot)
+    assert m["accuracy"].shape == (37,)
+    np.testing.assert_allclose(m["accuracy"], np.trace(boot, axis1=1, axis2=2) / len(t))
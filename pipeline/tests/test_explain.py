@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from exo_ml.explain import TreeExplainer
+from exo_ml.preprocess import build_preprocessor
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 5)), columns=[f"f{i}" for i in range(5)])
+    X.iloc[::17, 2] = np.nan
+    score = X["f0"] + 0.5 * X["f1"].fillna(0) - X["f3"]
+    y = np.where(score > 0.5, "CP", np.where(score < -0.5, "FP", "PC"))
+    return X, y
+
+
+def fit(clf, X, y):
+    return Pipeline([("preprocessor", build_preprocessor(X)), ("clf", clone(clf))]).fit(X, y)
+
+
+@pytest.mark.parametrize("clf", [
+    RandomForestClassifier(n_estimators=8, max_depth=5, random_state=0),
+    HistGradientBoostingClassifier(max_iter=15, max_depth=4, random_state=0),
+], ids=["rf", "histgb"])
+@pytest.mark.parametrize("method", ["treeshap", "saabas"])
+def test_attributions_are_additive(data, clf, method):
+    X, y = data
+    exp = TreeExplainer(fit(clf, X, y))
+    assert exp.additivity_gap(X.iloc[:40], method) < 1e-6
+
+
+def test_binary_histgb_is_additive(data):
+    X, y = data
+    exp = TreeExplainer(fit(HistGradientBoostingClassifier(max_iter=10, random_state=0), X, y == "CP"))
+    assert exp.additivity_gap(X.iloc[:40], "saabas") < 1e-6
+    assert exp.explain(X.iloc[:3]).shape == (3, 5, 2)
+
+
+def test_explain_frame_is_per_raw_column(data):
+    X, y = data
+    exp = TreeExplainer(fit(RandomForestClassifier(n_estimators=4, random_state=0), X, y))
+    out = exp.explain_frame(X.iloc[:4], exp.classes.index("CP"))
+    assert list(out.columns) == list(X.columns)
+    assert out.index.equals(X.index[:4])
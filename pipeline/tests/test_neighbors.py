@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from exo_ml.neighbors import ExactIndex, IVFIndex, NeighborIndex
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(0)
+    centres = rng.normal(scale=5.0, size=(20, 16))
+    x = (centres[rng.integers(0, 20, 3000)] + rng.normal(size=(3000, 16))).astype(np.float32)
+    q = (centres[rng.integers(0, 20, 100)] + rng.normal(size=(100, 16))).astype(np.float32)
+    return x, q
+
+
+def brute_force(x, q, k):
+    d = ((q[:, None, :].astype(np.float64) - x[None, :, :]) ** 2).sum(-1)
+    return np.argsort(d, axis=1)[:, :k], np.sqrt(np.sort(d, axis=1)[:, :k])
+
+
+def recall(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def test_exact_matches_brute_force(points):
+    x, q = points
+    dist, idx = ExactIndex(x, block=32).search(q, 10)
+    truth, tdist = brute_force(x, q, 10)
+    # float32 distance expansion: near-ties may swap at the k-th place
+    assert recall(idx, truth) >= 0.99
+    np.testing.assert_allclose(dist, tdist, rtol=1e-3, atol=0.02)
+
+
+def test_ivf_recall(points):
+    x, q = points
+    truth, _ = brute_force(x, q, 10)
+    ivf = IVFIndex(x, n_probe=8, seed=0)
+    assert recall(ivf.search(q, 10)[1], truth) >= 0.9
+    # probing every list is exhaustive
+    exact = ExactIndex(x).search(q, 10)[1]
+    assert recall(ivf.search(q, 10, n_probe=len(ivf.centroids))[1], exact) >= 0.99
+
+
+def test_per_class_partitions(points):
+    x, q = points
+    labels = np.where(np.arange(len(x)) % 3 == 0, "CP", "FP")
+    res = NeighborIndex(x, labels, method="ivf", n_probe=4).search(q, 5, classes=["CP", "FP"])
+    for g, (_, rows) in res.items():
+        assert (labels[rows[rows >= 0]] == g).all()
+    with pytest.raises(KeyError):
+        NeighborIndex(x[:50], labels[:50]).search(q, 5, classes=["PC"])
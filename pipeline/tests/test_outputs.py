@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from exo_ml.outputs import concat_parts
+
+
+def test_csv_parts_keep_one_header(tmp_path):
+    parts = []
+    for i, df in enumerate([pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3]})]):
+        parts.append(tmp_path / f"part-{i}.csv")
+        df.to_csv(parts[-1], index=False)
+    out = concat_parts(parts, tmp_path / "result.csv")
+    assert pd.read_csv(out)["a"].tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_parts_unify_schemas(tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    write = pq.write_table if fmt == "parquet" else feather.write_feather
+    ext = ".parquet" if fmt == "parquet" else ".arrow"
+    # per-chunk inference: int64 vs double, and an all-null chunk for a string column
+    tables = [pa.table({"a": pa.array([1, 2], pa.int64()), "b": pa.array([None, None], pa.null())}),
+              pa.table({"a": pa.array([1.5], pa.float64()), "b": pa.array(["x"], pa.string())})]
+    parts = []
+    for i, t in enumerate(tables):
+        parts.append(tmp_path / f"part-{i}{ext}")
+        write(t, parts[-1])
+    out = concat_parts(parts, tmp_path / f"result{ext}", fmt)
+    got = pq.read_table(out) if fmt == "parquet" else feather.read_table(out)
+    assert got.schema.field("a").type == pa.float64()
+    assert got.schema.field("b").type == pa.string()
+    assert got.column("a").to_pylist() == [1.0, 2.0, 1.5]
+    assert got.column("b").to_pylist() == [None, None, "x"]
@@ -0,0 +1,76 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from exo_ml.sketch import HeavyHitters, QuantileSketch
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).random(20_000)
+
+
+def test_quantile_sketch_bounded_and_accurate(values):
+    s = QuantileSketch(128).update(values)
+    assert len(s.means) <= 128
+    assert s.count == len(values)
+    q = np.linspace(0.01, 0.99, 25)
+    np.testing.assert_allclose(s.quantile(q), np.quantile(values, q), atol=0.01)
+
+
+def test_quantile_sketch_merge_matches_single_pass(values):
+    whole = QuantileSketch(128).update(values)
+    merged = QuantileSketch(128)
+    for part in np.array_split(values, 7):
+        merged.merge(QuantileSketch(128).update(part))
+    assert len(merged.means) <= 128
+    assert merged.count == whole.count
+    q = np.linspace(0.01, 0.99, 25)
+    np.testing.assert_allclose(merged.quantile(q), whole.quantile(q), atol=0.01)
+
+
+def test_quantile_sketch_merge_with_empty_and_round_trip(values):
+    s = QuantileSketch(64).update(values)
+    before = s.means.copy()
+    s.merge(QuantileSketch(64))
+    np.testing.assert_array_equal(s.means, before)
+    back = QuantileSketch.from_dict(s.to_dict())
+    assert back.quantile(0.5) == s.quantile(0.5)
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+@pytest.fixture
+def stream():
+    rng = np.random.default_rng(0)
+    return (rng.zipf(1.4, 30_000) % 500).astype(str)
+
+
+def check_misra_gries(h: HeavyHitters, stream):
+    truth = Counter(stream.tolist())
+    assert h.n == len(stream)
+    assert len(h) <= h.max_size
+    assert h.error <= h.n / (h.max_size + 1)
+    for v, true in truth.items():
+        est = h.counts.get(v, 0)
+        assert true - h.error <= est <= true
+        if true > h.n / (h.max_size + 1):
+            assert v in h.counts
+
+
+def test_heavy_hitters_single_stream(stream):
+    h = HeavyHitters(20)
+    for part in np.array_split(stream, 10):
+        h.update(part)
+    check_misra_gries(h, stream)
+    assert h.most_common(1)[0][0] == Counter(stream.tolist()).most_common(1)[0][0]
+
+
+def test_heavy_hitters_merge(stream):
+    parts = [HeavyHitters(20).update(p) for p in np.array_split(stream, 6)]
+    merged = HeavyHitters(20)
+    for p in parts:
+        merged.merge(p)
+    check_misra_gries(merged, stream)
+    back = HeavyHitters.from_dict(merged.to_dict())
+    assert back.counts == merged.counts and back.n == merged.n and back.error == merged.error
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+from exo_ml.sky import SkyIndex, crowding_features
+
+AS = 1 / 3600.0
+
+
+@pytest.fixture
+def stars():
+    # star 1 is 10" north of star 0, star 2 is 100" north; the last query has no catalogued neighbour
+    ra = np.array([10.0, 10.0, 10.0])
+    dec = np.array([0.0, 10 * AS, 100 * AS])
+    return ra, dec, np.array([10.0, 12.0, 10.0])
+
+
+def test_counts_and_nearest_neighbour(stars):
+    ra, dec, mags = stars
+    idx = SkyIndex(ra, dec, mags=mags)
+    out = crowding_features(idx, np.append(ra, 200.0), np.append(dec, 50.0))
+    assert out["sky_n_21as"].tolist() == [1, 1, 0, 0]
+    assert out["sky_n_63as"].tolist() == [1, 1, 0, 0]
+    assert out["sky_n_126as"].tolist() == [2, 2, 2, 0]
+    np.testing.assert_allclose(out["sky_nn_sep_arcsec"][:3], [10, 10, 90], rtol=1e-6)
+    assert np.isnan(out["sky_nn_sep_arcsec"][3])
+
+
+def test_magnitude_features(stars):
+    ra, dec, mags = stars
+    out = crowding_features(SkyIndex(ra, dec, mags=mags), ra, dec, mags)
+    np.testing.assert_allclose(out["sky_nn_dmag"], [2.0, -2.0, 2.0])
+    psf = 21.0
+    expected0 = 10 ** -0.8 * np.exp(-0.5 * (10 / psf) ** 2) + np.exp(-0.5 * (100 / psf) ** 2)
+    assert out["sky_contam"][0] == pytest.approx(expected0, rel=1e-6)
+
+
+def test_rows_without_coordinates(stars):
+    ra, dec, mags = stars
+    out = crowding_features(SkyIndex(ra, dec), np.array([np.nan, 10.0]), np.array([0.0, 0.0]))
+    assert out["sky_n_126as"].tolist() == [0, 2]
+    assert np.isnan(out["sky_nn_sep_arcsec"][0])
+    assert "sky_contam" not in out
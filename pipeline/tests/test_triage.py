@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from exo_ml.triage import TopK
+
+
+def push(top, scores, order):
+    order = np.asarray(order, dtype=np.int64)
+    top.push(np.asarray(scores, dtype=np.float64), order, pd.DataFrame({"id": order}))
+
+
+def test_ties_go_to_the_earliest_row_within_a_chunk():
+    top = TopK(2)
+    push(top, [0.5, 0.5, 0.5, 0.5, 0.5], [14, 10, 12, 11, 13])
+    assert top.ranked()["row"].tolist() == [10, 11]
+
+
+def test_ties_across_chunks_ignore_arrival_order():
+    top = TopK(3)
+    push(top, [0.5, 0.9, 0.5], [7, 8, 9])
+    push(top, [0.5, 0.9, 0.1], [2, 3, 4])
+    out = top.ranked()
+    assert out["row"].tolist() == [3, 8, 2]
+    assert out["rank"].tolist() == [1, 2, 3]
+    assert out["score"].tolist() == [0.9, 0.9, 0.5]
+    assert out["id"].tolist() == [3, 8, 2]
+
+
+def test_min_score_and_passed():
+    top = TopK(5, min_score=0.5)
+    push(top, [0.4, 0.5, 0.7], [0, 1, 2])
+    push(top, [0.1], [3])
+    assert top.passed == 2
+    assert top.ranked()["row"].tolist() == [2, 1]
+    assert TopK(3).ranked() is None